@@ -0,0 +1,51 @@
+"""
+Бенчмарки производительности.
+
+Запуск из корня проекта ( нужны те же переменные окружения, что и для manage.py ):
+
+    python -m benchmarks.bench_post_create
+
+Каждый бенчмарк работает на отдельной тестовой базе и не трогает db.sqlite3.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django(database_name=None):
+    """
+    инициализация django и создание тестовой базы для бенчмарка
+    ( database_name - файл тестовой базы SQLite вместо базы в памяти )
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'travel.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    if database_name:
+        connection.settings_dict['TEST']['NAME'] = database_name
+    # тестовая база прошлого запуска ( PostgreSQL ) пересоздается без вопроса
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+@contextmanager
+def timer(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def report(title, rows, headers):
+    """
+    печать результатов бенчмарка таблицей
+    """
+    print(title)
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    print('  '.join(str(value).ljust(width) for value, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
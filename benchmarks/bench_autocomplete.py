@@ -0,0 +1,118 @@
+"""
+Время подсказки стран и тегов на каждое нажатие клавиши и размер HTML форм.
+
+Индекс строится по COUNTRY_COUNT странам ( несколько настоящих и синтетические )
+и TAG_COUNT тегам. Запросы - префиксы набираемых слов
+и слова с опечатками. Размер страниц регистрации и создания поста сравнивается
+с прежними CheckboxSelectMultiple.
+
+    python -m benchmarks.bench_autocomplete
+"""
+
+import random
+import statistics
+import time
+from benchmarks import setup_django, report
+
+
+COUNTRY_COUNT = 250
+TAG_COUNT = 5_000
+REPEAT = 200
+
+TYPED = ['Germany', 'United Kingdom', 'Deutschland', 'горы', 'путешествия']
+TYPOS = ['Grmany', 'Untied', 'Deutchland', 'гпры', 'путишествия']
+
+
+def main():
+    setup_django()
+
+    from django import forms
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+    from country.models import Country
+    from country.registry import reload_registry
+    from user import forms as user_forms
+    from user.autocomplete import autocomplete, get_autocomplete_index
+    from user.models import Profile, Tag
+
+    rnd = random.Random(1)
+    Country.objects.bulk_create([
+        Country(name='Germany', alpha2_code='DE', alpha3_code='DEU', alt_spellings="['DE', 'Deutschland']"),
+        Country(name='United Kingdom', alpha2_code='GB', alpha3_code='GBR', alt_spellings="['GB', 'UK']"),
+        Country(name='United States of America', alpha2_code='US', alpha3_code='USA'),
+        Country(name='Georgia', alpha2_code='GE', alpha3_code='GEO'),
+    ] + [
+        Country(
+            name=''.join(rnd.choice('bdgklmnprst') + rnd.choice('aeiou') for index in range(rnd.randint(2, 5))).title(),
+            alpha3_code=f'X{index:02}'
+        )
+        for index in range(COUNTRY_COUNT - 4)
+    ])
+    reload_registry()
+
+    names = {'горы', 'путешествия'}
+    while len(names) < TAG_COUNT:
+        names.add(''.join(rnd.choice('бвгдзклмнпрст') + rnd.choice('аеиоуя') for index in range(rnd.randint(2, 4))))
+    Tag.objects.bulk_create([Tag(name=name) for name in sorted(names)])
+
+    for kind in ('country', 'tag'):
+        get_autocomplete_index(kind)
+
+    def lookup_us(kind, query):
+        timings = []
+        for index in range(REPEAT):
+            start = time.perf_counter()
+            autocomplete(kind, query)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+        return timings
+
+    rows = []
+    for name, queries in (('prefix', TYPED), ('typo', TYPOS)):
+        for query in queries:
+            kind = 'tag' if query[0] in 'абвгдежзийклмнопрстуфхцчшщэюя' else 'country'
+            prefixes = [query[:length] for length in range(1, len(query) + 1)] if name == 'prefix' else [query]
+            timings = [timing for prefix in prefixes for timing in lookup_us(kind, prefix)]
+            rows.append([
+                name, kind, query, f'{statistics.median(timings):.0f}',
+                f'{sorted(timings)[int(len(timings) * 0.99)]:.0f}', len(autocomplete(kind, query))
+            ])
+
+    report(
+        f'Подсказки, мкс на запрос ( {Country.objects.count()} стран, {TAG_COUNT} тегов )', rows,
+        ['query', 'kind', 'text', 'median', 'p99', 'results']
+    )
+
+    user = User.objects.create_user(username='bench_user', password='bench')
+    Profile.objects.create(user=user)
+    client = Client()
+
+    def page_sizes():
+        client.logout()
+        register = len(client.get(reverse('register')).content)
+        client.force_login(user)
+        create_post = len(client.get(reverse('create_post')).content)
+        return register, create_post
+
+    new_sizes = page_sizes()
+
+    checkboxes = forms.CheckboxSelectMultiple
+    user_forms.RegistrationForm.base_fields['countries_interest'].widget = checkboxes(
+        choices=user_forms.RegistrationForm.base_fields['countries_interest'].choices
+    )
+    for name in ('countries', 'tags'):
+        field = user_forms.PostForm.base_fields[name]
+        field.widget = checkboxes(choices=field.choices)
+    old_sizes = page_sizes()
+
+    report(
+        'Размер HTML страниц, байт', [
+            ['register', old_sizes[0], new_sizes[0]],
+            ['create_post', old_sizes[1], new_sizes[1]],
+        ],
+        ['page', 'checkboxes', 'autocomplete']
+    )
+
+
+if __name__ == '__main__':
+    main()
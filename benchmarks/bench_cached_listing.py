@@ -0,0 +1,65 @@
+"""
+Объем кеша и число запросов для постраничных списков.
+
+Сравнивает старую схему ( в кеш кладется весь вычисленный QuerySet постов страны )
+и кеширование упорядоченных id с подгрузкой только текущей страницы ( user/listing.py ).
+
+    python -m benchmarks.bench_cached_listing
+"""
+
+import pickle
+from benchmarks import setup_django, report
+
+
+POST_COUNTS = [100, 1_000, 10_000]
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from country.models import Country
+    from user.models import Post, Profile
+
+    user = User.objects.create_user(username='bench_user', password='bench')
+    Profile.objects.create(user=user)
+    country = Country.objects.create(name='bench country', alpha3_code='BEN')
+    through = Post.countries.through
+
+    client = Client()
+    client.force_login(user)
+    url = reverse('posts_by_country', args=[country.id])
+
+    rows = []
+    created = 0
+    for post_count in POST_COUNTS:
+        posts = Post.objects.bulk_create([
+            Post(author=user, subject=f'bench {index}', body='bench body ' * 20)
+            for index in range(created, post_count)
+        ], batch_size=2000)
+        through.objects.bulk_create([through(post_id=post.id, country_id=country.id) for post in posts],
+                                    batch_size=2000)
+        created = post_count
+
+        queryset = Post.objects.filter(countries=country).order_by('-create_date')
+        old_size = len(pickle.dumps(list(queryset)))
+        new_size = len(pickle.dumps(tuple(queryset.values_list('pk', flat=True))))
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as cold:
+            client.get(url, {'page': 2})
+        with CaptureQueriesContext(connection) as warm:
+            client.get(url, {'page': 2})
+
+        rows.append([post_count, old_size, new_size, len(cold), len(warm)])
+
+    report('Список постов страны', rows, ['posts', 'old bytes', 'ids bytes', 'queries cold', 'queries warm'])
+
+
+if __name__ == '__main__':
+    main()
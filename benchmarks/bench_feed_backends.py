@@ -0,0 +1,108 @@
+"""
+Пропускная способность ленты на SQLite и PostgreSQL.
+
+Несколько потоков листают ленту по курсору ( первая страница и случайные глубокие
+страницы ) на базе, выбранной DATABASE_ENGINE. Для сравнения запускается дважды:
+
+    python -m benchmarks.bench_feed_backends
+    DATABASE_ENGINE=postgresql python -m benchmarks.bench_feed_backends
+
+SQLite работает с файлом ( WAL, настройки из travel/settings.py ), PostgreSQL - с
+тестовой базой и пулом соединений psycopg.
+
+Замер на одной машине ( PostgreSQL 16.2 на localhost, psycopg 3.2.3 и psycopg-pool 3.2.3 ),
+страниц в секунду:
+
+    threads  sqlite  postgresql  postgresql ( psycopg-binary )
+    1        159     72          94
+    4        142     74          80
+    8        146     91          96
+
+Запрос ключей страницы в PostgreSQL идет по feed_user_lifted_idx ( Index Only Scan, 0.07 мс ),
+почти все время страницы - сборка карточек в ORM под GIL и пять обращений к серверу
+( ключи, посты, страны, фото, теги ) против вызовов в том же процессе у SQLite.
+"""
+
+import os
+import random
+import tempfile
+import threading
+from datetime import timedelta
+from benchmarks import setup_django, report
+
+
+POST_COUNT = 100_000
+BATCH_SIZE = 10_000
+PER_PAGE = 10
+THREADS = [1, 4, 8]
+DURATION = 5
+
+
+def main():
+    database_name = None
+    if os.environ.get('DATABASE_ENGINE', 'sqlite') == 'sqlite':
+        database_name = os.path.join(tempfile.mkdtemp(), 'bench_feed.sqlite3')
+    setup_django(database_name)
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.utils import timezone
+    from user.feed import get_feed_entries
+    from user.listing import CURSOR_PARAM, encode_cursor, get_cursor_page
+    from user.models import FeedEntry, Post
+
+    author = User.objects.create_user(username='bench_author', password='bench')
+    reader = User.objects.create_user(username='bench_reader', password='bench')
+
+    start = timezone.now() - timedelta(days=365)
+    for offset in range(0, POST_COUNT, BATCH_SIZE):
+        posts = Post.objects.bulk_create([
+            Post(author=author, subject=f'bench {index}', body='bench body')
+            for index in range(offset, offset + BATCH_SIZE)
+        ])
+        FeedEntry.objects.bulk_create([
+            FeedEntry(user=reader, post_id=post.id, lifted_at=start + timedelta(seconds=offset + index))
+            for index, post in enumerate(posts)
+        ])
+
+    entries = get_feed_entries(reader)
+    keys = list(entries.values_list('lifted_at', 'post_id')[::PER_PAGE * 100])
+    cursors = [None] + [encode_cursor('next', key) for key in keys]
+    factory = RequestFactory()
+    vendor = connection.vendor
+    connection.close()
+
+    def browse(stop, counts):
+        rnd = random.Random()
+        pages = 0
+        while not stop.is_set():
+            cursor = rnd.choice(cursors)
+            request = factory.get('/', {CURSOR_PARAM: cursor} if cursor else {})
+            page = get_cursor_page(
+                request, entries, ('-lifted_at', '-post_id'), Post.objects.for_cards(), PER_PAGE, id_field='post_id'
+            )
+            list(page)
+            pages += 1
+        counts.append(pages)
+        connection.close()
+
+    rows = []
+    for threads_count in THREADS:
+        stop = threading.Event()
+        counts = []
+        threads = [threading.Thread(target=browse, args=(stop, counts)) for index in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        stop.wait(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        rows.append([vendor, threads_count, f'{sum(counts) / DURATION:.0f}'])
+
+    report(f'Страницы ленты в секунду ( {POST_COUNT} постов )', rows, ['backend', 'threads', 'pages/s'])
+
+
+if __name__ == '__main__':
+    main()
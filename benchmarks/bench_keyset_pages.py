@@ -0,0 +1,87 @@
+"""
+Глубокие страницы ленты при миллионе постов.
+
+Сравнивается Paginator ( COUNT(*) и OFFSET на каждой странице ) и листание по
+курсору ( user/listing.py, выборка по индексу после ключа (lifted_at, post_id) ).
+Курсор глубокой страницы берется заранее, поэтому замеряется только сама страница.
+
+    python -m benchmarks.bench_keyset_pages
+"""
+
+from datetime import timedelta
+from benchmarks import setup_django, timer, report
+
+
+POST_COUNT = 1_000_000
+BATCH_SIZE = 20_000
+PER_PAGE = 10
+PAGES = [1, 1_000, 50_000]
+RUNS = 5
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from django.core.paginator import Paginator
+    from django.test import RequestFactory
+    from django.utils import timezone
+    from user.feed import get_feed_entries
+    from user.listing import CURSOR_PARAM, encode_cursor, get_cursor_page, hydrate
+    from user.models import FeedEntry, Post
+
+    author = User.objects.create_user(username='bench_author', password='bench')
+    reader = User.objects.create_user(username='bench_reader', password='bench')
+
+    start = timezone.now() - timedelta(days=365)
+    for offset in range(0, POST_COUNT, BATCH_SIZE):
+        posts = Post.objects.bulk_create([
+            Post(author=author, subject=f'bench {index}', body='bench body')
+            for index in range(offset, offset + BATCH_SIZE)
+        ])
+        FeedEntry.objects.bulk_create([
+            FeedEntry(user=reader, post_id=post.id, lifted_at=start + timedelta(seconds=(offset + index) // 2))
+            for index, post in enumerate(posts)
+        ])
+
+    entries = get_feed_entries(reader)
+    ordering = ('-lifted_at', '-post_id')
+    factory = RequestFactory()
+
+    def cursor_for(page):
+        """курсор страницы page - ключ последней строки предыдущей страницы"""
+        if page == 1:
+            return None
+        return encode_cursor('next', entries.values_list('lifted_at', 'post_id')[(page - 1) * PER_PAGE - 1])
+
+    rows = []
+    for page in PAGES:
+        cursor = cursor_for(page)
+        request = factory.get('/', {CURSOR_PARAM: cursor} if cursor else {})
+
+        def paginator_page():
+            page_obj = Paginator(entries, PER_PAGE).get_page(page)
+            return [post.id for post in hydrate([entry.post_id for entry in page_obj], Post.objects.all())]
+
+        def cursor_page():
+            return [post.id for post in get_cursor_page(
+                request, entries, ordering, Post.objects.all(), PER_PAGE, id_field='post_id'
+            )]
+
+        best = {}
+        selected = {}
+        for name, fetch in (('paginator', paginator_page), ('cursor', cursor_page)):
+            timings = {}
+            for run in range(RUNS):
+                with timer(timings, run):
+                    selected[name] = fetch()
+            best[name] = min(timings.values())
+
+        assert selected['paginator'] == selected['cursor'], page
+        rows.append([page, f"{best['paginator'] * 1000:.1f}", f"{best['cursor'] * 1000:.1f}"])
+
+    report(f'Страница ленты из {POST_COUNT} постов ( мс )', rows, ['page', 'paginator', 'cursor'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Выборка автоподнятий на день при большом количестве записей.
+
+Сравнивается старый способ ( все активные автоподнятия загружаются в python и
+дни недели проверяются по строке days_of_week ) и выборка по битовой маске
+weekday_mask в базе с индексом (start_date, end_date, weekday_mask).
+
+    python -m benchmarks.bench_lift_selection
+"""
+
+import random
+from datetime import date, timedelta
+from benchmarks import setup_django, timer, report
+
+
+LIFT_COUNT = 500_000
+POST_COUNT = 1_000
+BATCH_SIZE = 10_000
+RUNS = 5
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from user.lifts import due_lifts
+    from user.models import AutoPostLift, Post, days_to_mask
+
+    random.seed(1)
+    author = User.objects.create_user(username='bench_author', password='bench')
+    Post.objects.bulk_create([Post(author=author, subject=f'bench {index}', body='bench body')
+                              for index in range(POST_COUNT)])
+    post_ids = list(Post.objects.values_list('id', flat=True))
+
+    today = date(2024, 10, 23)
+    lifts = []
+    for index in range(LIFT_COUNT):
+        start = today + timedelta(days=random.randint(-180, 180))
+        days = sorted(random.sample('0123456', random.randint(0, 3)))
+        lifts.append(AutoPostLift(
+            post_id=post_ids[index % POST_COUNT],
+            start_date=start,
+            end_date=start + timedelta(days=random.randint(1, 30)),
+            days_of_week=days,
+            weekday_mask=days_to_mask(days)
+        ))
+        if len(lifts) >= BATCH_SIZE:
+            AutoPostLift.objects.bulk_create(lifts)
+            lifts = []
+
+    def python_filter():
+        weekday = str(today.weekday())
+        return [
+            lift.id for lift in AutoPostLift.objects.filter(start_date__lte=today, end_date__gte=today)
+            if lift.end_date == today or not lift.days_of_week or weekday in lift.days_of_week
+        ]
+
+    def mask_filter():
+        return list(due_lifts(today).values_list('id', flat=True))
+
+    rows = []
+    for name, select in (('python', python_filter), ('weekday_mask', mask_filter)):
+        timings = {}
+        for run in range(RUNS):
+            with timer(timings, run):
+                selected = select()
+        rows.append([name, len(selected), f'{min(timings.values()) * 1000:.1f}'])
+
+    report(f'Выборка автоподнятий на день из {LIFT_COUNT} записей ( мс )', rows, ['method', 'lifts', 'best'])
+
+
+if __name__ == '__main__':
+    main()
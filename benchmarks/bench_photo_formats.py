@@ -0,0 +1,67 @@
+"""
+Экономия трафика от копий фото в WebP / AVIF на примерах из media/post_photos.
+
+Сравнивается суммарный размер копий в каждом доступном формате и при выборе
+самой легкой копии из принятых браузером ( Accept со всеми форматами ).
+
+    python -m benchmarks.bench_photo_formats
+"""
+
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from benchmarks import setup_django, report
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files import File
+    from django.test import override_settings
+    from user.models import Photo
+    from user.photos import available_formats, process_pending_photos
+
+    source = os.path.join(settings.BASE_DIR, 'media', 'post_photos')
+    names = sorted(name for name in os.listdir(source) if os.path.isfile(os.path.join(source, name)))
+    media_root = tempfile.mkdtemp()
+    formats = available_formats()
+
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            for name in names:
+                with open(os.path.join(source, name), 'rb') as file:
+                    Photo.objects.create(image=File(file, name=name))
+
+            while process_pending_photos():
+                pass
+
+            originals = 0
+            totals = defaultdict(int)
+            for photo in Photo.objects.order_by('id'):
+                originals += photo.image.size
+
+                by_width = defaultdict(dict)
+                for variant in photo.variants:
+                    by_width[variant['width']][variant['format']] = variant['size']
+
+                for sizes in by_width.values():
+                    for image_format, size in sizes.items():
+                        totals[image_format] += size
+                    totals['negotiated'] += min(sizes.values())
+
+        rows = [
+            [name, totals[name] // 1024, f"{1 - totals[name] / totals['jpeg']:.0%}"]
+            for name in formats + ['negotiated']
+        ]
+        report(f'Все копии {len(names)} фото ( 320/640/1280 px ) по форматам ( КБ )', rows,
+               ['format', 'size', 'saved vs jpeg'])
+        print()
+        print(f'Оригиналы: {originals // 1024} КБ, доступные форматы: {", ".join(formats)}')
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Хранение фото: плоский каталог post_photos/ с оригинальными именами против
+адресации по содержимому ( post_photos/ab/cd/<sha256> ).
+
+1. Повторные загрузки: примеры из media/post_photos загружаются REUPLOADS раз
+   ( популярное фото у многих пользователей ), сравнивается место на диске.
+2. Размер каталогов: FILE_COUNT разных файлов, сравнивается время чтения
+   каталога post_photos/ и поиска файла по имени.
+
+    python -m benchmarks.bench_photo_storage
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from benchmarks import setup_django, report
+
+
+REUPLOADS = 20
+FILE_COUNT = 50_000
+
+
+def disk_usage(root):
+    total = files = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            total += os.path.getsize(os.path.join(directory, name))
+            files += 1
+    return total, files
+
+
+def listing_ms(path, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        os.listdir(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files import File
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import FileSystemStorage
+    from user.storage import ContentAddressedStorage, content_name, hash_file
+
+    source = os.path.join(settings.BASE_DIR, 'media', 'post_photos')
+    names = sorted(name for name in os.listdir(source) if os.path.isfile(os.path.join(source, name)))
+    flat_root, hashed_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+    flat, hashed = FileSystemStorage(location=flat_root), ContentAddressedStorage(location=hashed_root)
+
+    try:
+        for _ in range(REUPLOADS):
+            for name in names:
+                with open(os.path.join(source, name), 'rb') as file:
+                    flat.save(f'post_photos/{name}', File(file))
+                    hashed.save(content_name(hash_file(file), name), File(file))
+
+        rows = []
+        for title, root in (('flat', flat_root), ('content hash', hashed_root)):
+            total, files = disk_usage(root)
+            rows.append([title, files, total // 1024])
+        report(f'{len(names)} фото, каждое загружено {REUPLOADS} раз', rows, ['storage', 'files', 'KB'])
+        print()
+
+        shutil.rmtree(flat_root)
+        shutil.rmtree(hashed_root)
+        os.makedirs(os.path.join(flat_root, 'post_photos'))
+
+        lookups = []
+        for index in range(FILE_COUNT):
+            content = ContentFile(f'photo {index}'.encode())
+            name = f'post_photos/photo_{index}.jpg'
+            with open(flat.path(name), 'wb') as file:
+                file.write(content.read())
+            hashed_name = hashed.save(content_name(hash_file(content), name), content)
+            if index % 1000 == 0:
+                lookups.append((name, hashed_name))
+
+        rows = []
+        for title, storage, position in (('flat', flat, 0), ('content hash', hashed, 1)):
+            start = time.perf_counter()
+            for pair in lookups:
+                storage.exists(pair[position])
+            lookup_us = (time.perf_counter() - start) * 1e6 / len(lookups)
+            top = storage.path('post_photos')
+            rows.append([title, len(os.listdir(top)), f'{listing_ms(top):.2f}', f'{lookup_us:.1f}'])
+        report(f'{FILE_COUNT} разных файлов', rows, ['storage', 'entries in post_photos/', 'listdir ms', 'exists us'])
+    finally:
+        shutil.rmtree(flat_root, ignore_errors=True)
+        shutil.rmtree(hashed_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
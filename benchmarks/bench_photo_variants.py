@@ -0,0 +1,67 @@
+"""
+Обработка фото постов: время сохранения в запросе, время фоновой обработки
+и вес фото в ленте ( оригиналы против копий шириной 640px из srcset ).
+
+Используются примеры из media/post_photos, файлы копируются во временный MEDIA_ROOT.
+
+    python -m benchmarks.bench_photo_variants
+"""
+
+import os
+import shutil
+import tempfile
+from benchmarks import setup_django, timer, report
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files import File
+    from django.test import override_settings
+    from user.models import Photo
+    from user.photos import process_pending_photos
+
+    source = os.path.join(settings.BASE_DIR, 'media', 'post_photos')
+    names = sorted(name for name in os.listdir(source) if os.path.isfile(os.path.join(source, name)))
+    media_root = tempfile.mkdtemp()
+
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            timings = {}
+            with timer(timings, 'upload'):
+                for name in names:
+                    with open(os.path.join(source, name), 'rb') as file:
+                        Photo.objects.create(image=File(file, name=name))
+
+            with timer(timings, 'process'):
+                while process_pending_photos():
+                    pass
+
+            rows = []
+            original_total = card_total = 0
+            for photo in Photo.objects.order_by('id'):
+                original = photo.image.size
+                card = min(
+                    (variant for variant in photo.variants if variant['width'] <= 640 and variant.get('format') == 'jpeg'),
+                    key=lambda variant: abs(640 - variant['width']),
+                    default=None
+                )
+                card_size = card['size'] if card else original
+                original_total += original
+                card_total += card_size
+                rows.append([photo.image.name.rsplit('/', 1)[-1][:40], original // 1024, card_size // 1024])
+
+            rows.append(['total', original_total // 1024, card_total // 1024])
+            report('Вес фото в карточке ленты ( КБ )', rows, ['photo', 'original', 'card'])
+            print()
+            print(f"Сохранение {len(names)} фото в запросе: {timings['upload'] * 1000:.1f} мс")
+            print(f"Фоновая обработка: {timings['process'] * 1000:.1f} мс "
+                  f"({timings['process'] * 1000 / len(names):.1f} мс на фото)")
+            print(f"Вес карточек: {card_total / original_total:.0%} от оригиналов")
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
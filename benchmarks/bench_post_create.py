@@ -0,0 +1,86 @@
+"""
+Задержка создания поста в зависимости от числа профилей.
+
+Инвалидация кеша через поколения ( travel/cache_versions.py ) не зависит от количества
+пользователей, раскладка поста по лентам ( user/feed.py ) вынесена в воркер, в запросе
+остается постановка в очередь. Профили интересуются одной из COUNTRY_COUNT стран, посты
+публикуются по этим же странам: число получателей растет, а задержка создания поста
+должна оставаться постоянной ( не больше LATENCY_GROWTH раз между первым и последним шагом ).
+Время воркера выводится отдельной колонкой.
+
+    python -m benchmarks.bench_post_create
+"""
+
+import statistics
+import time
+from benchmarks import setup_django, report
+
+
+PROFILE_COUNTS = [100, 1_000, 10_000, 100_000]
+POSTS_PER_STEP = 50
+COUNTRY_COUNT = 10
+LATENCY_GROWTH = 3
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from country.models import Country
+    from user.feed import process_feed_tasks
+    from user.models import FeedEntry, Post, Profile
+
+    author = User.objects.create_user(username='bench_author', password='bench')
+    Profile.objects.create(user=author)
+    countries = Country.objects.bulk_create([
+        Country(name=f'bench country {index}', alpha3_code=f'BE{index}') for index in range(COUNTRY_COUNT)
+    ])
+    interests = Profile.countries_interest.through
+
+    rows = []
+    medians = []
+    created = 0
+    for profile_count in PROFILE_COUNTS:
+        users = [User(username=f'bench_{index}') for index in range(created, profile_count)]
+        User.objects.bulk_create(users, batch_size=5000)
+        new_users = User.objects.filter(username__startswith='bench_', profile__isnull=True).exclude(id=author.id)
+        profiles = Profile.objects.bulk_create(
+            [Profile(user_id=user_id) for user_id in new_users.values_list('id', flat=True)], batch_size=5000
+        )
+        interests.objects.bulk_create([
+            interests(profile_id=profile.id, country_id=countries[index % COUNTRY_COUNT].id)
+            for index, profile in enumerate(profiles)
+        ], batch_size=5000)
+        created = profile_count
+
+        timings = []
+        entries = FeedEntry.objects.count()
+        for index in range(POSTS_PER_STEP):
+            start = time.perf_counter()
+            post = Post.objects.create(author=author, subject=f'bench {index}', body='bench body')
+            post.countries.set([countries[index % COUNTRY_COUNT]])
+            timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        while process_feed_tasks():
+            pass
+        worker = (time.perf_counter() - start) * 1000 / POSTS_PER_STEP
+
+        rows.append([
+            Profile.objects.count(),
+            (FeedEntry.objects.count() - entries) // POSTS_PER_STEP,
+            f'{statistics.median(timings):.2f}',
+            f'{max(timings):.2f}',
+            f'{worker:.2f}',
+        ])
+        medians.append(statistics.median(timings))
+
+    report('Создание поста ( мс )', rows, ['profiles', 'recipients', 'median', 'max', 'worker per post'])
+
+    assert medians[-1] <= medians[0] * LATENCY_GROWTH, (
+        f'создание поста растет с числом профилей: {medians[0]:.2f} -> {medians[-1]:.2f} мс'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Время поиска постов по таблице FTS5 на миллионе постов.
+
+Тексты постов собираются из синтетического словаря с частотами по закону Ципфа, поэтому
+в выдаче есть и редкие слова, и слова из десятков тысяч постов. Для каждого запроса
+замеряется первая страница выдачи ( BM25 ) и пятая страница по курсору.
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+from benchmarks import setup_django, report, timer
+
+
+POST_COUNT = 1_000_000
+BATCH_SIZE = 10_000
+VOCABULARY_SIZE = 20_000
+PER_PAGE = 10
+REPEAT = 20
+
+CONSONANTS = 'бвгдзклмнпрстфхч'
+VOWELS = 'аеиоуя'
+ENDINGS = ['а', 'ы', 'ой', 'ами', 'ах', 'ом', 'е', 'у']
+
+
+def make_vocabulary(rnd):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rnd.choice(CONSONANTS) + rnd.choice(VOWELS) for index in range(rnd.randint(2, 3))) + 'н')
+
+    return sorted(words)
+
+
+def main():
+    setup_django(os.path.join(tempfile.mkdtemp(), 'bench_search.sqlite3'))
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import RequestFactory
+    from user.listing import CURSOR_PARAM
+    from user.models import Post
+    from user.search import get_search_page, match_query, rebuild_search_index
+
+    rnd = random.Random(1)
+    vocabulary = make_vocabulary(rnd)
+    weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+
+    def text(count):
+        return ' '.join(word + rnd.choice(ENDINGS) for word in rnd.choices(vocabulary, cum_weights=weights, k=count))
+
+    author = User.objects.create_user(username='bench_author', password='bench')
+    timings = {}
+    with timer(timings, 'posts'):
+        for offset in range(0, POST_COUNT, BATCH_SIZE):
+            Post.objects.bulk_create([
+                Post(author=author, subject=text(3), body=text(15)) for index in range(BATCH_SIZE)
+            ])
+
+    with timer(timings, 'index'):
+        rebuild_search_index()
+
+    print(f"posts: {timings['posts']:.0f} s, rebuild_search_index: {timings['index']:.0f} s")
+
+    queries = [
+        ('common word', vocabulary[5] + 'а'),
+        ('frequent word', vocabulary[100] + 'ами'),
+        ('rare word', vocabulary[10_000] + 'у'),
+        ('two words', f'{vocabulary[20]}ах {vocabulary[50]}е'),
+        ('prefix', vocabulary[300][:4] + '*'),
+    ]
+    factory = RequestFactory()
+
+    def page_ms(query, cursor=None):
+        request = factory.get('/search/', {CURSOR_PARAM: cursor} if cursor else {})
+        start = time.perf_counter()
+        page = get_search_page(request, query, PER_PAGE)
+        return (time.perf_counter() - start) * 1000, page
+
+    rows = []
+    for name, query in queries:
+        first = [page_ms(query)[0] for index in range(REPEAT)]
+
+        cursor = None
+        for index in range(4):
+            cursor = page_ms(query, cursor)[1].next_cursor
+        fifth = [page_ms(query, cursor)[0] for index in range(REPEAT)]
+
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(
+                'SELECT count(*) FROM user_post_search WHERE user_post_search MATCH %s', [match_query(query)]
+            )
+            matches = db_cursor.fetchone()[0]
+
+        rows.append([
+            name, query, matches, f'{statistics.median(first):.1f}', f'{max(first):.1f}',
+            f'{statistics.median(fifth):.1f}', f'{max(fifth):.1f}'
+        ])
+
+    report(
+        f'Поиск, мс ( {POST_COUNT} постов )', rows,
+        ['query', 'text', 'matches', 'page 1 median', 'page 1 max', 'page 5 median', 'page 5 max']
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Конкурентная нагрузка на файловую базу SQLite.
+
+Писатели голосуют за посты и пишут комментарии, читатели листают ленту ( через
+тестовый клиент, полный путь запроса с сессиями ), планировщик поднимает посты
+за день за днем - каждый в своем процессе, как контейнеры docker-compose.
+Сравниваются настройки SQLite
+по умолчанию ( журнал DELETE, новое соединение на каждый запрос, BEGIN DEFERRED )
+и настройки из travel/settings.py ( WAL, busy_timeout, mmap, CONN_MAX_AGE, BEGIN IMMEDIATE ).
+
+    python -m benchmarks.bench_sqlite_concurrency
+"""
+
+import multiprocessing
+import os
+import random
+import tempfile
+from copy import deepcopy
+from datetime import date, timedelta
+from benchmarks import setup_django, report
+
+
+POST_COUNT = 2_000
+WRITERS = 4
+READERS = 4
+LIFT_COUNT = 200
+DURATION = 10
+
+
+def main():
+    database_name = os.path.join(tempfile.mkdtemp(), 'bench_concurrency.sqlite3')
+    setup_django(database_name)
+
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, connection
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+    from user.lifts import run_lifts
+    from user.models import AutoPostLift, FeedEntry, Post, Profile
+
+    users = [
+        User.objects.create_user(username=f'bench_{index}', password='bench') for index in range(WRITERS + READERS)
+    ]
+    Profile.objects.bulk_create([Profile(user=user) for user in users])
+
+    Post.objects.bulk_create([
+        Post(author=users[index % len(users)], subject=f'bench {index}', body='bench body', last_lifted_at=timezone.now())
+        for index in range(POST_COUNT)
+    ])
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    FeedEntry.objects.bulk_create([
+        FeedEntry(user=user, post_id=post_id, lifted_at=timezone.now())
+        for user in users[WRITERS:] for post_id in post_ids
+    ])
+    start_day = date(2024, 1, 1)
+    AutoPostLift.objects.bulk_create([
+        AutoPostLift(post_id=post_id, start_date=start_day, end_date=start_day + timedelta(days=3650))
+        for post_id in post_ids[:LIFT_COUNT]
+    ])
+
+    tuned = {
+        'OPTIONS': deepcopy(connection.settings_dict['OPTIONS']),
+        'CONN_MAX_AGE': connection.settings_dict['CONN_MAX_AGE'],
+    }
+    scenarios = [
+        ('default', {'OPTIONS': {}, 'CONN_MAX_AGE': 0}, 'DELETE'),
+        ('tuned', tuned, None),
+    ]
+
+    def writer(user, stop, results):
+        client = Client()
+        client.force_login(user)
+        rnd = random.Random(user.id)
+        counts = {'writes': 0, 'reads': 0, 'locked': 0}
+        while not stop.is_set():
+            post_id = rnd.choice(post_ids)
+            try:
+                if rnd.random() < 0.5:
+                    client.post(reverse(rnd.choice(['increase_rating', 'downgrade_rating']), args=[post_id]))
+                else:
+                    client.post(reverse('add_comment', args=[post_id]), {'body': 'bench comment'})
+                counts['writes'] += 1
+            except OperationalError:
+                counts['locked'] += 1
+        results.put(counts)
+
+    def reader(user, stop, results):
+        client = Client()
+        client.force_login(user)
+        counts = {'writes': 0, 'reads': 0, 'locked': 0}
+        while not stop.is_set():
+            try:
+                client.get(reverse('index'))
+                counts['reads'] += 1
+            except OperationalError:
+                counts['locked'] += 1
+        results.put(counts)
+
+    def scheduler(offset, stop, results):
+        counts = {'writes': 0, 'reads': 0, 'locked': 0}
+        day = start_day + timedelta(days=offset)
+        while not stop.is_set():
+            day += timedelta(days=1)
+            try:
+                run_lifts(day)
+                counts['writes'] += 1
+            except OperationalError:
+                counts['locked'] += 1
+        results.put(counts)
+
+    context = multiprocessing.get_context('fork')
+    rows = []
+    for offset, (name, database_settings, journal_mode) in enumerate(scenarios):
+        connection.settings_dict.update(deepcopy(database_settings))
+        connection.close()
+        if journal_mode:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+            connection.close()
+
+        stop = context.Event()
+        results = context.Queue()
+        workers = [(writer, user) for user in users[:WRITERS]] + [(reader, user) for user in users[WRITERS:]]
+        processes = [context.Process(target=target, args=(user, stop, results)) for target, user in workers]
+        processes.append(context.Process(target=scheduler, args=(offset * 1000, stop, results)))
+
+        for process in processes:
+            process.start()
+        stop.wait(DURATION)
+        stop.set()
+        counts = [results.get() for process in processes]
+        for process in processes:
+            process.join()
+
+        totals = {key: sum(count[key] for count in counts) for key in ('writes', 'reads', 'locked')}
+        rows.append([
+            name,
+            f"{totals['writes'] / DURATION:.1f}",
+            f"{totals['reads'] / DURATION:.1f}",
+            totals['locked'],
+        ])
+
+    report(
+        f'{WRITERS} писателя, {READERS} читателя и планировщик, {DURATION} с на сценарий',
+        rows, ['settings', 'writes/s', 'reads/s', 'locked']
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from decouple import config
 from django.contrib import admin, messages
 from django.http import HttpResponseRedirect
 from .models import Country
+from .sync import fetch_countries, sync_countries
 from django.urls import path
 
 
@@ -16,40 +17,23 @@ class CountryAdmin(admin.ModelAdmin):
         функция работает при нажати кнопки обноаить базу в админ панели  ( модель страны )
         """
 
-        url = 'https://api.countrylayer.com/v2/all'
-        api_key = config('APIKEY')
-        col = 0
-
-        params = {
-            'access_key': api_key
-        }
-
-        response = requests.get(url, params=params)
-
-        if response.status_code == 200:
-            countries = response.json()
-            for country in countries:
-                models_country, created = Country.objects.get_or_create(
-                    name=country['name'],
-                    top_level_domain=country['topLevelDomain'],
-                    alpha2_code=country['alpha2Code'],
-                    alpha3_code=country['alpha3Code'],
-                    calling_code=country['callingCodes'],
-                    capital=country['capital'],
-                    alt_spellings=country['altSpellings'],
-                    region=country['region']
-                )
-                if created:
-                    col += 1
-
-            if col > 0:
-                messages.success(request, f"Новые страны добавлены в базу данных ({col}).")
-
-            else:
-                messages.info(request, "Новых данных не обнаружено")
+        try:
+            countries = fetch_countries(config('APIKEY'))
+        except requests.RequestException:
+            messages.info(request, "Функция временно недоступно")
+            return HttpResponseRedirect(request.META.get('HTTP_REFERER', '/admin'))
+
+        stats = sync_countries(countries)
+
+        if stats['inserted'] or stats['updated']:
+            messages.success(
+                request,
+                f"Страны обновлены: добавлено {stats['inserted']}, изменено {stats['updated']}, "
+                f"без изменений {stats['unchanged']}."
+            )
 
         else:
-            messages.info(request, "Функция временно недоступно")
+            messages.info(request, "Новых данных не обнаружено")
 
         return HttpResponseRedirect(request.META.get('HTTP_REFERER', '/admin'))
 
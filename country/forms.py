@@ -0,0 +1,24 @@
+from django import forms
+from .models import Country
+from .registry import get_registry
+
+
+class CountryMultipleChoiceField(forms.MultipleChoiceField):
+    """
+    выбор стран из реестра: варианты и проверка без запросов к базе,
+    в cleaned_data - список объектов Country
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('choices', lambda: get_registry().choices())
+        super().__init__(**kwargs)
+
+    def prepare_value(self, value):
+        if value is None:
+            return value
+        return [country.pk if isinstance(country, Country) else country for country in value]
+
+    def clean(self, value):
+        ids = super().clean(value)
+        registry = get_registry()
+        return [registry.get(country_id) for country_id in ids]
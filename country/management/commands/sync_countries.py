@@ -0,0 +1,28 @@
+import requests
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+from ...sync import fetch_countries, load_countries, sync_countries
+
+
+class Command(BaseCommand):
+    help = 'Synchronizes countries with api.countrylayer.com or a local JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='JSON file in the countrylayer API format instead of the API')
+
+    def handle(self, *args, **options):
+        if options['file']:
+            try:
+                countries = load_countries(options['file'])
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Cannot read {options["file"]}: {error}')
+        else:
+            try:
+                countries = fetch_countries(config('APIKEY'))
+            except requests.RequestException as error:
+                raise CommandError(f'Countries API is unavailable: {error}')
+
+        stats = sync_countries(countries)
+        self.stdout.write(self.style.SUCCESS(
+            f"Countries inserted: {stats['inserted']}, updated: {stats['updated']}, unchanged: {stats['unchanged']}"
+        ))
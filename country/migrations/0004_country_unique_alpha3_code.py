@@ -0,0 +1,57 @@
+# Generated by Django 5.1.2 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+def merge_duplicate_countries(apps, schema_editor):
+    """
+    у повторяющегося alpha3_code остается страна с наименьшим id ( ее же выбирала
+    синхронизация ), связи постов и профилей с дублями переносятся на нее
+    """
+    Country = apps.get_model('country', 'Country')
+    Post = apps.get_model('user', 'Post')
+    Profile = apps.get_model('user', 'Profile')
+
+    kept = {}
+    duplicates = {}
+    for country_id, code in Country.objects.exclude(alpha3_code='').order_by('id').values_list('id', 'alpha3_code'):
+        if code in kept:
+            duplicates[country_id] = kept[code]
+        else:
+            kept[code] = country_id
+
+    if not duplicates:
+        return
+
+    for through, owner in ((Post.countries.through, 'post_id'), (Profile.countries_interest.through, 'profile_id')):
+        links = through.objects.filter(country_id__in=duplicates)
+        through.objects.bulk_create(
+            [
+                through(**{owner: owner_id, 'country_id': duplicates[country_id]})
+                for owner_id, country_id in links.values_list(owner, 'country_id')
+            ],
+            ignore_conflicts=True
+        )
+        links.delete()
+
+    Country.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('country', '0003_alter_country_alpha2_code_alter_country_alpha3_code'),
+        ('user', '0009_alter_post_countries'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_countries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='country',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('alpha3_code', ''), _negated=True),
+                fields=('alpha3_code',),
+                name='country_unique_alpha3_code',
+            ),
+        ),
+    ]
@@ -17,3 +17,9 @@ class Country(models.Model):
     class Meta:
         verbose_name = 'Страна'
         verbose_name_plural = 'Страны'
+        constraints = [
+            # по alpha3_code синхронизируются страны ( country/sync.py ), пустой код не уникален
+            models.UniqueConstraint(
+                fields=['alpha3_code'], condition=~models.Q(alpha3_code=''), name='country_unique_alpha3_code'
+            ),
+        ]
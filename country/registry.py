@@ -0,0 +1,120 @@
+"""
+Реестр стран в памяти процесса.
+
+Страны почти не меняются, поэтому все ~250 записей загружаются один раз и дальше
+ищутся по словарям ( id, alpha2_code, alpha3_code, название и альтернативные написания ).
+Реестр перечитывается, только когда меняется поколение "countries"
+( его увеличивают синхронизация стран и сохранение страны в админке ). Поколение читается
+из кеша не чаще раза в REGISTRY_CHECK_INTERVAL секунд, поэтому другие процессы видят
+изменение стран с этой задержкой, процесс, который их изменил, - сразу ( reload_registry ).
+Объекты Country в реестре общие для всех запросов процесса - их нельзя изменять.
+"""
+
+import ast
+from time import monotonic
+from travel.cache_versions import bump_generation, get_generations
+from .models import Country
+
+
+REGISTRY_NAMESPACE = 'countries'
+REGISTRY_CHECK_INTERVAL = 5
+
+
+def split_spellings(alt_spellings):
+    """
+    альтернативные написания из строки вида "['AF', 'Afġānistān']"
+    """
+    try:
+        spellings = ast.literal_eval(alt_spellings)
+    except (ValueError, SyntaxError):
+        spellings = alt_spellings.split(',')
+
+    if isinstance(spellings, str):
+        spellings = [spellings]
+
+    return [str(spelling).strip() for spelling in spellings if str(spelling).strip()]
+
+
+class CountryRegistry:
+    def __init__(self, countries, version=None):
+        self.version = version
+        self.countries = tuple(countries)
+        self.by_id = {country.id: country for country in self.countries}
+        self.by_alpha2 = {}
+        self.by_alpha3 = {}
+        self.by_name = {}
+
+        for country in self.countries:
+            if country.alpha2_code:
+                self.by_alpha2.setdefault(country.alpha2_code.upper(), country)
+            if country.alpha3_code:
+                self.by_alpha3.setdefault(country.alpha3_code.upper(), country)
+
+        # название важнее альтернативного написания другой страны
+        for country in self.countries:
+            self.by_name.setdefault(country.name.casefold(), country)
+        for country in self.countries:
+            for spelling in split_spellings(country.alt_spellings):
+                self.by_name.setdefault(spelling.casefold(), country)
+
+    def __iter__(self):
+        return iter(self.countries)
+
+    def __len__(self):
+        return len(self.countries)
+
+    def get(self, country_id):
+        try:
+            return self.by_id.get(int(country_id))
+        except (TypeError, ValueError):
+            return None
+
+    def by_code(self, code):
+        """
+        страна по двух- или трехбуквенному коду
+        """
+        code = (code or '').upper()
+        return self.by_alpha3.get(code) or self.by_alpha2.get(code)
+
+    def lookup(self, name):
+        """
+        страна по названию или альтернативному написанию ( без учета регистра )
+        """
+        return self.by_name.get((name or '').strip().casefold())
+
+    def choices(self):
+        return [(country.id, country.name) for country in self.countries]
+
+
+_registry = None
+_checked_at = None
+
+
+def get_registry():
+    """
+    актуальный реестр стран ( база читается только после смены поколения )
+    """
+    global _registry, _checked_at
+
+    registry = _registry
+    now = monotonic()
+    if registry is not None and _checked_at is not None and now - _checked_at < REGISTRY_CHECK_INTERVAL:
+        return registry
+
+    version = get_generations(REGISTRY_NAMESPACE)[0]
+    if registry is None or registry.version != version:
+        registry = CountryRegistry(Country.objects.order_by('id'), version)
+        _registry = registry
+    _checked_at = now
+
+    return registry
+
+
+def reload_registry():
+    """
+    после изменения стран: реестры всех процессов перечитываются, этого - при следующем обращении
+    """
+    global _checked_at
+
+    bump_generation(REGISTRY_NAMESPACE)
+    _checked_at = None
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Country
+from .registry import reload_registry
+
+
+@receiver([post_save, post_delete], sender=Country)
+def bump_country_registry(sender, instance, **kwargs):
+    """
+    изменение страны - реестры стран во всех процессах перечитываются
+    """
+    reload_registry()
@@ -0,0 +1,113 @@
+"""
+Синхронизация стран с api.countrylayer.com ( или локальным json-файлом в том же формате ).
+
+Существующие страны загружаются одним запросом в словарь по alpha3_code ( уникален, кроме
+пустого ), изменения вычисляются в памяти и применяются одним bulk_create и одним
+bulk_update в транзакции.
+Измененная страна ( например, новая столица ) обновляется, а не создается повторно,
+после изменений реестры стран ( country/registry.py ) перечитываются, посты переименованных
+стран переиндексируются для поиска ( bulk_update не отправляет сигналы ).
+"""
+
+import json
+import requests
+from django.db import transaction
+from user.models import Post
+from user.search import index_posts
+from .models import Country
+from .registry import reload_registry
+
+
+COUNTRIES_API_URL = 'https://api.countrylayer.com/v2/all'
+
+API_FIELDS = {
+    'name': 'name',
+    'top_level_domain': 'topLevelDomain',
+    'alpha2_code': 'alpha2Code',
+    'alpha3_code': 'alpha3Code',
+    'calling_code': 'callingCodes',
+    'capital': 'capital',
+    'alt_spellings': 'altSpellings',
+    'region': 'region',
+}
+
+
+def fetch_countries(api_key, timeout=30):
+    """
+    список стран из api ( requests.RequestException при недоступности )
+    """
+    response = requests.get(COUNTRIES_API_URL, params={'access_key': api_key}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def load_countries(path):
+    """
+    список стран из json-файла в формате api
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def country_fields(row):
+    """
+    значения полей Country из строки api ( списки хранятся строкой, как и раньше )
+    """
+    return {
+        field: str(row.get(key) or '')
+        for field, key in API_FIELDS.items()
+    }
+
+
+def sync_countries(rows):
+    """
+    добавляет новые и обновляет измененные страны,
+    возвращает статистику {'inserted', 'updated', 'unchanged'}
+    """
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    update_fields = [field for field in API_FIELDS if field != 'alpha3_code']
+
+    with transaction.atomic():
+        existing = {country.alpha3_code: country for country in Country.objects.exclude(alpha3_code='')}
+
+        to_create = {}
+        to_update = {}
+        renamed = set()
+        for row in rows:
+            fields = country_fields(row)
+            code = fields['alpha3_code']
+            if not code:
+                continue
+
+            country = existing.get(code)
+            if country is None:
+                to_create[code] = Country(**fields)
+                continue
+
+            if country.name != fields['name']:
+                renamed.add(country.id)
+
+            changed = False
+            for field in update_fields:
+                if getattr(country, field) != fields[field]:
+                    setattr(country, field, fields[field])
+                    changed = True
+
+            if changed:
+                to_update[code] = country
+            elif code not in to_update:
+                stats['unchanged'] += 1
+
+        Country.objects.bulk_create(to_create.values())
+        Country.objects.bulk_update(to_update.values(), update_fields)
+
+        if renamed:
+            index_posts(Post.objects.filter(countries__in=renamed).values_list('id', flat=True).distinct())
+
+    stats['inserted'] = len(to_create)
+    stats['updated'] = len(to_update)
+
+    if to_create or to_update:
+        reload_registry()
+
+    return stats
@@ -1,13 +1,17 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
 from user.models import Profile
 from .models import Country
 from user.permissions import check_user_blocked
-from django.core.cache import cache
+from travel.cache_versions import versioned_key
+from user.listing import get_cached_page
+from django.http import Http404
+from .registry import get_registry
+from travel.db_router import read_replica
 
 
 @login_required
+@read_replica()
 def country_list_view(request):
     """
     Список стран, связанных с постами
@@ -21,11 +25,14 @@ def country_list_view(request):
 
     active_link = 'countries'
 
-    cache_key_countries = "countries_with_posts"
-    countries_with_posts = cache.get(cache_key_countries)
-    if not countries_with_posts:
-        countries_with_posts = Country.objects.filter(post__isnull=False).distinct().order_by('name')
-        cache.set(cache_key_countries, countries_with_posts, timeout=60*10)
+    page_obj = get_cached_page(
+        request,
+        versioned_key("countries_with_posts", "feed"),
+        Country.objects.filter(post__isnull=False).distinct().order_by('name'),
+        Country.objects.all(),
+        per_page=20,
+        timeout=60*10
+    )
 
     if request.user.is_authenticated:
         profile = get_object_or_404(Profile, user=request.user)
@@ -33,10 +40,6 @@ def country_list_view(request):
     else:
         user_countries_interest = []
 
-    paginator = Paginator(countries_with_posts, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
     context = {
         'active_link': active_link,
         'countries': page_obj,
@@ -58,8 +61,9 @@ def toggle_country_interest(request, country_id):
     if blocked_response:
         return blocked_response
 
-    country = get_object_or_404(Country, id=country_id)
-    profile = get_object_or_404(Profile, user=request.user)
+    country = get_registry().get(country_id)
+    if country is None:
+        raise Http404
 
     if country in profile.countries_interest.all():
         profile.countries_interest.remove(country)
@@ -70,6 +74,7 @@ def toggle_country_interest(request, country_id):
 
 
 @login_required
+@read_replica()
 def country_detail_view(request, country_id):
     """
     Подробная информация о стране
@@ -83,16 +88,14 @@ def country_detail_view(request, country_id):
 
     active_link = 'country_detail_view'
 
-    cache_key_country = f"country_detail_{country_id}"
-    country = cache.get(cache_key_country)
-
-    if not country:
-        country = get_object_or_404(Country, id=country_id)
-        cache.set(cache_key_country, country, timeout=60*5)
+    country = get_registry().get(country_id)
+    if country is None:
+        raise Http404
 
     if request.user.is_authenticated:
-        profile = get_object_or_404(Profile, user=request.user)
-        user_countries_interest = profile.countries_interest.values_list('id', flat=True)
+        user_countries_interest = Profile.countries_interest.through.objects.filter(
+            profile=profile
+        ).values_list('country_id', flat=True)
     else:
         user_countries_interest = []
 
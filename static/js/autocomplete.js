@@ -0,0 +1,99 @@
+// Поля выбора стран и тегов ( AutocompleteSelectMultiple ): подсказки с сервера при вводе,
+// выбранные варианты хранятся скрытыми полями формы.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.autocomplete').forEach(function(widget) {
+        const input = widget.querySelector('.autocomplete-input');
+        const results = widget.querySelector('.autocomplete-results');
+        let timer = null;
+        let request = 0;
+
+        function selectedIds() {
+            return Array.from(widget.querySelectorAll('input[type="hidden"]')).map(hidden => hidden.value);
+        }
+
+        function addChip(id, label) {
+            if (selectedIds().includes(String(id))) {
+                return;
+            }
+            const chip = document.createElement('span');
+            chip.className = 'autocomplete-chip';
+            chip.textContent = label;
+
+            const hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = widget.dataset.name;
+            hidden.value = id;
+
+            const remove = document.createElement('button');
+            remove.type = 'button';
+            remove.className = 'autocomplete-remove';
+            remove.setAttribute('aria-label', 'Убрать');
+            remove.innerHTML = '&times;';
+
+            chip.append(hidden, remove);
+            widget.insertBefore(chip, input);
+        }
+
+        function showResults(items) {
+            results.innerHTML = '';
+            const selected = selectedIds();
+            items.filter(item => !selected.includes(String(item.id))).forEach(function(item) {
+                const option = document.createElement('li');
+                option.textContent = item.label;
+                option.addEventListener('mousedown', function(event) {
+                    event.preventDefault();
+                    addChip(item.id, item.label);
+                    input.value = '';
+                    results.innerHTML = '';
+                });
+                results.append(option);
+            });
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (!query) {
+                results.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(function() {
+                const current = ++request;
+                fetch(widget.dataset.url + '&q=' + encodeURIComponent(query))
+                    .then(response => response.json())
+                    .then(data => {
+                        // ответ на устаревший запрос не показывается
+                        if (current === request) {
+                            showResults(data.results);
+                        }
+                    })
+                    .catch(error => console.error('Ошибка:', error));
+            }, 150);
+        });
+
+        input.addEventListener('keydown', function(event) {
+            if (event.key === 'Enter') {
+                event.preventDefault();
+                const first = results.querySelector('li');
+                if (first) {
+                    first.dispatchEvent(new MouseEvent('mousedown'));
+                }
+            } else if (event.key === 'Backspace' && !input.value) {
+                const chips = widget.querySelectorAll('.autocomplete-chip');
+                if (chips.length) {
+                    chips[chips.length - 1].remove();
+                }
+            }
+        });
+
+        input.addEventListener('blur', function() {
+            results.innerHTML = '';
+        });
+
+        widget.addEventListener('click', function(event) {
+            if (event.target.classList.contains('autocomplete-remove')) {
+                event.target.closest('.autocomplete-chip').remove();
+            }
+        });
+    });
+});
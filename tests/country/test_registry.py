@@ -0,0 +1,128 @@
+from unittest.mock import patch
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from country.models import Country
+from country.registry import REGISTRY_CHECK_INTERVAL, REGISTRY_NAMESPACE, get_registry
+from user.forms import PostForm
+from travel.cache_versions import bump_generation
+from user.models import Profile
+
+
+class CountryRegistryTestCase(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(
+            name='Afghanistan',
+            alpha2_code='AF',
+            alpha3_code='AFG',
+            alt_spellings="['AF', 'Afġānistān']"
+        )
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_lookups(self):
+        """поиск страны по id, кодам, названию и альтернативному написанию"""
+
+        registry = get_registry()
+
+        self.assertEqual(registry.get(self.country.id), self.country)
+        self.assertEqual(registry.get(str(self.country.id)), self.country)
+        self.assertEqual(registry.by_code('afg'), self.country)
+        self.assertEqual(registry.by_code('AF'), self.country)
+        self.assertEqual(registry.lookup('afghanistan'), self.country)
+        self.assertEqual(registry.lookup('Afġānistān'), self.country)
+        self.assertIsNone(registry.get('unknown'))
+
+    def test_loaded_once(self):
+        """реестр не обращается к базе, пока страны не изменились"""
+
+        get_registry()
+
+        with self.assertNumQueries(0):
+            get_registry().get(self.country.id)
+
+    def test_reload_on_change(self):
+        """сохранение страны перечитывает реестр"""
+
+        get_registry()
+        self.country.capital = 'Kabul'
+        self.country.save()
+
+        self.assertEqual(get_registry().get(self.country.id).capital, 'Kabul')
+
+    def test_generation_checked_once_per_interval(self):
+        """поколение читается из кеша не чаще раза в REGISTRY_CHECK_INTERVAL секунд"""
+
+        with patch('country.registry.monotonic', return_value=1000):
+            get_registry()
+
+        Country.objects.filter(pk=self.country.pk).update(capital='Kabul')
+        bump_generation(REGISTRY_NAMESPACE)
+
+        with patch('country.registry.get_generations') as get_generations, \
+                patch('country.registry.monotonic', return_value=1000 + REGISTRY_CHECK_INTERVAL - 1):
+            self.assertEqual(get_registry().get(self.country.id).capital, '')
+        get_generations.assert_not_called()
+
+        with patch('country.registry.monotonic', return_value=1000 + REGISTRY_CHECK_INTERVAL):
+            self.assertEqual(get_registry().get(self.country.id).capital, 'Kabul')
+
+    def test_form_choices_without_queries(self):
+        """выбор стран в форме поста рендерится и проверяется без запросов"""
+
+        get_registry()
+
+        with self.assertNumQueries(0):
+            form = PostForm(data={'countries': [str(self.country.id)]})
+            html = str(form['countries'])
+            countries = form.fields['countries'].clean([str(self.country.id)])
+
+        self.assertIn('Afghanistan', html)
+        self.assertEqual(countries, [self.country])
+
+
+class CountryPagesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        Profile.objects.create(user=self.user)
+        self.client.login(username='testuser', password='testpassword')
+        self.country = Country.objects.create(name='Albania', alpha2_code='AL', alpha3_code='ALB')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def assertNoCountryQueries(self, url):
+        get_registry()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            self.assertNotIn('"country_country"', query['sql'])
+
+    def test_country_detail(self):
+        """страница страны рендерится без запросов к таблице стран"""
+
+        self.assertNoCountryQueries(reverse('country_detail', args=[self.country.id]))
+
+    def test_posts_by_country(self):
+        """посты страны рендерятся без запросов к таблице стран"""
+
+        self.assertNoCountryQueries(reverse('posts_by_country', args=[self.country.id]))
+
+    def test_unknown_country(self):
+        """несуществующая страна - 404"""
+
+        response = self.client.get(reverse('country_detail', args=[self.country.id + 1000]))
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,83 @@
+import os
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from country.models import Country
+from country.sync import load_countries, sync_countries
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'countries.json')
+
+
+class CountrySyncTestCase(TestCase):
+    def setUp(self):
+        self.rows = load_countries(FIXTURE)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_insert(self):
+        """новые страны добавляются, списки хранятся строкой как раньше"""
+
+        stats = sync_countries(self.rows)
+
+        self.assertEqual(stats, {'inserted': 3, 'updated': 0, 'unchanged': 0})
+        afghanistan = Country.objects.get(alpha3_code='AFG')
+        self.assertEqual(afghanistan.calling_code, "['93']")
+        self.assertEqual(afghanistan.alt_spellings, "['AF', 'Afġānistān']")
+
+    def test_rerun_unchanged(self):
+        """повторная синхронизация ничего не меняет"""
+
+        sync_countries(self.rows)
+
+        stats = sync_countries(self.rows)
+
+        self.assertEqual(stats, {'inserted': 0, 'updated': 0, 'unchanged': 3})
+        self.assertEqual(Country.objects.count(), 3)
+
+    def test_changed_field_updates_row(self):
+        """измененная страна обновляется, а не создается повторно"""
+
+        sync_countries(self.rows)
+        bolivia = Country.objects.get(alpha3_code='BOL')
+        self.rows[2]['capital'] = 'La Paz'
+
+        stats = sync_countries(self.rows)
+
+        self.assertEqual(stats, {'inserted': 0, 'updated': 1, 'unchanged': 2})
+        self.assertEqual(Country.objects.filter(alpha3_code='BOL').count(), 1)
+        bolivia.refresh_from_db()
+        self.assertEqual(bolivia.capital, 'La Paz')
+
+    def test_query_count(self):
+        """один select и один insert в транзакции, независимо от числа стран"""
+
+        with self.assertNumQueries(4):
+            sync_countries(self.rows)
+
+    def test_command_file(self):
+        """sync_countries --file синхронизирует страны из локального файла"""
+
+        out = StringIO()
+        call_command('sync_countries', '--file', FIXTURE, stdout=out)
+
+        self.assertEqual(Country.objects.count(), 3)
+        self.assertIn('inserted: 3', out.getvalue())
+
+    def test_alpha3_code_is_unique(self):
+        """повторный alpha3_code не сохраняется, пустых кодов может быть несколько"""
+
+        sync_countries(self.rows)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Country.objects.create(name='Afghanistan copy', alpha3_code='AFG')
+
+        Country.objects.create(name='First without code')
+        Country.objects.create(name='Second without code')
+        self.assertEqual(Country.objects.filter(alpha3_code='').count(), 2)
@@ -0,0 +1,96 @@
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+from country.models import Country
+from user.autocomplete import autocomplete, get_autocomplete_index
+from user.forms import PostForm
+from user.models import Tag
+
+
+class AutocompleteTestCase(TestCase):
+    def setUp(self):
+        self.germany = Country.objects.create(
+            name='Germany', alpha2_code='DE', alpha3_code='DEU', alt_spellings="['DE', 'Deutschland']"
+        )
+        self.georgia = Country.objects.create(name='Georgia', alpha2_code='GE', alpha3_code='GEO')
+        self.uk = Country.objects.create(name='United Kingdom', alpha2_code='GB', alpha3_code='GBR')
+        self.tag = Tag.objects.create(name='Горы')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def ids(self, kind, query):
+        return [obj_id for obj_id, label in autocomplete(kind, query)]
+
+    def test_country_lookups(self):
+        """страны ищутся по началу названия, словам названия, кодам и написаниям"""
+
+        self.assertEqual(self.ids('country', 'ge'), [self.georgia.id, self.germany.id])
+        self.assertEqual(self.ids('country', 'germ'), [self.germany.id])
+        self.assertEqual(self.ids('country', 'kingdom'), [self.uk.id])
+        self.assertEqual(self.ids('country', 'gbr'), [self.uk.id])
+        self.assertEqual(self.ids('country', 'deutsch'), [self.germany.id])
+        self.assertEqual(self.ids('country', ''), [])
+
+    def test_typos(self):
+        """опечатки в запросе не мешают найти страну или тег"""
+
+        self.assertEqual(self.ids('country', 'Grmany'), [self.germany.id])
+        self.assertEqual(self.ids('country', 'Deutchland'), [self.germany.id])
+        self.assertEqual(self.ids('country', 'Untied'), [self.uk.id])
+        self.assertEqual(self.ids('tag', 'гпры'), [self.tag.id])
+        self.assertEqual(self.ids('country', 'xyzzy'), [])
+
+    def test_tag_index_updates_in_place(self):
+        """изменения тегов попадают в индекс без перестроения"""
+
+        index = get_autocomplete_index('tag')
+        self.assertEqual(self.ids('tag', 'гор'), [self.tag.id])
+
+        beach = Tag.objects.create(name='Пляжи')
+        self.tag.name = 'Озера'
+        self.tag.save()
+
+        self.assertEqual(self.ids('tag', 'пляж'), [beach.id])
+        self.assertEqual(self.ids('tag', 'озер'), [self.tag.id])
+        self.assertEqual(self.ids('tag', 'горы'), [])
+        self.assertEqual(index.label(beach.id), None)
+
+        beach.delete()
+        self.assertEqual(self.ids('tag', 'пляж'), [])
+
+    def test_country_index_follows_registry(self):
+        """новая страна появляется в подсказках"""
+
+        self.assertEqual(self.ids('country', 'fra'), [])
+        france = Country.objects.create(name='France', alpha2_code='FR', alpha3_code='FRA')
+
+        self.assertEqual(self.ids('country', 'fra'), [france.id])
+
+    def test_autocomplete_view(self):
+        """подсказки отдаются в JSON без входа"""
+
+        response = self.client.get(reverse('autocomplete'), {'kind': 'country', 'q': 'germ'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'results': [{'id': self.germany.id, 'label': 'Germany'}]})
+        self.assertEqual(self.client.get(reverse('autocomplete'), {'kind': 'user', 'q': 'a'}).status_code, 404)
+
+    def test_form_html_does_not_list_choices(self):
+        """в HTML формы только выбранные варианты, размер не зависит от числа стран"""
+
+        size = len(self.client.get(reverse('register')).content)
+        Country.objects.bulk_create([
+            Country(name=f'Country {index}', alpha3_code=f'C{index:02}') for index in range(100)
+        ])
+        Tag.objects.bulk_create([Tag(name=f'tag {index}') for index in range(100)])
+
+        self.assertEqual(len(self.client.get(reverse('register')).content), size)
+
+        html = str(PostForm(data={'countries': [self.germany.id], 'tags': [self.tag.id]})['countries'])
+        self.assertIn(f'name="countries" value="{self.germany.id}"', html)
+        self.assertIn('Germany', html)
+        self.assertNotIn('Georgia', html)
@@ -0,0 +1,60 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from travel.cache_versions import versioned_key, bump_generation
+from user.models import Profile, Post
+from country.models import Country
+
+
+class CacheVersionsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = Profile.objects.create(user=self.user)
+        self.country = Country.objects.create(name='test country', alpha3_code='TC1')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_bump_changes_key(self):
+        """смена поколения дает новый ключ, остальные пространства не затрагиваются"""
+
+        feed_key = versioned_key('public_feed', 'feed')
+        tag_key = versioned_key('tag_posts_1', 'tag_1')
+
+        bump_generation('feed')
+
+        self.assertNotEqual(versioned_key('public_feed', 'feed'), feed_key)
+        self.assertEqual(versioned_key('tag_posts_1', 'tag_1'), tag_key)
+
+    def test_post_create_invalidates_country_namespace(self):
+        """новый пост в стране инвалидирует ключи этой страны"""
+
+        country_key = versioned_key(f'posts_by_country_{self.country.id}', f'country_{self.country.id}')
+
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        post.countries.set([self.country])
+
+        self.assertNotEqual(
+            versioned_key(f'posts_by_country_{self.country.id}', f'country_{self.country.id}'),
+            country_key
+        )
+
+    def test_post_create_queries_do_not_depend_on_profiles(self):
+        """число запросов при создании поста не зависит от количества профилей"""
+
+        with CaptureQueriesContext(connection) as queries_before:
+            Post.objects.create(author=self.user, subject='test subject', body='test body')
+
+        Profile.objects.bulk_create([
+            Profile(user=User.objects.create_user(username=f'user_{index}')) for index in range(50)
+        ])
+
+        with CaptureQueriesContext(connection) as queries_after:
+            Post.objects.create(author=self.user, subject='test subject 2', body='test body')
+
+        self.assertEqual(len(queries_before), len(queries_after))
@@ -0,0 +1,34 @@
+from unittest import skipUnless
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+
+@skipUnless(connection.vendor == 'sqlite', 'прагмы только для SQLite')
+class SqlitePragmasTestCase(TestCase):
+    """
+    настройки SQLite применяются к каждому соединению
+    """
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """таймаут блокировки, synchronous=NORMAL, mmap и кеш страниц"""
+
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_immediate_transactions(self):
+        """транзакции начинаются с BEGIN IMMEDIATE"""
+
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_persistent_connections(self):
+        """соединения переиспользуются с проверкой перед запросом"""
+
+        self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
@@ -0,0 +1,143 @@
+import threading
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.urls import reverse
+from country.models import Country
+from travel.db_router import PIN_COOKIE, ReplicaRouter, read_primary, read_replica, routing_stats
+from user.listing import get_cached_ids, get_cursor_page
+from user.models import Post, Profile
+
+
+class ReplicaRouterTestCase(TransactionTestCase):
+    """
+    TransactionTestCase: внутри транзакции TestCase чтение всегда идет в основную базу
+    """
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        Profile.objects.create(user=self.user)
+        self.country = Country.objects.create(name='Testland', alpha3_code='TST')
+        self.post = Post.objects.create(author=self.user, subject='Post', body='test body')
+        self.post.countries.add(self.country)
+        cache.clear()
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    @override_settings(DATABASE_READ_ALIASES=['replica_0'])
+    def test_reads_go_to_replica_only_inside_read_replica(self):
+        """на реплику идут только чтения внутри read_replica, запись - всегда в основную базу"""
+
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        with read_replica():
+            self.assertEqual(self.router.db_for_read(Post), 'replica_0')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    @override_settings(DATABASE_READ_ALIASES=['replica_0'])
+    def test_atomic_block_reads_primary(self):
+        """внутри транзакции чтение идет в основную базу"""
+
+        with read_replica(), transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_READ_ALIASES=['replica_0'])
+    def test_read_primary_inside_read_replica(self):
+        """внутри read_primary чтение идет в основную базу и в read_replica"""
+
+        with read_replica(), read_primary():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_READ_ALIASES=['replica_0'])
+    def test_decorator_in_concurrent_threads(self):
+        """одно декорированное представление одновременно в нескольких потоках"""
+
+        inside = threading.Barrier(2)
+        routes = []
+        errors = []
+
+        @read_replica()
+        def view():
+            inside.wait(timeout=5)
+            routes.append(self.router.db_for_read(Post))
+            inside.wait(timeout=5)
+
+        def run():
+            try:
+                view()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(routes, ['replica_0', 'replica_0'])
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_READ_ALIASES=['missing_replica'])
+    def test_cache_filled_from_primary(self):
+        """
+        общий кеш списков заполняется из основной базы, а не из отстающей реплики
+        ( чтение с несуществующего алиаса упало бы )
+        """
+
+        with read_replica():
+            ids = get_cached_ids('test_ids', Post.objects.order_by('id'))
+            # объекты страницы не кешируются и читаются с реплики, здесь - явно из основной базы
+            page = get_cursor_page(
+                RequestFactory().get('/'), Post.objects.all(), ('-create_date', '-id'), Post.objects.using('default'),
+                10, cache_key='test_page'
+            )
+
+        self.assertEqual(ids, (self.post.id,))
+        self.assertEqual(cache.get('test_ids'), (self.post.id,))
+        self.assertEqual(list(page), [self.post])
+
+    def test_migrations_only_on_primary(self):
+        """миграции применяются только к основной базе"""
+
+        self.assertTrue(self.router.allow_migrate('default', 'user'))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'user'))
+
+    def test_write_pins_to_primary(self):
+        """после комментария пользователь закрепляется за основной базой, после просмотра - нет"""
+
+        self.client.login(username='testuser', password='testpassword')
+
+        response = self.client.get(reverse('posts_by_country', args=[self.country.id]))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        response = self.client.post(reverse('add_comment', args=[self.post.id]), {'body': 'test comment'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+    @override_settings(DATABASE_READ_ALIASES=['default'])
+    def test_routing_stats(self):
+        """
+        чтения списка считаются по алиасу реплики, после записи - как закрепленные
+        ( основная база подставлена вместо реплики, чтобы запросы выполнялись )
+        """
+
+        self.client.login(username='testuser', password='testpassword')
+        url = reverse('posts_by_country', args=[self.country.id])
+
+        self.client.get(url)
+        replica_reads = routing_stats()['default']
+        self.assertGreater(replica_reads, 0)
+        self.assertEqual(routing_stats()['pinned'], 0)
+
+        self.client.post(reverse('add_comment', args=[self.post.id]), {'body': 'test comment'})
+        self.client.get(url)
+
+        self.assertGreater(routing_stats()['pinned'], 0)
+        self.assertEqual(routing_stats()['default'], replica_reads)
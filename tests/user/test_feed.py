@@ -0,0 +1,202 @@
+import io
+from datetime import timedelta
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from user.feed import lift_post_in_feeds, process_feed_tasks
+from user.models import Profile, Post, FeedEntry, FeedTask
+from country.models import Country
+
+
+class FeedEntryTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = Profile.objects.create(user=self.user)
+
+        self.author = User.objects.create_user(username='author', password='authorpassword')
+        self.author_profile = Profile.objects.create(user=self.author)
+
+        self.country1 = Country.objects.create(name='test country', alpha3_code='TC1')
+        self.country2 = Country.objects.create(name='test2 country', alpha3_code='TC2')
+
+        self.profile.countries_interest.add(self.country1)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def create_post(self, subject, country):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.author, subject=subject, body='test body')
+            post.countries.set([country])
+        process_feed_tasks()
+        return post
+
+    def test_post_fan_out_to_interested_users(self):
+        """пост попадает только в ленты интересующихся его страной"""
+
+        post1 = self.create_post('Post in country1', self.country1)
+        self.create_post('Post in country2', self.country2)
+
+        entries = FeedEntry.objects.filter(user=self.user)
+        self.assertEqual(list(entries.values_list('post_id', flat=True)), [post1.id])
+
+    def test_post_with_several_countries_added_once(self):
+        """пост с несколькими интересующими странами попадает в ленту один раз"""
+
+        self.profile.countries_interest.add(self.country2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.author, subject='Two countries', body='test body')
+            post.countries.set([self.country1, self.country2])
+        process_feed_tasks()
+
+        self.assertEqual(FeedEntry.objects.filter(user=self.user, post=post).count(), 1)
+
+    def test_fan_out_deferred_to_worker(self):
+        """в запросе пост только ставится в очередь, в ленты его добавляет воркер"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.author, subject='Queued', body='test body')
+            post.countries.set([self.country1])
+
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(FeedTask.objects.filter(post=post).count(), 2)
+
+        call_command('process_feeds', '--once', stdout=io.StringIO())
+
+        self.assertEqual(list(FeedEntry.objects.filter(post=post).values_list('user_id', flat=True)), [self.user.id])
+        self.assertFalse(FeedTask.objects.exists())
+
+    def test_country_change_requeues_post(self):
+        """смена стран поста убирает его из лент, которым он больше не положен"""
+
+        post = self.create_post('Moved', self.country1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.countries.set([self.country2])
+        process_feed_tasks()
+
+        self.assertFalse(FeedEntry.objects.filter(user=self.user, post=post).exists())
+
+    def test_task_for_deleted_post_skipped(self):
+        """пост, удаленный до коммита, в очередь не попадает"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.author, subject='Deleted', body='test body')
+            post.delete()
+
+        self.assertFalse(FeedTask.objects.exists())
+
+    def test_lift_moves_post_to_top(self):
+        """поднятый пост оказывается первым в ленте"""
+
+        post1 = self.create_post('First', self.country1)
+        post2 = self.create_post('Second', self.country1)
+
+        post1.last_lifted_at = timezone.now() + timedelta(minutes=1)
+        post1.save()
+        lift_post_in_feeds(post1)
+
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('index'))
+
+        self.assertEqual(list(response.context['posts']), [post1, post2])
+
+    def test_rebuild_on_countries_interest_change(self):
+        """смена интересующих стран пересобирает ленту"""
+
+        self.create_post('Post in country1', self.country1)
+        post2 = self.create_post('Post in country2', self.country2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.countries_interest.set([self.country2])
+
+        self.assertEqual(FeedTask.objects.filter(user=self.user).count(), 2)
+        process_feed_tasks()
+
+        entries = FeedEntry.objects.filter(user=self.user)
+        self.assertEqual(list(entries.values_list('post_id', flat=True)), [post2.id])
+        self.assertFalse(FeedTask.objects.exists())
+
+    def test_follow_toggle_updates_feed(self):
+        """подписка на автора добавляет его посты в ленту, отписка убирает, остальные записи не трогаются"""
+
+        kept = FeedEntry.objects.get(user=self.user, post=self.create_post('Post in country1', self.country1))
+        post = self.create_post('Post in country2', self.country2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.followers.add(self.author)
+        process_feed_tasks()
+        self.assertTrue(FeedEntry.objects.filter(user=self.user, post=post).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.followers.remove(self.author)
+        process_feed_tasks()
+        self.assertFalse(FeedEntry.objects.filter(user=self.user, post=post).exists())
+        self.assertTrue(FeedEntry.objects.filter(pk=kept.pk).exists())
+
+    def test_backfill_command(self):
+        """команда backfill_feeds восстанавливает ленты"""
+
+        post = self.create_post('Post in country1', self.country1)
+        FeedEntry.objects.all().delete()
+
+        call_command('backfill_feeds', stdout=io.StringIO())
+
+        self.assertTrue(FeedEntry.objects.filter(user=self.user, post=post).exists())
+
+
+class FollowedAuthorsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = Profile.objects.create(user=self.user)
+        self.country = Country.objects.create(name='test country', alpha3_code='TC1')
+        self.profile.countries_interest.add(self.country)
+
+        self.authors = []
+        for index in range(3):
+            author = User.objects.create_user(username=f'author_{index}', password='authorpassword')
+            Profile.objects.create(user=author)
+            with self.captureOnCommitCallbacks(execute=True):
+                post = Post.objects.create(author=author, subject=f'Post {index}', body='test body')
+                post.countries.set([self.country])
+            self.authors.append(author)
+        process_feed_tasks()
+
+        self.authors[0].profile.followers.add(self.user)
+        self.authors[2].profile.followers.add(self.user)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_followed_author_ids_single_query(self):
+        """подписки на авторов страницы определяются одним запросом"""
+
+        author_ids = [author.id for author in self.authors]
+
+        with self.assertNumQueries(1):
+            followed_ids = Profile.followed_author_ids(self.user, author_ids)
+
+        self.assertEqual(followed_ids, {self.authors[0].id, self.authors[2].id})
+
+    def test_feed_is_following(self):
+        """признак подписки на автора в ленте"""
+
+        self.client.login(username='testuser', password='testpassword')
+        response = self.client.get(reverse('index'))
+
+        is_following = {post.author_id: post.is_following for post in response.context['posts']}
+        self.assertEqual(is_following, {
+            self.authors[0].id: True,
+            self.authors[1].id: False,
+            self.authors[2].id: True,
+        })
@@ -0,0 +1,87 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+from user.context_processors import global_context
+from user.leaderboard import rebuild_author_ratings
+from user.models import Profile, Post, Tag
+from user.ratings import flush_rating_deltas
+
+
+class LeaderboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='authorpassword')
+        self.author_profile = Profile.objects.create(user=self.author)
+        self.post = Post.objects.create(author=self.author, subject='Post by author', body='test body')
+
+        self.voter = User.objects.create_user(username='voter', password='voterpassword')
+        Profile.objects.create(user=self.voter)
+
+        self.request = RequestFactory().get('/')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_warm_cache_has_no_queries(self):
+        """на теплом кеше контекст-процессор не обращается к базе"""
+
+        global_context(self.request)
+
+        with self.assertNumQueries(0):
+            context = global_context(self.request)
+
+        self.assertEqual(context['latest_posts'], [self.post])
+
+    def test_author_rating_updated_on_flush(self):
+        """рейтинг автора меняется вместе со сбросом рейтингов постов"""
+
+        self.assertEqual(global_context(self.request)['top_users'], [])
+
+        self.client.force_login(self.voter)
+        self.client.post(reverse('increase_rating', args=[self.post.id]))
+        flush_rating_deltas()
+
+        self.author_profile.refresh_from_db()
+        self.assertEqual(self.author_profile.total_rating, 1)
+        self.assertEqual(global_context(self.request)['top_users'], [self.author_profile])
+
+    def test_new_tag_invalidates_sidebar(self):
+        """новый тег сразу попадает в облако тегов"""
+
+        global_context(self.request)
+        tag = Tag.objects.create(name='new tag')
+
+        self.assertIn(tag, global_context(self.request)['tag_cloud'])
+
+    def test_deleted_post_rating_removed(self):
+        """удаление поста уменьшает рейтинг автора"""
+
+        Post.objects.filter(pk=self.post.pk).update(rating=3)
+        Profile.objects.filter(pk=self.author_profile.pk).update(total_rating=3)
+
+        Post.objects.get(pk=self.post.pk).delete()
+
+        self.author_profile.refresh_from_db()
+        self.assertEqual(self.author_profile.total_rating, 0)
+
+    def test_rebuild_author_ratings(self):
+        """пересчет рейтингов авторов одним запросом и сброс кеша панели"""
+
+        self.assertEqual(global_context(self.request)['top_users'], [])
+        Post.objects.filter(pk=self.post.pk).update(rating=4)
+        Post.objects.create(author=self.author, subject='Second post', body='test body', rating=3)
+        Profile.objects.filter(user=self.voter).update(total_rating=7)
+
+        # один UPDATE внутри SAVEPOINT транзакции теста
+        with self.assertNumQueries(3):
+            rebuild_author_ratings()
+
+        self.author_profile.refresh_from_db()
+        self.assertEqual(self.author_profile.total_rating, 7)
+        self.assertEqual(Profile.objects.get(user=self.voter).total_rating, 0)
+        self.assertEqual(global_context(self.request)['top_users'], [self.author_profile])
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase
+from user.lifts import run_lifts
+from user.models import Post, AutoPostLift, PostLiftLog, ALL_DAYS_MASK
+
+
+class LiftEngineTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        # 2024-10-23 - среда ( weekday 2 )
+        self.day = date(2024, 10, 23)
+        self.now = datetime(2024, 10, 23, 23, 55, tzinfo=dt_timezone.utc)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def create_lift(self, days_of_week, start=-1, end=1):
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        AutoPostLift.objects.create(
+            post=post,
+            start_date=self.day + timedelta(days=start),
+            end_date=self.day + timedelta(days=end),
+            days_of_week=days_of_week
+        )
+        return post
+
+    def test_lift_on_selected_day(self):
+        """пост поднимается только в выбранные дни недели"""
+
+        wednesday = self.create_lift(['2'])
+        every_day = self.create_lift([])
+        monday = self.create_lift(['0'])
+
+        stats = run_lifts(self.day, self.now)
+
+        self.assertEqual(stats['lifted'], 2)
+        for post in (wednesday, every_day):
+            post.refresh_from_db()
+            self.assertEqual(post.last_lifted_at, self.now)
+
+        monday.refresh_from_db()
+        self.assertIsNone(monday.last_lifted_at)
+
+    def test_reset_on_end_date(self):
+        """в последний день автоподнятия без совпадения дня last_lifted_at сбрасывается на create_date"""
+
+        post = self.create_lift(['0'], end=0)
+
+        stats = run_lifts(self.day, self.now)
+
+        self.assertEqual(stats['reset'], 1)
+        post.refresh_from_db()
+        self.assertEqual(post.last_lifted_at, post.create_date)
+
+    def test_rerun_is_idempotent(self):
+        """повторный запуск за тот же день не поднимает посты второй раз"""
+
+        self.create_lift(['2'])
+        run_lifts(self.day, self.now)
+
+        stats = run_lifts(self.day, self.now + timedelta(minutes=1))
+
+        self.assertEqual(stats, {'lifted': 0, 'reset': 0, 'skipped': 1})
+        self.assertEqual(PostLiftLog.objects.count(), 1)
+
+    def test_chunks(self):
+        """все автоподнятия обрабатываются при разбиении на пачки"""
+
+        for _ in range(7):
+            self.create_lift(['2'])
+
+        stats = run_lifts(self.day, self.now, chunk_size=3)
+
+        self.assertEqual(stats['lifted'], 7)
+        self.assertEqual(PostLiftLog.objects.filter(lift_date=self.day).count(), 7)
+
+    def test_expired_lifts_deleted(self):
+        """закончившиеся автоподнятия удаляются"""
+
+        self.create_lift(['2'], start=-5, end=-1)
+
+        run_lifts(self.day, self.now)
+
+        self.assertFalse(AutoPostLift.objects.exists())
+
+
+class WeekdayMaskTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_mask_on_save(self):
+        """маска дней недели пересчитывается при сохранении"""
+
+        lift = AutoPostLift.objects.create(
+            post=self.post, start_date=date(2024, 10, 21), end_date=date(2024, 10, 27), days_of_week=['0', '2']
+        )
+        self.assertEqual(lift.weekday_mask, 0b101)
+
+        lift.days_of_week = ['6']
+        lift.save()
+        lift.refresh_from_db()
+        self.assertEqual(lift.weekday_mask, 0b1000000)
+
+    def test_empty_selection_is_every_day(self):
+        """пустой выбор дней - маска всех дней недели"""
+
+        lift = AutoPostLift.objects.create(
+            post=self.post, start_date=date(2024, 10, 21), end_date=date(2024, 10, 27), days_of_week=[]
+        )
+        self.assertEqual(lift.weekday_mask, ALL_DAYS_MASK)
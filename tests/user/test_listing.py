@@ -0,0 +1,129 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from user.listing import CURSOR_PARAM, CursorPage, encode_cursor, get_cached_page, get_cursor_page
+from user.models import Post
+
+
+class CachedPageTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.posts = [
+            Post.objects.create(author=self.user, subject=f'Post {index}', body='test body') for index in range(5)
+        ]
+        self.factory = RequestFactory()
+        cache.delete('test_listing')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def get_page(self, page):
+        request = self.factory.get('/', {'page': page})
+        return get_cached_page(
+            request, 'test_listing', Post.objects.order_by('-id'), Post.objects.all(), per_page=2
+        )
+
+    def test_cache_stores_only_ids(self):
+        """в кеше хранятся только id в порядке сортировки"""
+
+        self.get_page(1)
+        self.assertEqual(cache.get('test_listing'), tuple(post.id for post in reversed(self.posts)))
+
+    def test_page_is_hydrated_in_order(self):
+        """страница содержит объекты текущей страницы в исходном порядке"""
+
+        page = self.get_page(2)
+
+        self.assertEqual(list(page), [self.posts[2], self.posts[1]])
+        self.assertEqual(page.paginator.count, 5)
+
+    def test_deleted_objects_are_skipped(self):
+        """удаленные после кеширования объекты пропускаются"""
+
+        self.get_page(1)
+        self.posts[4].delete()
+
+        self.assertEqual(list(self.get_page(1)), [self.posts[3]])
+
+
+class CursorPageTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.posts = [
+            Post.objects.create(author=self.user, subject=f'Post {index}', body='test body') for index in range(5)
+        ]
+        # одинаковое время у части постов: порядок определяет id
+        Post.objects.filter(id__in=[post.id for post in self.posts[:3]]).update(create_date=self.posts[0].create_date)
+        self.newest = sorted(Post.objects.all(), key=lambda post: (post.create_date, post.id), reverse=True)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def get_page(self, cursor=None, cache_key=None):
+        request = self.factory.get('/', {CURSOR_PARAM: cursor} if cursor else {})
+        return get_cursor_page(
+            request, Post.objects.all(), ('-create_date', '-id'), Post.objects.all(), per_page=2,
+            cache_key=cache_key
+        )
+
+    def test_pages_forward_and_back(self):
+        """листание вперед проходит все посты по порядку, назад возвращает ту же страницу"""
+
+        first = self.get_page()
+        second = self.get_page(first.next_cursor)
+        third = self.get_page(second.next_cursor)
+
+        self.assertEqual(list(first) + list(second) + list(third), self.newest)
+        self.assertFalse(first.has_previous)
+        self.assertTrue(second.has_next)
+        self.assertFalse(third.has_next)
+        self.assertEqual(list(self.get_page(second.previous_cursor)), list(first))
+        self.assertEqual(list(self.get_page(third.previous_cursor)), list(second))
+
+    def test_last_page(self):
+        """последняя страница - самые старые посты"""
+
+        page = self.get_page(CursorPage.last_cursor)
+
+        self.assertEqual(list(page), self.newest[-2:])
+        self.assertFalse(page.has_next)
+        self.assertEqual(list(self.get_page(page.previous_cursor)), self.newest[1:3])
+
+    def test_no_count_or_offset(self):
+        """страница - один запрос id без COUNT и OFFSET плюс загрузка объектов"""
+
+        first = self.get_page()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(first.next_cursor)
+
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('COUNT', query['sql'])
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_invalid_cursor_is_first_page(self):
+        """неверный курсор - первая страница"""
+
+        for cursor in ('garbage', encode_cursor('sideways', [1, 2]), encode_cursor('next', ['not a date', 1])):
+            self.assertEqual(list(self.get_page(cursor)), self.newest[:2])
+
+    def test_page_rows_are_cached(self):
+        """строки страницы кешируются по ключу с курсором"""
+
+        cache.clear()
+        self.get_page(cache_key='test_cursor')
+        with CaptureQueriesContext(connection) as queries:
+            page = self.get_page(cache_key='test_cursor')
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(list(page), self.newest[:2])
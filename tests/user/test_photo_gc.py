@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from user.models import Photo, Post
+from user.photo_gc import collect_garbage
+from user.photos import generate_variants
+
+
+def image_file(color):
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), color).save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue())
+
+
+class PhotoGarbageCollectorTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.grace = timedelta(hours=1)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def make_old(self, *paths):
+        old = time.time() - 2 * 3600
+        for path in paths:
+            os.utime(path, (old, old))
+
+    def create_photo(self, color, post=None, old=True):
+        photo = Photo.objects.create(image=image_file(color))
+        generate_variants(photo)
+        if post:
+            post.photos.add(photo)
+        if old:
+            Photo.objects.filter(pk=photo.pk).update(uploaded_at=timezone.now() - 2 * self.grace)
+            self.make_old(*[photo.image.storage.path(variant['name']) for variant in photo.variants],
+                          photo.image.path)
+        return photo
+
+    def create_stray_file(self, name, old=True):
+        path = os.path.join(self.media_root, 'post_photos', name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'x' * 100)
+        if old:
+            self.make_old(path)
+        return path
+
+    def test_orphan_photos(self):
+        """удаляются только старые фото без постов вместе с копиями"""
+
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        kept = self.create_photo((200, 0, 0), post=post)
+        orphan = self.create_photo((0, 200, 0))
+        young = self.create_photo((0, 0, 200), old=False)
+        orphan_files = [orphan.image.storage.path(variant['name']) for variant in orphan.variants]
+
+        stats = collect_garbage(self.grace)
+
+        self.assertEqual(stats['photos'], 1)
+        self.assertGreater(stats['bytes'], 0)
+        self.assertEqual(set(Photo.objects.values_list('id', flat=True)), {kept.id, young.id})
+        for path in orphan_files + [orphan.image.path]:
+            self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(kept.image.path))
+
+    def test_deleted_post(self):
+        """после удаления поста его фото собираются"""
+
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        self.create_photo((200, 0, 0), post=post)
+        post.delete()
+
+        self.assertEqual(collect_garbage(self.grace)['photos'], 1)
+        self.assertFalse(Photo.objects.exists())
+
+    def test_orphan_files(self):
+        """удаляются старые файлы без записей Photo"""
+
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        photo = self.create_photo((200, 0, 0), post=post)
+        stray = self.create_stray_file('ab/cd/' + 'ab' * 32 + '_640.webp')
+        stale_upload = self.create_stray_file('incoming/upload.part')
+        legacy = self.create_stray_file('old_flat_name.jpg')
+        young = self.create_stray_file('fresh.jpg', old=False)
+
+        stats = collect_garbage(self.grace)
+
+        self.assertEqual(stats, {'photos': 0, 'files': 3, 'bytes': 300})
+        for path in (stray, stale_upload, legacy):
+            self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(young))
+        for variant in photo.variants:
+            self.assertTrue(photo.image.storage.exists(variant['name']))
+
+    def test_dry_run(self):
+        """в режиме dry-run ничего не удаляется"""
+
+        self.create_photo((0, 200, 0))
+        stray = self.create_stray_file('old_flat_name.jpg')
+
+        out = StringIO()
+        call_command('gc_photos', '--dry-run', '--grace-hours', '1', stdout=out)
+
+        self.assertIn('Would delete photos: 1, files: 1', out.getvalue())
+        self.assertTrue(Photo.objects.exists())
+        self.assertTrue(os.path.exists(stray))
@@ -0,0 +1,201 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from country.models import Country
+from user.models import Photo, Profile
+from user.photos import (
+    accepted_formats, available_formats, generate_variants, photo_for_upload, process_pending_photos, target_widths
+)
+
+
+def image_file(width, height, name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 120, 40)).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class PhotoVariantsTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_target_widths(self):
+        """копии не шире оригинала, оригинал до 1280px тоже перекодируется"""
+
+        self.assertEqual(target_widths(2048), [320, 640, 1280])
+        self.assertEqual(target_widths(1000), [320, 640, 1000])
+        self.assertEqual(target_widths(275), [275])
+
+    def test_generate_variants(self):
+        """копии сохраняются с размерами и путями"""
+
+        photo = Photo.objects.create(image=image_file(1600, 900))
+
+        variants = generate_variants(photo)
+
+        photo.refresh_from_db()
+        self.assertIsNotNone(photo.processed_at)
+        jpeg = [variant for variant in photo.variants if variant['format'] == 'jpeg']
+        self.assertEqual([variant['width'] for variant in jpeg], [320, 640, 1280])
+        self.assertEqual(jpeg[1]['height'], 360)
+        self.assertEqual(len(variants), 3 * len(available_formats()))
+        for variant in photo.variants:
+            self.assertTrue(photo.image.storage.exists(variant['name']))
+
+    def test_broken_image(self):
+        """битый файл помечается обработанным без копий, ошибка пишется в лог"""
+
+        photo = Photo.objects.create(image=SimpleUploadedFile('broken.jpg', b'not an image'))
+
+        with self.assertLogs('user.photos', 'WARNING') as logs:
+            self.assertEqual(process_pending_photos(), 1)
+
+        self.assertIn(f'Фото {photo.id}', logs.output[0])
+
+        photo.refresh_from_db()
+        self.assertIsNotNone(photo.processed_at)
+        self.assertEqual(photo.variants, [])
+
+    def test_srcset(self):
+        """шаблонный тег выводит srcset из копий и оригинал до обработки"""
+
+        photo = Photo.objects.create(image=image_file(1600, 900))
+        template = Template('{% load photos %}{% photo_img photo %}')
+
+        html = template.render(Context({'photo': photo}))
+        self.assertIn(f'src="{photo.image.url}"', html)
+        self.assertNotIn('srcset', html)
+
+        generate_variants(photo)
+        html = template.render(Context({'photo': photo}))
+        self.assertIn('srcset=', html)
+        self.assertIn(' 1280w', html)
+        self.assertIn('_640.jpg"', html)
+
+    def test_accepted_formats(self):
+        """порядок форматов по заголовку Accept"""
+
+        self.assertEqual(accepted_formats('image/avif,image/webp,*/*'), ['avif', 'webp', 'jpeg'])
+        self.assertEqual(accepted_formats('image/webp,*/*'), ['webp', 'jpeg'])
+        self.assertEqual(accepted_formats(''), ['jpeg'])
+
+    def test_webp_by_accept(self):
+        """браузеру с поддержкой WebP отдаются копии в WebP, остальным - JPEG"""
+
+        photo = Photo.objects.create(image=image_file(1000, 600))
+        generate_variants(photo)
+        template = Template('{% load photos %}{% photo_img photo %}')
+
+        request = RequestFactory().get('/', HTTP_ACCEPT='image/webp,*/*')
+        html = template.render(Context({'photo': photo, 'request': request}))
+        self.assertIn('_640.webp 640w', html)
+        self.assertNotIn('.jpg', html)
+
+        request = RequestFactory().get('/', HTTP_ACCEPT='text/html')
+        html = template.render(Context({'photo': photo, 'request': request}))
+        self.assertIn('_640.jpg 640w', html)
+
+    def test_small_original_reused(self):
+        """копия полного размера не больше оригинала того же формата"""
+
+        photo = Photo.objects.create(image=image_file(200, 100))
+        generate_variants(photo)
+
+        for variant in photo.variants:
+            if variant['format'] == 'jpeg':
+                self.assertLessEqual(variant['size'], photo.image.size)
+
+    def test_create_post_does_not_process(self):
+        """создание поста не обрабатывает фото в запросе"""
+
+        user = User.objects.create_user(username='testuser', password='password123')
+        Profile.objects.create(user=user)
+        self.client.login(username='testuser', password='password123')
+        country = Country.objects.create(name='test country')
+
+        with open(os.path.join(settings.BASE_DIR, 'tests', 'user', 'test_img.jpg'), 'rb') as file:
+            response = self.client.post(reverse('create_post'), {
+                'countries': [country.id],
+                'subject': 'test subject',
+                'body': 'test body',
+                'photos': [file],
+            })
+
+        self.assertEqual(response.status_code, 302)
+        photo = Photo.objects.get()
+        self.assertIsNone(photo.processed_at)
+        self.assertEqual(photo.variants, [])
+
+
+class PhotoPlaceholderTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_described_at_upload(self):
+        """размеры, основной цвет и заглушка считаются при загрузке"""
+
+        photo = photo_for_upload(image_file(800, 600))
+
+        photo.refresh_from_db()
+        self.assertEqual((photo.width, photo.height), (800, 600))
+        self.assertRegex(photo.dominant_color, r'^#c[89]7[89]2[89]$')
+        self.assertTrue(photo.placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(photo.placeholder), 2000)
+
+    def test_backfill_command(self):
+        """команда photo_placeholders заполняет заглушки у старых фото"""
+
+        photo = Photo.objects.create(image=image_file(300, 200))
+
+        out = StringIO()
+        call_command('photo_placeholders', stdout=out)
+
+        photo.refresh_from_db()
+        self.assertEqual((photo.width, photo.height), (300, 200))
+        self.assertTrue(photo.placeholder)
+        self.assertIn('Photos described: 1', out.getvalue())
+
+    def test_template_attrs(self):
+        """первый слайд грузится сразу, остальные лениво, у всех есть размеры и заглушка"""
+
+        photo = photo_for_upload(image_file(800, 600))
+        template = Template('{% load photos %}{% photo_img photo first=first %}')
+
+        first = template.render(Context({'photo': photo, 'first': True}))
+        other = template.render(Context({'photo': photo, 'first': False}))
+
+        self.assertIn('width="800" height="600"', first)
+        self.assertIn(f'style="background: {photo.dominant_color} url(data:image/jpeg;base64,', first)
+        self.assertNotIn('loading="lazy"', first)
+        self.assertIn('loading="lazy"', other)
+        self.assertIn(f'style="background: {photo.dominant_color}"', other)
+        self.assertNotIn('base64', other)
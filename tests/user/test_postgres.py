@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from user.lifts import due_lifts
+from user.models import AutoPostLift, Post
+from user.search import search_posts
+
+
+@skipUnless(connection.vendor == 'postgresql', 'только для PostgreSQL ( DATABASE_ENGINE=postgresql )')
+class PostgresTestCase(TestCase):
+    """
+    запускается на локальном PostgreSQL:
+    DATABASE_ENGINE=postgresql python manage.py test
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.post = Post.objects.create(author=self.user, subject='Поход', body='Неделя в горах Кавказа')
+        Post.objects.create(author=self.user, subject='Пляж', body='Море и солнце')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def test_connection_pool(self):
+        """соединения берутся из пула psycopg"""
+
+        self.assertIsNotNone(connection.pool)
+
+    def test_search_uses_morphology(self):
+        """поиск находит другую форму слова"""
+
+        self.assertEqual(list(search_posts('гора')), [self.post])
+
+    def test_search_uses_gin_index(self):
+        """поиск идет по GIN-индексу документа"""
+
+        self.assertIn('post_search_gin_idx', self.plan(search_posts('гора')))
+
+    def test_due_lifts_use_range_index(self):
+        """активные автоподнятия выбираются по GiST-индексу диапазона дат"""
+
+        today = date.today()
+        AutoPostLift.objects.create(post=self.post, start_date=today, end_date=today + timedelta(days=3))
+
+        self.assertEqual(list(due_lifts(today).values_list('post_id', flat=True)), [self.post.id])
+        self.assertIn('autolift_active_range_idx', self.plan(due_lifts(today)))
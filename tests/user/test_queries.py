@@ -0,0 +1,84 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from user.models import Profile, Post, Photo, Tag
+from country.models import Country
+from country.registry import get_registry
+
+
+class ListingQueryCountTestCase(TestCase):
+    """
+    число запросов на страницу списка не должно зависеть от количества карточек
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = Profile.objects.create(user=self.user)
+
+        self.author = User.objects.create_user(username='author', password='authorpassword')
+        Profile.objects.create(user=self.author)
+
+        self.country1 = Country.objects.create(name='test country', alpha3_code='TC1')
+        self.country2 = Country.objects.create(name='test2 country', alpha3_code='TC2')
+        self.tag1 = Tag.objects.create(name='tag1')
+        self.tag2 = Tag.objects.create(name='tag2')
+
+        self.profile.countries_interest.add(self.country1)
+
+        self.client.login(username='testuser', password='testpassword')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def create_posts(self, count):
+        for index in range(count):
+            post = Post.objects.create(author=self.author, subject=f'Post {index}', body='test body')
+            post.countries.set([self.country1, self.country2])
+            post.tags.set([self.tag1, self.tag2])
+            post.photos.add(
+                Photo.objects.create(image=f'post_photos/test_{index}_1.jpg'),
+                Photo.objects.create(image=f'post_photos/test_{index}_2.jpg'),
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        # реестр стран загружается один раз на процесс, а не на страницу
+        get_registry()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_queries(self, url):
+        self.create_posts(1)
+        one_card = self.count_queries(url)
+
+        self.create_posts(8)
+        nine_cards = self.count_queries(url)
+
+        self.assertEqual(one_card, nine_cards)
+
+    def test_index(self):
+        self.assert_constant_queries(reverse('index'))
+
+    def test_posts_by_country(self):
+        self.assert_constant_queries(reverse('posts_by_country', args=[self.country1.id]))
+
+    def test_tag_view(self):
+        self.assert_constant_queries(reverse('tag_view', args=[self.tag1.id]))
+
+    def test_posts_by_tag(self):
+        self.assert_constant_queries(reverse('posts_by_tag', args=[self.tag1.id]))
+
+    def test_profile_posts(self):
+        self.assert_constant_queries(reverse('profile_posts', args=[self.author.id]))
+
+    def test_profile_detail(self):
+        self.assert_constant_queries(reverse('profile_detail', args=[self.author.id]))
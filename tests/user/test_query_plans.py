@@ -0,0 +1,143 @@
+import re
+from datetime import date, timedelta
+from unittest import skipUnless
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from country.models import Country
+from user.feed import fan_out_post
+from user.lifts import run_lifts
+from user.listing import CURSOR_PARAM, encode_cursor
+from user.models import AutoPostLift, Comment, Post, PostRatingAction, Profile, Tag
+from user.ratings import flush_rating_deltas
+from user.scheduler_posts import LiftScheduler
+
+
+HOT_TABLES = {
+    'user_post', 'user_post_countries', 'user_post_tags', 'user_comment', 'user_feedentry',
+    'user_postratingaction', 'user_postliftlog', 'user_autopostlift', 'user_liftrun',
+}
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# псевдонимы таблиц в SQL django: "user_post" U0 в подзапросах, "user_post" T3 в соединениях
+TABLE_ALIAS = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?(?![\w.])')
+
+
+def table_aliases(sql):
+    return {alias: table for table, alias in TABLE_ALIAS.findall(sql)}
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть только в SQLite')
+class QueryPlanTestCase(TestCase):
+    """
+    горячие запросы представлений и фоновых задач не должны читать большие таблицы целиком
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.profile = Profile.objects.create(user=self.user)
+        self.country = Country.objects.create(name='Testland', alpha2_code='TL', alpha3_code='TST')
+        self.profile.countries_interest.add(self.country)
+        self.tag = Tag.objects.create(name='travel')
+
+        self.post = Post.objects.create(author=self.user, subject='Post', body='test body')
+        self.post.countries.add(self.country)
+        self.post.tags.add(self.tag)
+        fan_out_post(self.post)
+        Comment.objects.create(post=self.post, author=self.user, body='comment')
+        AutoPostLift.objects.create(
+            post=self.post, start_date=date.today() - timedelta(days=1), end_date=date.today() + timedelta(days=1)
+        )
+
+        self.client.login(username='testuser', password='testpassword')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def table_scans(self, run):
+        """
+        полные сканирования горячих таблиц в планах всех запросов, выполненных в run()
+        """
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            run()
+
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    continue
+                aliases = table_aliases(sql)
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.match(row[-1])
+                    if match and aliases.get(match.group(1), match.group(1)) in HOT_TABLES:
+                        scans.append(f'{row[-1]}: {sql}')
+        return scans
+
+    def assert_no_table_scans(self, run):
+        self.assertEqual(self.table_scans(run), [])
+
+    def test_detector_finds_table_scan(self):
+        """проверка сама находит полное сканирование"""
+
+        scans = self.table_scans(lambda: list(Post.objects.filter(body='test body')))
+
+        self.assertEqual(len(scans), 1)
+        self.assertTrue(scans[0].startswith('SCAN user_post'))
+
+    def test_detector_finds_aliased_table_scan(self):
+        """полное сканирование таблицы под псевдонимом в подзапросе тоже находится"""
+
+        subquery = Post.objects.filter(body='test body').values('id')
+        scans = self.table_scans(lambda: list(Post.objects.filter(id__in=subquery)))
+
+        self.assertEqual(len(scans), 1)
+        self.assertTrue(scans[0].startswith('SCAN U0'))
+
+    def test_listing_views(self):
+        """лента, посты автора, страны и тега, комментарии - первая и следующая страница"""
+
+        post_cursor = encode_cursor('next', [self.post.create_date, self.post.id])
+        comment = self.post.comments.get()
+        pages = [
+            (reverse('index'), post_cursor),
+            (reverse('profile_detail', args=[self.user.id]), post_cursor),
+            (reverse('profile_posts', args=[self.user.id]), post_cursor),
+            (reverse('posts_by_country', args=[self.country.id]), post_cursor),
+            (reverse('tag_view', args=[self.tag.id]), post_cursor),
+            (reverse('posts_by_tag', args=[self.tag.id]), post_cursor),
+            (reverse('post_comments', args=[self.post.id]), encode_cursor('next', [comment.created_at, comment.id])),
+        ]
+        for url, cursor in pages:
+            with self.subTest(url=url):
+                self.assert_no_table_scans(lambda: self.client.get(url))
+                self.assert_no_table_scans(lambda: self.client.get(url, {CURSOR_PARAM: cursor}))
+
+    def test_detail_views(self):
+        """пост, страна, голос за пост, поиск и публичная лента с боковой панелью"""
+
+        self.assert_no_table_scans(lambda: self.client.get(reverse('post_detail', args=[self.post.id])))
+        self.assert_no_table_scans(lambda: self.client.get(reverse('country_detail', args=[self.country.id])))
+        self.assert_no_table_scans(lambda: self.client.post(reverse('increase_rating', args=[self.post.id])))
+        self.assert_no_table_scans(lambda: self.client.get(reverse('search'), {'q': 'test body'}))
+
+        self.client.logout()
+        self.assert_no_table_scans(lambda: self.client.get(reverse('index')))
+
+    def test_background_jobs(self):
+        """автоподнятие, планировщик и перенос рейтингов в базу"""
+
+        PostRatingAction.objects.create(user=self.user, post=self.post, action='up')
+
+        self.assert_no_table_scans(lambda: run_lifts(date.today()))
+        self.assert_no_table_scans(lambda: LiftScheduler(windows=['06:00']).pending_runs(timezone.now()))
+        self.assert_no_table_scans(flush_rating_deltas)
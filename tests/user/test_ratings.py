@@ -0,0 +1,114 @@
+from unittest.mock import patch
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from user.models import Profile, Post, PostRatingAction
+from user.ratings import flush_rating_deltas, get_rating, rating_key
+
+
+class WriteBehindRatingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='authorpassword')
+        Profile.objects.create(user=self.author)
+        self.post = Post.objects.create(author=self.author, subject='Post by author', body='test body')
+
+        self.voters = []
+        for index in range(5):
+            voter = User.objects.create_user(username=f'voter_{index}', password='voterpassword')
+            Profile.objects.create(user=voter)
+            self.voters.append(voter)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def vote(self, voter, url_name):
+        self.client.force_login(voter)
+        return self.client.post(reverse(url_name, args=[self.post.id]))
+
+    def test_votes_are_written_behind(self):
+        """голоса копятся в счетчике и попадают в базу при сбросе"""
+
+        for voter in self.voters:
+            response = self.vote(voter, 'increase_rating')
+
+        self.assertEqual(response.json(), {'status': 'ok', 'new_rating': 5})
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rating, 0)
+
+        self.assertEqual(flush_rating_deltas(), 1)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rating, 5)
+        self.assertEqual(get_rating(self.post), 5)
+
+    def test_flush_is_idempotent(self):
+        """повторный сброс не применяет изменения второй раз"""
+
+        self.vote(self.voters[0], 'increase_rating')
+
+        flush_rating_deltas()
+        flush_rating_deltas()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rating, 1)
+
+    def test_repeated_vote_is_not_counted(self):
+        """повторный голос того же пользователя не меняет рейтинг"""
+
+        self.vote(self.voters[0], 'increase_rating')
+        response = self.vote(self.voters[0], 'increase_rating')
+
+        self.assertEqual(response.json(), {'status': 'ok', 'new_rating': 1})
+        self.assertEqual(PostRatingAction.objects.filter(post=self.post).count(), 1)
+
+    def test_votes_after_flush_are_flushed_again(self):
+        """голоса между сбросами не теряются"""
+
+        self.vote(self.voters[0], 'increase_rating')
+        flush_rating_deltas()
+
+        self.vote(self.voters[1], 'increase_rating')
+        self.vote(self.voters[0], 'downgrade_rating')
+        flush_rating_deltas()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rating, 1)
+        self.assertEqual(get_rating(self.post), 1)
+
+    def test_rating_read_during_flush_is_not_lost(self):
+        """рейтинг, посчитанный во время сброса по старому значению в базе, не теряет голоса"""
+
+        for voter in self.voters[:3]:
+            self.vote(voter, 'increase_rating')
+
+        stale_post = Post.objects.get(pk=self.post.pk)
+
+        def read_during_flush(deltas):
+            cache.delete(rating_key(stale_post.id))
+            get_rating(stale_post)
+
+        with patch('user.ratings.apply_author_rating_deltas', side_effect=read_during_flush):
+            flush_rating_deltas()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.rating, 3)
+        self.assertEqual(get_rating(self.post), 3)
+
+    def test_rating_seeded_from_database(self):
+        """счетчик заполняется рейтингом из базы, а не устаревшим объектом поста"""
+
+        for voter in self.voters[:3]:
+            self.vote(voter, 'increase_rating')
+
+        stale_post = Post.objects.get(pk=self.post.pk)
+        flush_rating_deltas()
+
+        self.assertEqual(stale_post.rating, 0)
+        self.assertEqual(get_rating(stale_post), 3)
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from user.models import Post, AutoPostLift, LiftRun, PostLiftLog
+from user.scheduler_posts import LiftScheduler
+
+
+class LiftSchedulerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.scheduler = LiftScheduler(windows=['12:00', '23:55'], max_catchup_days=3, log=lambda message: None)
+        self.day = date(2024, 10, 23)
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def at(self, day, hour, minute=0):
+        return datetime(day.year, day.month, day.day, hour, minute, tzinfo=dt_timezone.utc)
+
+    def create_lift(self):
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        AutoPostLift.objects.create(
+            post=post,
+            start_date=self.day - timedelta(days=10),
+            end_date=self.day + timedelta(days=10),
+            days_of_week=[]
+        )
+        return post
+
+    def test_first_start_runs_passed_windows_of_today(self):
+        """без истории запусков выполняются только наступившие окна сегодняшнего дня"""
+
+        self.assertEqual(self.scheduler.pending_runs(self.at(self.day, 9)), [])
+        self.assertEqual(self.scheduler.pending_runs(self.at(self.day, 13)), [(self.day, 0)])
+
+    def test_catch_up_missed_days_in_order(self):
+        """после простоя пропущенные окна выполняются по порядку"""
+
+        LiftRun.objects.create(day=self.day - timedelta(days=2), window=0)
+
+        runs = self.scheduler.pending_runs(self.at(self.day, 13))
+
+        self.assertEqual(runs, [
+            (self.day - timedelta(days=2), 1),
+            (self.day - timedelta(days=1), 0),
+            (self.day - timedelta(days=1), 1),
+            (self.day, 0),
+        ])
+
+    def test_catch_up_is_limited(self):
+        """догон не уходит дальше max_catchup_days дней назад"""
+
+        LiftRun.objects.create(day=self.day - timedelta(days=30), window=1)
+
+        runs = self.scheduler.pending_runs(self.at(self.day, 9))
+
+        self.assertEqual(runs[0], (self.day - timedelta(days=3), 0))
+        self.assertEqual(len(runs), 6)
+
+    def test_run_pending_records_watermark(self):
+        """выполненные окна сохраняются и не запускаются повторно"""
+
+        self.assertEqual(self.scheduler.run_pending(self.at(self.day, 23, 59)), 2)
+        self.assertEqual(LiftRun.objects.count(), 2)
+        self.assertEqual(self.scheduler.pending_runs(self.at(self.day, 23, 59)), [])
+
+    def test_lifts_spread_across_windows(self):
+        """каждое автоподнятие выполняется ровно в одном окне дня"""
+
+        posts = [self.create_lift() for _ in range(6)]
+
+        first = self.scheduler.run_window(self.day, 0)
+        second = self.scheduler.run_window(self.day, 1)
+
+        self.assertGreater(first['lifted'], 0)
+        self.assertGreater(second['lifted'], 0)
+        self.assertEqual(first['lifted'] + second['lifted'], len(posts))
+        self.assertEqual(PostLiftLog.objects.filter(lift_date=self.day).count(), len(posts))
+
+    def test_stopped_scheduler_runs_nothing(self):
+        """после остановки пропущенные окна не запускаются"""
+
+        self.scheduler.stop()
+        self.scheduler.run_pending(self.at(self.day, 23, 59))
+
+        self.assertFalse(LiftRun.objects.exists())
+
+    def test_command_date(self):
+        """posts_scheduler --date выполняет все окна указанного дня"""
+
+        post = self.create_lift()
+
+        call_command('posts_scheduler', '--date', self.day.isoformat(), stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.last_lifted_at.date(), self.day)
+        self.assertTrue(LiftRun.objects.filter(day=self.day).exists())
@@ -0,0 +1,183 @@
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from country.models import Country
+from user.listing import CURSOR_PARAM
+from user.models import Post, Profile, Tag
+from user.search import get_search_page, match_query, search_posts, stem
+
+
+class SearchPostsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.mountains = Post.objects.create(author=self.user, subject='Поход', body='Неделя в горах Кавказа')
+        self.beach = Post.objects.create(author=self.user, subject='Пляж', body='Море и солнце')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def test_search_by_subject_and_body(self):
+        """поиск по теме и тексту поста"""
+
+        self.assertEqual(list(search_posts('Кавказ')), [self.mountains])
+        self.assertEqual(list(search_posts('Пляж')), [self.beach])
+
+    def test_empty_query(self):
+        """пустой запрос ничего не находит"""
+
+        self.assertEqual(list(search_posts('  ')), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'таблица FTS5 есть только в SQLite')
+class FullTextSearchTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        Profile.objects.create(user=self.user)
+        self.country = Country.objects.create(name='Грузия', alpha3_code='GEO')
+        self.tag = Tag.objects.create(name='походы')
+
+        self.mountains = Post.objects.create(author=self.user, subject='Неделя в горах', body='Кавказ и озера')
+        self.mountains.countries.add(self.country)
+        self.beach = Post.objects.create(author=self.user, subject='Пляж', body='Море, солнце и горы на горизонте')
+
+        self.factory = RequestFactory()
+        self.client.login(username='testuser', password='testpassword')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+
+    def search(self, query, cursor=None, per_page=10):
+        request = self.factory.get('/search/', {CURSOR_PARAM: cursor} if cursor else {})
+        return get_search_page(request, query, per_page)
+
+    def test_stem_word_forms(self):
+        """разные формы слова приводятся к одной основе"""
+
+        self.assertEqual(stem('горах'), stem('гора'))
+        self.assertEqual(stem('Франции'), stem('франция'))
+        self.assertEqual(stem('самолётом'), stem('самолет'))
+
+    def test_match_query_escapes_syntax(self):
+        """операторы FTS5 из запроса не попадают в MATCH"""
+
+        self.assertEqual(match_query('горы NEAR("x"'), '"гор" AND "near" AND "x"')
+        self.assertEqual(list(self.search('"(*) OR')), [])
+
+    def test_ranked_by_bm25(self):
+        """совпадение в теме выше совпадения в тексте, поиск с учетом морфологии"""
+
+        self.assertEqual(list(self.search('гора')), [self.mountains, self.beach])
+
+    def test_prefix_query(self):
+        """слово* ищет по префиксу"""
+
+        self.assertEqual(list(self.search('Кавк')), [])
+        self.assertEqual(list(self.search('Кавк*')), [self.mountains])
+
+    def test_index_follows_post_changes(self):
+        """таблица поиска обновляется при изменении и удалении поста"""
+
+        self.beach.subject = 'Пустыня'
+        self.beach.save()
+        self.assertEqual(list(search_posts('пустыни')), [self.beach])
+        self.assertEqual(list(search_posts('пляж')), [])
+
+        self.beach.delete()
+        self.assertEqual(list(search_posts('пустыни')), [])
+
+    def test_index_follows_tags_and_countries(self):
+        """теги и страны ищутся, их изменения попадают в таблицу поиска"""
+
+        self.assertEqual(list(search_posts('Грузии')), [self.mountains])
+
+        self.beach.tags.add(self.tag)
+        self.assertEqual(list(search_posts('поход')), [self.beach])
+
+        self.tag.name = 'треккинг'
+        self.tag.save()
+        self.assertEqual(list(search_posts('поход')), [])
+        self.assertEqual(list(search_posts('треккинг')), [self.beach])
+
+        self.tag.post_set.clear()
+        self.assertEqual(list(search_posts('треккинг')), [])
+
+        self.country.post_set.add(self.beach)
+        self.assertEqual(len(search_posts('Грузия')), 2)
+
+        self.country.delete()
+        self.assertEqual(list(search_posts('Грузия')), [])
+
+    def test_keyset_pages(self):
+        """выдача листается по курсору без пропусков и повторов"""
+
+        posts = [
+            Post.objects.create(author=self.user, subject=f'Поход {index}', body='горы ' * (index % 4 + 1))
+            for index in range(12)
+        ]
+
+        first = self.search('горы', per_page=5)
+        second = self.search('горы', first.next_cursor, per_page=5)
+        third = self.search('горы', second.next_cursor, per_page=5)
+        found = list(first) + list(second) + list(third)
+
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(set(found), set(posts) | {self.mountains, self.beach})
+        self.assertFalse(third.has_next)
+        self.assertEqual(list(self.search('горы', second.previous_cursor, per_page=5)), list(first))
+
+    def test_ranks_newest_candidates(self):
+        """ранжируются только SEARCH_CANDIDATES самых новых совпадений, более старые идут после них"""
+
+        newest = Post.objects.create(author=self.user, subject='Горы', body='')
+
+        with patch('user.search.SEARCH_CANDIDATES', 2):
+            self.assertEqual(list(self.search('горы')), [newest, self.beach, self.mountains])
+
+    def test_pages_past_candidates(self):
+        """выдача листается за окно SEARCH_CANDIDATES до самых старых совпадений и обратно"""
+
+        posts = [Post.objects.create(author=self.user, subject=f'Поход {index}', body='горы') for index in range(7)]
+
+        with patch('user.search.SEARCH_CANDIDATES', 3):
+            pages = [self.search('горы', per_page=2)]
+            while pages[-1].has_next:
+                pages.append(self.search('горы', pages[-1].next_cursor, per_page=2))
+            found = [post for page in pages for post in page]
+
+            self.assertEqual(len(found), 9)
+            self.assertEqual(set(found[:3]), set(posts[-3:]))
+            self.assertEqual(found[3:], posts[-4::-1] + [self.beach, self.mountains])
+
+            for previous, page in zip(pages, pages[1:]):
+                self.assertEqual(list(self.search('горы', page.previous_cursor, per_page=2)), list(previous))
+
+    def test_rebuild_search_index(self):
+        """команда rebuild_search_index заново заполняет таблицу поиска"""
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM user_post_search')
+        self.assertEqual(list(search_posts('Кавказ')), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(list(search_posts('Кавказ')), [self.mountains])
+
+    def test_search_view(self):
+        """страница поиска показывает найденные посты"""
+
+        response = self.client.get(reverse('search'), {'q': 'озера'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['posts']), [self.mountains])
+        self.assertContains(response, 'Неделя в горах')
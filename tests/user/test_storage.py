@@ -0,0 +1,115 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from user.models import Photo, Post
+from user.photos import photo_for_upload
+
+
+def image_bytes(color=(200, 120, 40)):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_sharded_name(self):
+        """файл называется хешем содержимого и лежит в подкаталогах по хешу"""
+
+        content = image_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        photo = Photo.objects.create(image=SimpleUploadedFile('Фото.JPG', content))
+
+        self.assertEqual(photo.content_hash, content_hash)
+        self.assertEqual(photo.image.name, f'post_photos/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.jpg')
+        self.assertTrue(os.path.exists(photo.image.path))
+
+    def test_same_bytes_reuse_photo(self):
+        """повторная загрузка тех же байтов возвращает существующее фото"""
+
+        content = image_bytes()
+
+        first = photo_for_upload(SimpleUploadedFile('first.jpg', content))
+        second = photo_for_upload(SimpleUploadedFile('second.jpg', content))
+        other = photo_for_upload(SimpleUploadedFile('first.jpg', image_bytes((10, 20, 30))))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(Photo.objects.count(), 2)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.image.path))), 1)
+
+    def create_flat_photo(self, name, content):
+        path = os.path.join(self.media_root, 'post_photos', name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+
+        photo = Photo.objects.create(image=SimpleUploadedFile(name, content))
+        photo.image.storage.delete(photo.image.name)
+        Photo.objects.filter(pk=photo.pk).update(image=f'post_photos/{name}', content_hash=None)
+        return Photo.objects.get(pk=photo.pk)
+
+    def test_rehash_command(self):
+        """rehash_photos переносит старые файлы и объединяет дубликаты"""
+
+        content = image_bytes()
+        original = self.create_flat_photo('beach.jpg', content)
+        duplicate = self.create_flat_photo('beach_a1b2c3.jpg', content)
+
+        post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        post.photos.add(original, duplicate)
+        other_post = Post.objects.create(author=self.user, subject='test subject', body='test body')
+        other_post.photos.add(duplicate)
+
+        out = StringIO()
+        call_command('rehash_photos', stdout=out)
+
+        self.assertIn('Photos moved: 1, duplicates merged: 1', out.getvalue())
+        self.assertEqual(Photo.objects.count(), 1)
+        photo = Photo.objects.get()
+        self.assertEqual(photo.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertTrue(os.path.exists(photo.image.path))
+        self.assertEqual(list(post.photos.all()), [photo])
+        self.assertEqual(list(other_post.photos.all()), [photo])
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'post_photos', 'beach.jpg')))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'post_photos', 'beach_a1b2c3.jpg')))
+
+    def test_rehash_command_in_batches(self):
+        """обход пачками по id объединяет дубликаты из разных пачек и пропускает отсутствующие файлы"""
+
+        content = image_bytes()
+        missing = self.create_flat_photo('missing.jpg', image_bytes((10, 20, 30)))
+        os.remove(missing.image.path)
+        for index in range(3):
+            self.create_flat_photo(f'beach_{index}.jpg', content)
+
+        out = StringIO()
+        with patch('user.management.commands.rehash_photos.REHASH_BATCH_SIZE', 1):
+            call_command('rehash_photos', stdout=out, stderr=StringIO())
+
+        self.assertIn('Photos moved: 1, duplicates merged: 2, missing files: 1', out.getvalue())
+        self.assertEqual(Photo.objects.filter(content_hash=hashlib.sha256(content).hexdigest()).count(), 1)
+        self.assertEqual(Photo.objects.filter(content_hash__isnull=True).get(), missing)
@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import tracemalloc
+from io import BytesIO
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.core.handlers.wsgi import WSGIRequest
+from django.test import TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from PIL import Image
+from country.models import Country
+from user.models import Photo, Post, Profile
+from user.uploads import PhotoUploadHandler
+
+
+def image_upload(name='photo.jpg', color=(200, 120, 40)):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+class PhotoUploadHandlerTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(username='testuser', password='password123')
+        Profile.objects.create(user=self.user)
+        self.client.login(username='testuser', password='password123')
+        self.country = Country.objects.create(name='test country')
+
+    def tearDown(self):
+        """Очистка после каждого теста."""
+        all_models = apps.get_models()
+        for model in all_models:
+            model.objects.all().delete()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def post_photos(self, photos):
+        return self.client.post(reverse('create_post'), {
+            'countries': [self.country.id],
+            'subject': 'test subject',
+            'body': 'test body',
+            'photos': photos,
+        })
+
+    def stored_files(self):
+        files = []
+        for directory, _, names in os.walk(self.media_root):
+            files += [os.path.relpath(os.path.join(directory, name), self.media_root) for name in names]
+        return files
+
+    def test_accepted_photo_stored_once(self):
+        """принятое фото сразу лежит на итоговом месте и не копируется при создании Photo"""
+
+        response = self.post_photos([image_upload()])
+
+        self.assertEqual(response.status_code, 302)
+        photo = Photo.objects.get()
+        self.assertEqual(self.stored_files(), [photo.image.name])
+        self.assertTrue(photo.image.name.endswith(f'{photo.content_hash}.jpg'))
+
+    def test_not_an_image(self):
+        """файл без сигнатуры изображения отклоняется и не сохраняется"""
+
+        text = BytesIO(b'just some text, definitely not a picture')
+        text.name = 'photo.jpg'
+
+        response = self.post_photos([text])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].errors['photos'], ['Файл photo.jpg не является изображением.'])
+        self.assertEqual(self.stored_files(), [])
+        self.assertFalse(Post.objects.exists())
+
+    def test_oversize_rejected_while_streaming(self):
+        """слишком большой файл отклоняется, недописанный файл удаляется"""
+
+        large = BytesIO(b'\xff\xd8\xff' + b'a' * 6 * 1024 * 1024)
+        large.name = 'large.jpg'
+
+        response = self.post_photos([large])
+
+        self.assertEqual(response.context['form'].errors['photos'], ['Размер изображения не может превышать 5 МБ.'])
+        self.assertEqual(self.stored_files(), [])
+
+    def test_too_many_files(self):
+        """файлы сверх десятого не записываются, принятые удаляются вместе с отклоненной формой"""
+
+        photos = [image_upload(color=(index * 20, 255 - index * 20, 0)) for index in range(11)]
+
+        response = self.post_photos(photos)
+
+        self.assertEqual(response.context['form'].errors['photos'], ['Можно прикрепить не более 10 фотографий.'])
+        self.assertEqual(self.stored_files(), [])
+
+    def test_invalid_form_leaves_no_files(self):
+        """фото из формы, не прошедшей проверку, не попадают в post_photos/"""
+
+        response = self.client.post(reverse('create_post'), {
+            'countries': [self.country.id],
+            'body': 'test body',
+            'photos': [image_upload()],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('subject', response.context['form'].errors)
+        self.assertEqual(self.stored_files(), [])
+        self.assertFalse(Photo.objects.exists())
+
+    def test_repeated_upload_leaves_no_copy(self):
+        """повторная загрузка тех же байтов не оставляет временного файла"""
+
+        self.post_photos([image_upload()])
+        self.post_photos([image_upload(name='again.jpg')])
+
+        self.assertEqual(self.stored_files(), [Photo.objects.get().image.name])
+
+    def test_interrupted_upload_removed(self):
+        """недописанный файл прерванной загрузки удаляется"""
+
+        handler = PhotoUploadHandler()
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file('photos', 'photo.jpg', 'image/jpeg', None)
+        handler.receive_data_chunk(b'\xff\xd8\xff' + b'a' * 100, 0)
+        self.assertEqual(len(self.stored_files()), 1)
+
+        handler.upload_interrupted()
+
+        self.assertTrue(handler.file.closed)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_memory_bounded(self):
+        """при разборе загрузки в памяти одновременно находится только небольшая часть файла"""
+
+        body_path = os.path.join(self.media_root, 'body')
+        with open(body_path, 'wb') as body:
+            body.write(encode_multipart(BOUNDARY, {
+                'subject': 'test subject',
+                'photos': BytesIO(b'\xff\xd8\xff' + os.urandom(4 * 1024 * 1024)),
+            }))
+
+        with open(body_path, 'rb') as body:
+            request = WSGIRequest({
+                'REQUEST_METHOD': 'POST',
+                'CONTENT_TYPE': MULTIPART_CONTENT,
+                'CONTENT_LENGTH': str(os.path.getsize(body_path)),
+                'wsgi.input': body,
+            })
+            handler = PhotoUploadHandler(request)
+            request.upload_handlers = [handler]
+
+            tracemalloc.start()
+            try:
+                files = request.FILES
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertEqual(files['photos'].size, 4 * 1024 * 1024 + 3)
+        self.assertLess(peak, 1024 * 1024)
+        files['photos'].close()
@@ -4,7 +4,9 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
+from django.core.cache import cache
 from user.models import Profile, Post, PostRatingAction, Comment, Tag
+from user.ratings import flush_rating_deltas
 from country.models import Country
 import os
 from django.conf import settings
@@ -284,7 +286,8 @@ class IndexViewTestCase(TestCase):
 
 def generate_large_test_file(size_in_mb=6, filename='large_test_image.jpg'):
     """Генерация файла размером size_in_mb в памяти"""
-    large_file = io.BytesIO(b'a' * size_in_mb * 1024 * 1024)  # создаем файл размером size_in_mb мегабайт
+    # начинается с сигнатуры JPEG, иначе файл отклоняется еще при загрузке как не изображение
+    large_file = io.BytesIO(b'\xff\xd8\xff' + b'a' * size_in_mb * 1024 * 1024)
     large_file.name = filename  # Устанавливаем имя файла
     return large_file
 
@@ -439,6 +442,7 @@ class CreatePostViewTest(TestCase):
 
 class IncreaseRatingTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(username='testuser', password='testpassword')
         self.profile = Profile.objects.create(user=self.user)
 
@@ -474,6 +478,7 @@ class IncreaseRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
 
         self.assertEqual(self.post1.rating, 1)
@@ -493,6 +498,7 @@ class IncreaseRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
 
         self.assertEqual(self.post1.rating, 0)
@@ -510,6 +516,7 @@ class IncreaseRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
         self.assertEqual(self.post1.rating, 0)
 
@@ -521,6 +528,7 @@ class IncreaseRatingTestCase(TestCase):
 
 class DowngradeRatingTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(username='testuser', password='testpassword')
         self.profile = Profile.objects.create(user=self.user)
 
@@ -554,6 +562,7 @@ class DowngradeRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
 
         self.assertEqual(self.post1.rating, 0)
@@ -573,6 +582,7 @@ class DowngradeRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
         self.assertEqual(self.post1.rating, 1)
 
@@ -588,6 +598,7 @@ class DowngradeRatingTestCase(TestCase):
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
 
+        flush_rating_deltas()
         self.post1.refresh_from_db()
         self.assertEqual(self.post1.rating, 0)
 
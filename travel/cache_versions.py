@@ -0,0 +1,57 @@
+"""
+Версионированные пространства имен кеша ( общие для приложений user и country ).
+
+Вместо удаления ключей всех пользователей в ключ кеша встраиваются номера поколений
+( feed, country_<id>, tag_<id>, author_<id>, post_<id>, profiles, countries ).
+Инвалидация - это INCR нужных поколений, старые ключи просто перестают читаться
+и вытесняются по таймауту.
+"""
+
+import time
+from django.core.cache import cache
+
+
+def generation_key(namespace):
+    return f"gen_{namespace}"
+
+
+def initial_generation():
+    # поколение после вытеснения ключа не должно совпасть с уже использованным
+    return int(time.time() * 1000)
+
+
+def get_generations(*namespaces):
+    """
+    текущие поколения пространств имен за один запрос к кешу
+    """
+    keys = [generation_key(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+
+    for key in keys:
+        if key not in generations:
+            cache.add(key, initial_generation(), timeout=None)
+            generations[key] = cache.get(key)
+
+    return [generations[key] for key in keys]
+
+
+def versioned_key(base, *namespaces):
+    """
+    ключ кеша, который становится неактуальным при смене поколения любого из namespaces
+    """
+    generations = get_generations(*namespaces)
+    suffix = '.'.join(str(generation) for generation in generations)
+    return f"{base}:{suffix}"
+
+
+def bump_generation(*namespaces):
+    """
+    инвалидация всех ключей пространств имен
+    """
+    for namespace in set(namespaces):
+        key = generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, initial_generation(), timeout=None)
+
@@ -0,0 +1,150 @@
+"""
+Чтение со реплик базы данных.
+
+Все запросы идут в основную базу, кроме чтений внутри read_replica() ( списки
+постов, боковая панель ): они распределяются по алиасам DATABASE_READ_ALIASES.
+После записи пользователь на DATABASE_PRIMARY_PIN_SECONDS закрепляется за
+основной базой ( cookie ), чтобы сразу видеть свой голос, комментарий или пост
+даже при отставании реплики. Внутри транзакции чтение тоже идет в основную базу.
+Общий кеш заполняется только чтениями из основной базы ( read_primary() ): иначе после
+смены поколения отстающая реплика записала бы в новый ключ старые данные для всех,
+включая закрепленного за основной базой автора изменения.
+
+Число чтений по алиасам за запрос копится в контексте и в конце запроса
+добавляется к счетчикам в кеше ( routing_stats ).
+"""
+
+import random
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PIN_COOKIE = 'db_primary'
+STATS_PREFIX = 'db_reads_'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned = ContextVar('pinned_to_primary', default=False)
+_request_state = ContextVar('db_request_state', default=None)
+
+
+# генераторы, а не один объект с токеном: декоратор @read_replica() создает новый
+# контекстный менеджер на каждый вызов, поэтому одновременные запросы в потоках
+# не затирают токены друг друга
+@contextmanager
+def read_replica():
+    """
+    чтения внутри блока ( или декорированного представления ) можно отправлять на реплики
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def read_primary():
+    """
+    чтения внутри блока идут в основную базу и внутри read_replica ( заполнение общего кеша )
+    """
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_aliases():
+    return getattr(settings, 'DATABASE_READ_ALIASES', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = DEFAULT_DB_ALIAS
+        route = 'primary'
+
+        aliases = read_aliases()
+        if aliases and _replica_reads.get():
+            if _pinned.get():
+                route = 'pinned'
+            elif connections[DEFAULT_DB_ALIAS].in_atomic_block:
+                route = 'atomic'
+            else:
+                alias = route = random.choice(aliases)
+
+        state = _request_state.get()
+        if state is not None:
+            state['reads'][route] += 1
+
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label != 'sessions':
+            # сохранение сессии пишется в каждом запросе и не закрепляет за основной базой
+            state['wrote'] = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        реплики - копии основной базы, миграции применяются только к ней
+        """
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """
+    закрепление за основной базой после записи и учет чтений по алиасам
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'reads': Counter(), 'wrote': False}
+        state_token = _request_state.set(state)
+        pinned_token = _pinned.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(pinned_token)
+            _request_state.reset(state_token)
+
+        if state['wrote']:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_PRIMARY_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+
+        if read_aliases():
+            record_reads(state['reads'])
+
+        return response
+
+
+def record_reads(reads):
+    for route, count in reads.items():
+        key = f'{STATS_PREFIX}{route}'
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, count)
+
+
+def routing_stats():
+    """
+    число чтений по маршрутам: алиасы реплик, primary ( вне read_replica ),
+    pinned ( закрепленные после записи ) и atomic ( внутри транзакции )
+    """
+    routes = ['primary', 'pinned', 'atomic', *read_aliases()]
+    stats = cache.get_many([f'{STATS_PREFIX}{route}' for route in routes])
+    return {route: stats.get(f'{STATS_PREFIX}{route}', 0) for route in routes}
+
+
+def reset_routing_stats():
+    cache.delete_many([f'{STATS_PREFIX}{route}' for route in routing_stats()])
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'travel.db_router.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'travel.urls'
@@ -82,24 +83,78 @@ WSGI_APPLICATION = 'travel.wsgi.application'
 В самом начале работы использовал postgres перешел на sqlite ( хочу отправить проект сразу с даннымы )
 """
 
-# DATABASES = {
-#     'default': {
-#         'ENGINE': config('DATABASE_ENGINE'),
-#         'NAME': config('DATABASE_NAME'),
-#         'USER': config('DATABASE_USER'),
-#         'PASSWORD': config('DATABASE_PASSWORD'),
-#         'HOST': config('DATABASE_HOST'),
-#         'PORT': config('DATABASE_PORT', cast=int),
-#     }
-# }
-
+# база данных: sqlite ( по умолчанию ) или postgresql
+DATABASE_ENGINE = config('DATABASE_ENGINE', default='sqlite')
+
+# SQLite в продакшене: WAL ( читатели не блокируют писателя ), synchronous=NORMAL
+# ( в режиме WAL не теряет целостность ), ожидание блокировки вместо "database is locked",
+# mmap и кеш страниц. прагмы применяются к каждому новому соединению
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-64000, cast=int),
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DATABASE_NAME', default='travel'),
+            'USER': config('DATABASE_USER', default='travel'),
+            'PASSWORD': config('DATABASE_PASSWORD', default=''),
+            'HOST': config('DATABASE_HOST', default='localhost'),
+            'PORT': config('DATABASE_PORT', default=5432, cast=int),
+            # соединения берутся из пула psycopg 3 на время запроса, CONN_MAX_AGE с пулом не используется.
+            # iterator() читает через серверные курсоры, за pgbouncer в режиме transaction их нужно отключить
+            'DISABLE_SERVER_SIDE_CURSORS': config('DATABASE_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DATABASE_POOL_MIN_SIZE', default=2, cast=int),
+                    'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+                    'timeout': config('DATABASE_POOL_TIMEOUT', default=10, cast=int),
+                },
+            },
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # соединение переиспользуется между запросами, перед повторным использованием проверяется
+            'CONN_MAX_AGE': config('CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+                # транзакция сразу берет блокировку записи: без взаимоблокировки при повышении
+                # блокировки чтения до записи, которую busy_timeout не спасает
+                'transaction_mode': config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE'),
+            },
+        }
+    }
+
+# реплики только для чтения через запятую: для SQLite - файлы, копируемые из основной базы
+# командой sync_replicas, для PostgreSQL - хосты потоковой репликации. чтения списков и
+# боковой панели распределяются по ним, после записи пользователь
+# DATABASE_PRIMARY_PIN_SECONDS читает из основной базы
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+for index, replica in enumerate(DATABASE_REPLICAS):
+    if DATABASE_ENGINE == 'postgresql':
+        replica_settings = {'HOST': replica}
+    else:
+        replica_settings = {
+            'NAME': replica,
+            'OPTIONS': {
+                'init_command': DATABASES['default']['OPTIONS']['init_command'] + ';PRAGMA query_only=1',
+            },
+        }
+    DATABASES[f'replica_{index}'] = {**DATABASES['default'], **replica_settings, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_READ_ALIASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['travel.db_router.ReplicaRouter']
+DATABASE_PRIMARY_PIN_SECONDS = config('DATABASE_PRIMARY_PIN_SECONDS', default=5, cast=int)
 
 
 CACHES = {
@@ -160,4 +215,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
-LOGIN_URL = '/login/'
\ No newline at end of file
+LOGIN_URL = '/login/'
+
+
+# Окна автоподнятия постов ( время по TIME_ZONE ), автоподнятия распределяются между окнами по id
+POST_LIFT_WINDOWS = config('POST_LIFT_WINDOWS', default='06:00,12:00,18:00,23:55', cast=Csv())
+# на сколько дней назад планировщик догоняет пропущенные окна после простоя
+POST_LIFT_MAX_CATCHUP_DAYS = config('POST_LIFT_MAX_CATCHUP_DAYS', default=7, cast=int)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, Post, Photo, Tag, Comment, PostRatingAction, AutoPostLift, PostLiftLog
+from .models import Profile, Post, Photo, Tag, Comment, PostRatingAction, AutoPostLift, PostLiftLog, LiftRun
 
 
 admin.site.register(Profile)
@@ -10,4 +10,4 @@ admin.site.register(Comment)
 admin.site.register(PostRatingAction)
 admin.site.register(AutoPostLift)
 admin.site.register(PostLiftLog)
-
+admin.site.register(LiftRun)
@@ -0,0 +1,275 @@
+"""
+Автодополнение стран и тегов.
+
+Индекс в памяти процесса: отсортированный список нормализованных написаний ( поиск по
+префиксу бинарным поиском ), триграммы написаний и ключи их начал без одной буквы
+( поиск с опечатками, когда по префиксу ничего не нашлось ). Страны ищутся по названию, альтернативным написаниям
+и кодам, индекс стран строится из реестра стран и перестраивается вместе с ним.
+Индекс тегов при сохранении или удалении тега в этом процессе обновляется на месте
+( копия с одной измененной записью ), остальные процессы перечитывают теги после смены
+поколения "tags". Опубликованный индекс не изменяется - его читают все потоки процесса.
+"""
+
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from country.registry import get_registry, split_spellings
+from travel.cache_versions import bump_generation, get_generations
+from .models import Tag
+
+
+TAGS_NAMESPACE = 'tags'
+AUTOCOMPLETE_KINDS = ('country', 'tag')
+AUTOCOMPLETE_LIMIT = 10
+PREFIX_SCAN = 200
+FUZZY_MIN_LENGTH = 4
+FUZZY_CANDIDATES = 20
+PREFIX_KEY_LENGTH = 4
+
+
+def normalize(text):
+    """
+    написание для сравнения: без регистра, диакритики ( в том числе ё -> е, й -> и )
+    и знаков препинания
+    """
+    text = unicodedata.normalize('NFKD', (text or '').casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(''.join(char if char.isalnum() else ' ' for char in text).split())
+
+
+def trigrams(term):
+    padded = f'  {term}'
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def prefix_keys(term):
+    """
+    начало написания и его варианты без одной буквы: у слов, начала которых отличаются
+    одной опечаткой, есть общий ключ
+    """
+    head = term[:PREFIX_KEY_LENGTH]
+    return {head} | {head[:index] + head[index + 1:] for index in range(len(head))}
+
+
+def prefix_distance(query, term, max_distance):
+    """
+    наименьшее расстояние Дамерау-Левенштейна от query до префикса term
+    ( max_distance + 1, если больше max_distance ). считается только полоса
+    шириной max_distance вокруг диагонали
+    """
+    limit = max_distance + 1
+    term = term[:len(query) + max_distance]
+    width = len(term)
+    previous_row = None
+    row = [j if j < limit else limit for j in range(width + 1)]
+    for i in range(1, len(query) + 1):
+        char = query[i - 1]
+        current = [limit] * (width + 1)
+        if i < limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            value = row[j - 1] if char == term[j - 1] else row[j - 1] + 1
+            if row[j] + 1 < value:
+                value = row[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and char == term[j - 2] and query[i - 2] == term[j - 1] and previous_row[j - 2] + 1 < value:
+                value = previous_row[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min >= limit:
+            return limit
+        previous_row, row = row, current
+
+    return min(row)
+
+
+class AutocompleteIndex:
+    def __init__(self, entries=(), version=None):
+        self.version = version
+        self.labels = {}
+        self.terms = {}
+        self.sorted_terms = []
+        self.owners = {}
+        self.trigrams = {}
+        self.prefix_keys = {}
+
+        for obj_id, label, spellings in entries:
+            self.add(obj_id, label, spellings)
+
+    def copy(self, version=None):
+        """
+        копия для изменения ( множества в словарях не изменяются на месте, поэтому общие )
+        """
+        index = AutocompleteIndex(version=version)
+        index.labels = dict(self.labels)
+        index.terms = dict(self.terms)
+        index.sorted_terms = list(self.sorted_terms)
+        index.owners = dict(self.owners)
+        index.trigrams = dict(self.trigrams)
+        index.prefix_keys = dict(self.prefix_keys)
+        return index
+
+    def add(self, obj_id, label, spellings):
+        """
+        добавление или замена записи. кроме написаний целиком ищутся их слова:
+        "kingdom" находит "United Kingdom"
+        """
+        self.remove(obj_id)
+
+        terms = set()
+        for spelling in spellings:
+            words = normalize(spelling).split()
+            for start in range(len(words)):
+                terms.add((' '.join(words[start:]), start > 0))
+
+        self.labels[obj_id] = label
+        self.terms[obj_id] = tuple(terms)
+        for term, inner in terms:
+            insort(self.sorted_terms, (term, inner, obj_id))
+            if term not in self.owners:
+                for trigram in trigrams(term):
+                    self.trigrams[trigram] = self.trigrams.get(trigram, frozenset()) | {term}
+                for key in prefix_keys(term):
+                    self.prefix_keys[key] = self.prefix_keys.get(key, frozenset()) | {term}
+            self.owners[term] = self.owners.get(term, frozenset()) | {(inner, obj_id)}
+
+    def remove(self, obj_id):
+        self.labels.pop(obj_id, None)
+        for term, inner in self.terms.pop(obj_id, ()):
+            key = (term, inner, obj_id)
+            position = bisect_left(self.sorted_terms, key)
+            if position < len(self.sorted_terms) and self.sorted_terms[position] == key:
+                del self.sorted_terms[position]
+
+            owners = self.owners.get(term, frozenset()) - {(inner, obj_id)}
+            if owners:
+                self.owners[term] = owners
+                continue
+
+            self.owners.pop(term, None)
+            for postings, keys in ((self.trigrams, trigrams(term)), (self.prefix_keys, prefix_keys(term))):
+                for key in keys:
+                    terms = postings.get(key, frozenset()) - {term}
+                    if terms:
+                        postings[key] = terms
+                    else:
+                        postings.pop(key, None)
+
+    def label(self, obj_id):
+        return self.labels.get(obj_id)
+
+    def search(self, query, limit=AUTOCOMPLETE_LIMIT):
+        """
+        [(id, label)] по началу написания, если таких нет - с опечатками.
+        порядок: точное совпадение, начало написания, начало слова, опечатка
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        best = {}
+
+        def offer(obj_id, score):
+            if obj_id not in best or score < best[obj_id]:
+                best[obj_id] = score
+
+        position = bisect_left(self.sorted_terms, (query,))
+        for term, inner, obj_id in self.sorted_terms[position:position + PREFIX_SCAN]:
+            if not term.startswith(query):
+                break
+            rank = 2 if inner else (0 if term == query else 1)
+            offer(obj_id, (rank, 0, len(term)))
+
+        if not best and len(query) >= FUZZY_MIN_LENGTH:
+            max_distance = 1 if len(query) <= 7 else 2
+            query_trigrams = trigrams(query)
+            shared = Counter()
+            for trigram in query_trigrams:
+                shared.update(self.trigrams.get(trigram, ()))
+
+            # опечатка ( в том числе перестановка соседних букв ) портит не больше четырех триграмм
+            required = max(1, len(query_trigrams) - 4 * max_distance)
+            candidates = [term for term, count in shared.most_common(FUZZY_CANDIDATES) if count >= required]
+            # у коротких запросов мало триграмм - кандидаты по началу слова
+            for key in prefix_keys(query):
+                candidates.extend(sorted(term for term in self.prefix_keys.get(key, ()) if shared[term] >= required))
+
+            checked = set()
+            for term in candidates:
+                if len(best) >= limit:
+                    break
+                if term in checked:
+                    continue
+                checked.add(term)
+
+                distance = prefix_distance(query, term, max_distance)
+                if distance > max_distance:
+                    continue
+                for inner, obj_id in self.owners[term]:
+                    if obj_id not in best:
+                        offer(obj_id, (3, distance, len(term)))
+
+        ranked = sorted(best, key=lambda obj_id: (best[obj_id], self.labels[obj_id]))
+        return [(obj_id, self.labels[obj_id]) for obj_id in ranked[:limit]]
+
+
+def country_entries(registry):
+    for country in registry:
+        spellings = [country.name, country.alpha2_code, country.alpha3_code]
+        spellings += split_spellings(country.alt_spellings)
+        yield country.id, country.name, [spelling for spelling in spellings if spelling]
+
+
+_indexes = {}
+
+
+def get_autocomplete_index(kind):
+    """
+    актуальный индекс стран ( kind='country' ) или тегов ( kind='tag' )
+    """
+    if kind == 'country':
+        registry = get_registry()
+        index = _indexes.get(kind)
+        if index is None or index.version != registry.version:
+            index = AutocompleteIndex(country_entries(registry), registry.version)
+            _indexes[kind] = index
+        return index
+
+    version = get_generations(TAGS_NAMESPACE)[0]
+    index = _indexes.get(kind)
+    if index is None or index.version != version:
+        index = AutocompleteIndex(
+            ((tag_id, name, [name]) for tag_id, name in Tag.objects.order_by('id').values_list('id', 'name')),
+            version
+        )
+        _indexes[kind] = index
+    return index
+
+
+def update_tag_index(tag, deleted=False):
+    """
+    изменение тега: индекс этого процесса обновляется на месте, если до изменения был
+    актуальным ( иначе перестроится при следующем поиске ), другие процессы - по поколению
+    """
+    current = _indexes.get('tag')
+    bump_generation(TAGS_NAMESPACE)
+    if current is None:
+        return
+
+    version = get_generations(TAGS_NAMESPACE)[0]
+    if version != current.version + 1:
+        return
+
+    index = current.copy(version)
+    if deleted:
+        index.remove(tag.id)
+    else:
+        index.add(tag.id, tag.name, [tag.name])
+    _indexes['tag'] = index
+
+
+def autocomplete(kind, query, limit=AUTOCOMPLETE_LIMIT):
+    return get_autocomplete_index(kind).search(query, limit)
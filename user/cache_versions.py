@@ -0,0 +1,13 @@
+"""
+Пространства имен кеша постов ( поколения - travel/cache_versions.py ).
+"""
+
+
+def post_namespaces(post):
+    """
+    пространства имен кеша, в которых может находиться пост
+    """
+    namespaces = ['feed', f"author_{post.author_id}", f"post_{post.id}"]
+    namespaces += [f"country_{country_id}" for country_id in post.countries.values_list('id', flat=True)]
+    namespaces += [f"tag_{tag_id}" for tag_id in post.tags.values_list('id', flat=True)]
+    return namespaces
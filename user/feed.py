@@ -0,0 +1,154 @@
+from functools import partial
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from .models import FeedEntry, FeedTask, Post, Profile
+
+
+FEED_BATCH_SIZE = 1000
+FEED_TASK_BATCH_SIZE = 100
+
+
+def post_lifted_at(post):
+    """
+    время, по которому пост сортируется в ленте
+    """
+    return post.last_lifted_at or post.create_date
+
+
+def feed_recipients(post):
+    """
+    id пользователей, в ленту которых попадает пост:
+    интересующиеся странами поста и те, у кого автор поста в подписчиках.
+    два отдельных запроса по индексам m2m таблиц вместо OR-join по всем профилям
+    """
+    interested = Profile.countries_interest.through.objects.filter(
+        country__in=post.countries.all()
+    ).values_list('profile__user_id', flat=True)
+
+    followed = Profile.followers.through.objects.filter(
+        user_id=post.author_id
+    ).values_list('profile__user_id', flat=True)
+
+    return interested, followed
+
+
+def fan_out_post(post):
+    """
+    добавляет пост в ленты всех получателей ( уже существующие записи не трогаются )
+    """
+    lifted_at = post_lifted_at(post)
+    batch = []
+
+    for recipients in feed_recipients(post):
+        for user_id in recipients.iterator(chunk_size=FEED_BATCH_SIZE):
+            batch.append(FeedEntry(user_id=user_id, post_id=post.id, lifted_at=lifted_at))
+            if len(batch) >= FEED_BATCH_SIZE:
+                FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+
+    if batch:
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def refresh_post_in_feeds(post):
+    """
+    пересчет получателей поста после изменения его стран:
+    удаляет пост из лент, которым он больше не положен, и добавляет в новые
+    """
+    interested, followed = feed_recipients(post)
+
+    with transaction.atomic():
+        FeedEntry.objects.filter(post=post).exclude(user_id__in=interested).exclude(user_id__in=followed).delete()
+        fan_out_post(post)
+
+
+def schedule_post_fan_out(post_ids):
+    """
+    ставит посты в очередь раскладки по лентам после коммита транзакции:
+    в запросе остается одна вставка вместо записи в ленты всех получателей
+    """
+    transaction.on_commit(partial(enqueue_post_fan_out, list(post_ids)))
+
+
+def enqueue_post_fan_out(post_ids):
+    """
+    задачи только для существующих постов ( пост мог быть удален в той же транзакции )
+    """
+    existing = Post.objects.filter(id__in=post_ids).values_list('id', flat=True)
+    FeedTask.objects.bulk_create([FeedTask(post_id=post_id) for post_id in existing])
+
+
+def schedule_feed_rebuild(user_ids):
+    """
+    ставит ленты пользователей в очередь пересборки после коммита транзакции
+    ( смена интересующих стран или подписок не ждет записи всей ленты )
+    """
+    transaction.on_commit(partial(enqueue_feed_rebuild, list(user_ids)))
+
+
+def enqueue_feed_rebuild(user_ids):
+    existing = Profile.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+    FeedTask.objects.bulk_create([FeedTask(user_id=user_id) for user_id in existing])
+
+
+def process_feed_tasks(limit=FEED_TASK_BATCH_SIZE):
+    """
+    выполняет очередную пачку задач из очереди, возвращает их количество.
+    повторные задачи одного поста или пользователя выполняются один раз, задачи,
+    поставленные во время обработки, остаются в очереди до следующей пачки
+    """
+    tasks = list(FeedTask.objects.order_by('id').values_list('id', 'post_id', 'user_id')[:limit])
+
+    for post in Post.objects.filter(id__in={post_id for task_id, post_id, user_id in tasks if post_id}):
+        refresh_post_in_feeds(post)
+
+    for user_id in sorted({user_id for task_id, post_id, user_id in tasks if user_id}):
+        rebuild_feed(User(id=user_id))
+
+    FeedTask.objects.filter(id__in=[task_id for task_id, post_id, user_id in tasks]).delete()
+    return len(tasks)
+
+
+def lift_post_in_feeds(post):
+    """
+    переносит поднятый пост наверх во всех лентах, где он есть
+    """
+    FeedEntry.objects.filter(post=post).update(lifted_at=post_lifted_at(post))
+
+
+def rebuild_feed(user):
+    """
+    пересборка ленты пользователя ( смена интересующих стран или подписчиков ):
+    удаляются только посты, которые больше не положены, и добавляются недостающие
+    """
+    try:
+        profile = Profile.objects.get(user=user)
+    except Profile.DoesNotExist:
+        return
+
+    posts = Post.objects.filter(
+        Q(countries__in=profile.countries_interest.all()) |
+        Q(author__in=profile.followers.all())
+    )
+
+    with transaction.atomic():
+        FeedEntry.objects.filter(user=user).exclude(post_id__in=posts.values('id')).delete()
+
+        batch = []
+        rows = posts.values_list('id', 'last_lifted_at', 'create_date').distinct()
+        for post_id, last_lifted_at, create_date in rows.iterator(chunk_size=FEED_BATCH_SIZE):
+            batch.append(FeedEntry(user=user, post_id=post_id, lifted_at=last_lifted_at or create_date))
+            if len(batch) >= FEED_BATCH_SIZE:
+                FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+
+        if batch:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def get_feed_entries(user):
+    """
+    лента пользователя в порядке поднятия постов
+    """
+    return FeedEntry.objects.filter(user=user).order_by('-lifted_at', '-post_id')
@@ -3,8 +3,12 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import AuthenticationForm
 from django.core.validators import MinLengthValidator
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+from .autocomplete import get_autocomplete_index
 from .models import Profile, Post, Tag, Comment
-from country.models import Country
+from country.forms import CountryMultipleChoiceField
 
 
 class MultipleFileInput(forms.ClearableFileInput):
@@ -25,13 +29,69 @@ class MultipleFileField(forms.FileField):
         return result
 
 
+class AutocompleteSelectMultiple(forms.Widget):
+    """
+    выбор нескольких стран или тегов: выбранные - скрытые поля, остальные варианты
+    подсказываются при вводе ( /autocomplete/ ) и в HTML формы не попадают
+    """
+    allow_multiple_selected = True
+
+    class Media:
+        css = {'all': ('css/autocomplete.css',)}
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def format_value(self, value):
+        if value is None:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [str(pk) for pk in value if pk not in ('', None)]
+
+    def value_from_datadict(self, data, files, name):
+        try:
+            return data.getlist(name)
+        except AttributeError:
+            return data.get(name)
+
+    def value_omitted_from_data(self, data, files, name):
+        # как у SelectMultiple: пустой выбор не отправляется вовсе
+        return False
+
+    def use_required_attribute(self, initial):
+        return False
+
+    def render(self, name, value, attrs=None, renderer=None):
+        index = get_autocomplete_index(self.kind)
+        selected = []
+        for pk in self.format_value(value):
+            label = index.label(int(pk)) if pk.isdigit() else None
+            if label is not None:
+                selected.append((label, name, pk))
+
+        chips = format_html_join(
+            '',
+            '<span class="autocomplete-chip">{}<input type="hidden" name="{}" value="{}">'
+            '<button type="button" class="autocomplete-remove" aria-label="Убрать">&times;</button></span>',
+            selected
+        )
+        return format_html(
+            '<div class="autocomplete" data-url="{}" data-name="{}">{}'
+            '<input type="text" class="autocomplete-input" autocomplete="off"{}>'
+            '<ul class="autocomplete-results"></ul></div>',
+            f"{reverse('autocomplete')}?kind={self.kind}", name, chips, flatatt(self.build_attrs(self.attrs, attrs))
+        )
+
+
 class RegistrationForm(forms.ModelForm):
     username = forms.CharField(max_length=150, required=True)
     password = forms.CharField(widget=forms.PasswordInput, required=True, label='Пароль')
     confirm_password = forms.CharField(widget=forms.PasswordInput, required=True, label='Подтверждение пароля')
-    countries_interest = forms.ModelMultipleChoiceField(
-        queryset=Country.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+    countries_interest = CountryMultipleChoiceField(
+        widget=AutocompleteSelectMultiple('country', attrs={'placeholder': 'Начните вводить страну'}),
         required=True
     )
 
@@ -93,15 +153,14 @@ class UserLoginForm(AuthenticationForm):
 
 
 class PostForm(forms.ModelForm):
-    countries = forms.ModelMultipleChoiceField(
-        queryset=Country.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+    countries = CountryMultipleChoiceField(
+        widget=AutocompleteSelectMultiple('country', attrs={'placeholder': 'Начните вводить страну'}),
         label='Страны',
         required=True
     )
     tags = forms.ModelMultipleChoiceField(
         queryset=Tag.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('tag', attrs={'placeholder': 'Начните вводить тег'}),
         label='Теги',
         required=False
     )
@@ -122,7 +181,17 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ['countries', 'tags',  'subject', 'body', 'photos']  # Укажите поля, которые хотите включить в форму
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ошибки, найденные PhotoUploadHandler еще во время загрузки
+        self.upload_errors = upload_errors or []
+        if self.upload_errors:
+            self.fields['photos'].required = False
+
     def clean_photos(self):
+        if self.upload_errors:
+            raise forms.ValidationError(self.upload_errors)
+
         photos = self.cleaned_data.get('photos')
 
         if len(photos) > 10:
@@ -0,0 +1,81 @@
+"""
+Топ авторов и данные боковой панели ( commom_info.html ).
+
+Суммарный рейтинг автора хранится в Profile.total_rating и меняется вместе со
+сбросом рейтингов постов, а сама панель целиком кешируется в пространстве имен
+sidebar и инвалидируется событиями ( новый/удаленный пост, тег, сброс рейтингов ).
+"""
+
+from collections import defaultdict
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from travel.cache_versions import bump_generation, versioned_key
+from travel.db_router import read_primary
+from .models import Post, Profile, Tag
+
+
+SIDEBAR_TIMEOUT = 60*5
+TOP_USERS_COUNT = 5
+LATEST_POSTS_COUNT = 3
+
+
+def apply_author_rating_deltas(post_deltas):
+    """
+    переносит изменения рейтинга постов {post_id: delta} в рейтинг их авторов одним UPDATE
+    """
+    author_deltas = defaultdict(int)
+    for post_id, author_id in Post.objects.filter(pk__in=post_deltas).values_list('id', 'author_id'):
+        author_deltas[author_id] += post_deltas[post_id]
+
+    author_deltas = {author_id: delta for author_id, delta in author_deltas.items() if delta}
+    if not author_deltas:
+        return
+
+    Profile.objects.filter(user_id__in=author_deltas).update(
+        total_rating=F('total_rating') + Case(
+            *[When(user_id=author_id, then=Value(delta)) for author_id, delta in author_deltas.items()],
+            default=Value(0)
+        )
+    )
+
+
+def rebuild_author_ratings():
+    """
+    полный пересчет Profile.total_rating ( после ручного изменения рейтингов в админке )
+    одним UPDATE с подзапросом: читатели не видят обнуленные или наполовину пересчитанные суммы
+    """
+    with transaction.atomic():
+        Profile.objects.update(total_rating=Coalesce(Subquery(author_rating_totals()), 0))
+    bump_generation('sidebar')
+
+
+def author_rating_totals():
+    """
+    подзапрос суммы рейтингов постов автора профиля
+    """
+    return Post.objects.filter(author_id=OuterRef('user_id')).order_by().values('author_id').annotate(
+        total=Sum('rating')
+    ).values('total')
+
+
+def get_sidebar():
+    """
+    последние посты, топ авторов и облако тегов ( на теплом кеше без запросов к базе )
+    """
+    cache_key = versioned_key('sidebar', 'sidebar')
+    sidebar = cache.get(cache_key)
+
+    if sidebar is None:
+        with read_primary():
+            sidebar = {
+                'latest_posts': list(Post.objects.order_by('-create_date').only('id', 'subject')[:LATEST_POSTS_COUNT]),
+                'tag_cloud': list(Tag.objects.all()),
+                'top_users': list(
+                    Profile.objects.filter(total_rating__gt=0).select_related('user').order_by('-total_rating')[:TOP_USERS_COUNT]
+                ),
+            }
+        cache.set(cache_key, sidebar, timeout=SIDEBAR_TIMEOUT)
+
+    return sidebar
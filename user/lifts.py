@@ -0,0 +1,133 @@
+"""
+Движок автоподнятия постов.
+
+Подходящие на день автоподнятия выбираются в базе, обрабатываются пачками по id
+( память ограничена размером пачки ), поднятие и логи пишутся массово в одной
+транзакции на пачку. Повторный запуск за тот же день ничего не делает: посты,
+у которых уже есть лог с этим lift_date, пропускаются.
+"""
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Mod
+from django.utils import timezone
+from travel.cache_versions import bump_generation
+from .models import AutoPostLift, FeedEntry, Post, PostLiftLog, weekday_bit
+
+
+LIFT_CHUNK_SIZE = 1000
+
+
+def active_lifts(day):
+    """
+    автоподнятия, активные в день day. в PostgreSQL - вхождение дня в диапазон дат
+    по GiST-индексу autolift_active_range_idx ( миграция 0021 ): b-tree по двум границам
+    для такого запроса просматривает все автоподнятия, начавшиеся раньше day
+    """
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.fields import DateRangeField
+
+        return AutoPostLift.objects.annotate(
+            active_days=RawSQL(
+                """daterange("user_autopostlift"."start_date", "user_autopostlift"."end_date", '[]')""",
+                [],
+                output_field=DateRangeField()
+            )
+        ).filter(active_days__contains=day)
+
+    return AutoPostLift.objects.filter(start_date__lte=day, end_date__gte=day)
+
+
+def due_lifts(day):
+    """
+    автоподнятия, которые должны сработать в этот день:
+    выбран день недели ( бит в weekday_mask ) или последний день автоподнятия
+    """
+    day_matches = Q(day_bit__gt=0)
+
+    return active_lifts(day).annotate(
+        day_bit=F('weekday_mask').bitand(weekday_bit(day))
+    ).filter(
+        day_matches | Q(end_date=day)
+    ).annotate(
+        is_lift_day=Case(When(day_matches, then=Value(True)), default=Value(False), output_field=BooleanField())
+    )
+
+
+def run_lifts(day=None, now=None, chunk_size=LIFT_CHUNK_SIZE, window=0, windows=1):
+    """
+    поднимает посты за день day, возвращает статистику {'lifted', 'reset', 'skipped'}.
+    при windows > 1 обрабатывается только часть автоподнятий с id % windows == window
+    """
+    day = day or timezone.localdate()
+    now = now or timezone.now()
+    stats = {'lifted': 0, 'reset': 0, 'skipped': 0}
+
+    lifts = due_lifts(day)
+    if windows > 1:
+        lifts = lifts.annotate(window_slot=Mod('id', windows)).filter(window_slot=window)
+
+    lifts = lifts.order_by('id').values_list('id', 'post_id', 'end_date', 'is_lift_day')
+
+    last_id = 0
+    while True:
+        rows = list(lifts.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            break
+
+        last_id = rows[-1][0]
+        lift_chunk(rows, day, now, stats)
+
+    AutoPostLift.objects.filter(end_date__lt=day).delete()
+
+    return stats
+
+
+def lift_chunk(rows, day, now, stats):
+    post_ids = {post_id for lift_id, post_id, end_date, is_lift_day in rows}
+
+    with transaction.atomic():
+        done = set(
+            PostLiftLog.objects.filter(post_id__in=post_ids, lift_date=day).values_list('post_id', flat=True)
+        )
+        stats['skipped'] += len(post_ids & done)
+
+        to_lift = {post_id for lift_id, post_id, end_date, is_lift_day in rows if is_lift_day} - done
+        to_reset = {post_id for lift_id, post_id, end_date, is_lift_day in rows if end_date == day} - done - to_lift
+
+        if not to_lift and not to_reset:
+            return
+
+        subjects = dict(Post.objects.filter(id__in=to_lift | to_reset).values_list('id', 'subject'))
+
+        if to_lift:
+            Post.objects.filter(id__in=to_lift).update(last_lifted_at=now)
+            FeedEntry.objects.filter(post_id__in=to_lift).update(lifted_at=now)
+
+        if to_reset:
+            Post.objects.filter(id__in=to_reset).update(last_lifted_at=F('create_date'))
+            FeedEntry.objects.filter(post_id__in=to_reset).update(
+                lifted_at=Subquery(Post.objects.filter(pk=OuterRef('post_id')).values('create_date')[:1])
+            )
+
+        logs = [
+            PostLiftLog(
+                post_id=post_id, lifted_at=now, lift_date=day,
+                message=f'Пост "{subjects.get(post_id)}" поднят автоматически'[:255]
+            )
+            for post_id in to_lift
+        ]
+        logs += [
+            PostLiftLog(
+                post_id=post_id, lifted_at=now, lift_date=day,
+                message=f'Пост "{subjects.get(post_id)}" поднят автоматически, last_lifted_at установлен на create_date.'[:255]
+            )
+            for post_id in to_reset
+        ]
+        PostLiftLog.objects.bulk_create(logs)
+
+    stats['lifted'] += len(to_lift)
+    stats['reset'] += len(to_reset)
+
+    bump_generation('feed')
@@ -0,0 +1,233 @@
+"""
+Кешируемые списки для постраничных представлений.
+
+В кеше хранится только упорядоченный кортеж первичных ключей ( его длина - общее количество ),
+объекты текущей страницы подгружаются из базы одним in_bulk с нужными
+select_related / prefetch_related.
+
+Длинные списки постов и комментариев листаются по курсору ( keyset ): страница -
+это выборка по индексу "после ключа сортировки последней строки" без COUNT(*)
+и OFFSET, поэтому тысячная страница стоит столько же, сколько первая.
+Курсор - непрозрачный токен с направлением и значениями ключа сортировки.
+"""
+
+import base64
+import binascii
+import json
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from travel.db_router import read_primary
+
+
+CURSOR_PARAM = 'cursor'
+
+
+def get_cached_ids(cache_key, queryset, timeout=60*5):
+    """
+    упорядоченные id объектов queryset ( кешируются компактным кортежем )
+    """
+    ids = cache.get(cache_key)
+    if ids is None:
+        with read_primary():
+            ids = tuple(queryset.values_list('pk', flat=True))
+        cache.set(cache_key, ids, timeout=timeout)
+
+    return ids
+
+
+def hydrate(ids, queryset):
+    """
+    объекты по списку id в том же порядке ( удаленные с момента кеширования пропускаются )
+    """
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def get_cached_page(request, cache_key, queryset, hydrate_queryset, per_page, timeout=60*5):
+    """
+    страница списка: id из кеша, объекты только для текущей страницы
+    """
+    ids = get_cached_ids(cache_key, queryset, timeout=timeout)
+
+    paginator = Paginator(ids, per_page)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = hydrate(page_obj.object_list, hydrate_queryset)
+
+    return page_obj
+
+
+def encode_cursor(direction, values=None):
+    """
+    токен курсора: направление ( next - после values, prev - перед values ) и ключ сортировки.
+    prev без ключа - последняя страница
+    """
+    data = {'d': direction}
+    if values is not None:
+        data['k'] = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def cursor_value(model, key, value):
+    """
+    значение ключа сортировки из токена. ключ не поле модели ( аннотация, например rank поиска ) -
+    только число
+    """
+    try:
+        field = model._meta.get_field(key.lstrip('-'))
+    except FieldDoesNotExist:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value
+
+    return field.to_python(value)
+
+
+def decode_cursor(token, model, ordering):
+    """
+    (направление, значения ключа) из токена, неверный токен - первая страница
+    """
+    if not token:
+        return 'next', None
+
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        direction = data['d']
+        values = data.get('k')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+
+        if values is not None:
+            if len(values) != len(ordering):
+                raise ValueError(values)
+            values = [cursor_value(model, key, value) for key, value in zip(ordering, values)]
+    except (ValueError, TypeError, KeyError, AttributeError, ValidationError, binascii.Error):
+        return 'next', None
+
+    return direction, values
+
+
+def keyset_filter(ordering, values, reverse=False):
+    """
+    условие "строка идет после values" в порядке ordering ( reverse - в обратном порядке ).
+    первый ключ дополнительно ограничен диапазоном, чтобы база шла по индексу
+    """
+    condition = Q()
+    equal = {}
+    for key, value in zip(ordering, values):
+        name = key.lstrip('-')
+        descending = key.startswith('-') != reverse
+        condition |= Q(**equal, **{f'{name}__lt' if descending else f'{name}__gt': value})
+        equal[name] = value
+
+    first = ordering[0].lstrip('-')
+    descending = ordering[0].startswith('-') != reverse
+    return Q(**{f'{first}__lte' if descending else f'{first}__gte': values[0]}) & condition
+
+
+def fetch_keyset_rows(queryset, ordering, direction, values, per_page, id_field='pk'):
+    """
+    строки (id, *ключ) страницы и признак того, что дальше в этом направлении есть еще строки
+    """
+    reverse = direction == 'prev'
+    names = [key.lstrip('-') for key in ordering]
+    order = [(name if key.startswith('-') else f'-{name}') if reverse else key for key, name in zip(ordering, names)]
+
+    rows = queryset.order_by(*order)
+    if values is not None:
+        rows = rows.filter(keyset_filter(ordering, values, reverse))
+
+    rows = [tuple(row) for row in rows.values_list(id_field, *names)[:per_page + 1]]
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+
+    return rows, has_more
+
+
+class CursorPage:
+    """
+    страница списка по курсору ( вместо Page из Paginator, номера страниц и общего количества нет )
+    """
+
+    last_cursor = encode_cursor('prev')
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def get_cursor_page(request, queryset, ordering, hydrate_queryset, per_page,
+                    cache_key=None, id_field='pk', timeout=60*5):
+    """
+    страница списка по курсору из request.GET.
+    ordering - ключ сортировки, последнее поле должно быть уникальным ( обычно id ).
+    id_field - поле с id объектов hydrate_queryset. с cache_key строки страницы кешируются
+    ( и читаются из основной базы )
+    """
+    direction, values = decode_cursor(request.GET.get(CURSOR_PARAM), queryset.model, ordering)
+
+    page_key = None
+    if cache_key:
+        page_key = f"{cache_key}_{encode_cursor(direction, values)}"
+        cached = cache.get(page_key)
+    else:
+        cached = None
+
+    if cached is None and page_key:
+        with read_primary():
+            cached = fetch_keyset_rows(queryset, ordering, direction, values, per_page, id_field=id_field)
+        cache.set(page_key, cached, timeout=timeout)
+    elif cached is None:
+        cached = fetch_keyset_rows(queryset, ordering, direction, values, per_page, id_field=id_field)
+
+    rows, has_more = cached
+
+    return build_cursor_page(rows, has_more, direction, values, hydrate_queryset)
+
+
+def build_cursor_page(rows, has_more, direction, values, hydrate_queryset):
+    """
+    страница из строк (id, *ключ), выбранных в направлении direction после ключа values
+    """
+    if direction == 'next':
+        has_next, has_previous = has_more, values is not None
+    else:
+        has_next, has_previous = values is not None, has_more
+
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor('next', rows[-1][1:])
+    if rows and has_previous:
+        previous_cursor = encode_cursor('prev', rows[0][1:])
+    if not rows and values is not None:
+        # за курсором ничего не осталось ( строки удалены ) - возврат с того же места
+        if direction == 'next':
+            previous_cursor = encode_cursor('prev', values)
+        else:
+            next_cursor = encode_cursor('next', values)
+
+    objects = hydrate([row[0] for row in rows], hydrate_queryset)
+    return CursorPage(objects, next_cursor=next_cursor, previous_cursor=previous_cursor)
@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from ...feed import rebuild_feed
+from ...models import Profile
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds materialized feeds (FeedEntry) for all users or for the given ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='user id (can be repeated)')
+
+    def handle(self, *args, **options):
+        user_ids = Profile.objects.values_list('user_id', flat=True).order_by('user_id')
+        if options['user_ids']:
+            user_ids = user_ids.filter(user_id__in=options['user_ids'])
+
+        count = 0
+        for user_id in user_ids.iterator(chunk_size=500):
+            rebuild_feed(User(id=user_id))
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Feeds rebuilt: {count}'))
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from ...ratings import flush_rating_deltas
+
+
+class Command(BaseCommand):
+    help = 'Writes accumulated post rating changes from the cache to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='seconds between flushes')
+        parser.add_argument('--once', action='store_true', help='flush once and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            flushed = flush_rating_deltas()
+            self.stdout.write(self.style.SUCCESS(f'Ratings flushed: {flushed}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Ratings flusher started'))
+        try:
+            while True:
+                try:
+                    flush_rating_deltas()
+                except Exception as error:
+                    self.stderr.write(f'Ratings flush failed: {error!r}')
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            flush_rating_deltas()
+            self.stdout.write('Ratings flusher stopped')
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from ...photo_gc import GC_BATCH_SIZE, collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Deletes photos without posts and media files without photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='only report what would be deleted')
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='keep photos and files younger than this (uploads in progress)')
+        parser.add_argument('--batch-size', type=int, default=GC_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=0,
+                            help='repeat every N hours instead of running once')
+
+    def handle(self, *args, **options):
+        grace = timedelta(hours=options['grace_hours'])
+
+        try:
+            while True:
+                stats = collect_garbage(grace, options['dry_run'], options['batch_size'])
+                prefix = 'Would delete' if options['dry_run'] else 'Deleted'
+                self.stdout.write(self.style.SUCCESS(
+                    f"{prefix} photos: {stats['photos']}, files: {stats['files']}, "
+                    f"reclaimed bytes: {stats['bytes']}"
+                ))
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'] * 3600)
+        except KeyboardInterrupt:
+            self.stdout.write('Photo garbage collector stopped')
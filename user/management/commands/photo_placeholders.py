@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ...photos import describe_pending_photos
+
+
+class Command(BaseCommand):
+    help = 'Fills in dimensions, dominant colour and LQIP placeholders for existing photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        described, failed = describe_pending_photos(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Photos described: {described}, failed: {failed}'))
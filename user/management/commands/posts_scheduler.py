@@ -1,10 +1,32 @@
-from django.core.management.base import BaseCommand
-from ...scheduler_posts import start_scheduler
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from ...scheduler_posts import LiftScheduler
 
 
 class Command(BaseCommand):
     help = 'Starts the scheduler posts'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='run due and missed lift windows and exit')
+        parser.add_argument('--date', help='run all lift windows of the date (YYYY-MM-DD) and exit')
+        parser.add_argument('--interval', type=float, default=30, help='seconds between checks for due windows')
+
     def handle(self, *args, **options):
-        start_scheduler()
-        self.stdout.write(self.style.SUCCESS('Scheduler posts started successfully'))
\ No newline at end of file
+        scheduler = LiftScheduler(poll_interval=options['interval'], log=self.stdout.write)
+
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+            scheduler.run_day(day)
+            self.stdout.write(self.style.SUCCESS(f'Lifts for {day} finished'))
+            return
+
+        if options['once']:
+            runs = scheduler.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Lift windows run: {runs}'))
+            return
+
+        scheduler.start()
+        self.stdout.write(self.style.SUCCESS('Scheduler posts stopped'))
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from ...feed import process_feed_tasks
+
+
+class Command(BaseCommand):
+    help = 'Adds new and changed posts to the materialized feeds of their recipients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1, help='seconds between checks for new posts')
+        parser.add_argument('--once', action='store_true', help='process all queued posts and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = 0
+            while True:
+                batch = process_feed_tasks()
+                if not batch:
+                    break
+                processed += batch
+            self.stdout.write(self.style.SUCCESS(f'Feed tasks processed: {processed}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Feed worker started'))
+        try:
+            while True:
+                try:
+                    batch = process_feed_tasks()
+                except Exception as error:
+                    self.stderr.write(f'Feed tasks failed: {error!r}')
+                    batch = 0
+                if not batch:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Feed worker stopped')
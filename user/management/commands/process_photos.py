@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from ...models import Photo
+from ...photos import process_pending_photos
+
+
+class Command(BaseCommand):
+    help = 'Generates resized variants for uploaded post photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2, help='seconds between checks for new photos')
+        parser.add_argument('--once', action='store_true', help='process all pending photos and exit')
+        parser.add_argument('--reprocess', action='store_true',
+                            help='mark all photos as pending first (e.g. after adding a format)')
+
+    def handle(self, *args, **options):
+        if options['reprocess']:
+            pending = Photo.objects.update(processed_at=None)
+            self.stdout.write(f'Photos marked for processing: {pending}')
+
+        if options['once']:
+            processed = 0
+            while True:
+                batch = process_pending_photos()
+                if not batch:
+                    break
+                processed += batch
+            self.stdout.write(self.style.SUCCESS(f'Photos processed: {processed}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Photo worker started'))
+        try:
+            while True:
+                if not process_pending_photos():
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Photo worker stopped')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ...leaderboard import rebuild_author_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recalculates Profile.total_rating from post ratings'
+
+    def handle(self, *args, **options):
+        rebuild_author_ratings()
+        self.stdout.write(self.style.SUCCESS('Author ratings rebuilt'))
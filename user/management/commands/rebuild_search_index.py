@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ...search import INDEX_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the FTS5 post search table from posts, tags and countries (SQLite only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=INDEX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Posts indexed: {count}'))
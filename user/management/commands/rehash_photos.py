@@ -0,0 +1,109 @@
+import os
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...models import Photo, Post
+from ...storage import PHOTO_DIR, content_name, hash_file, photo_storage
+
+
+REHASH_BATCH_SIZE = 500
+
+
+def media_stats():
+    """
+    (байт, файлов, записей в post_photos/, время чтения каталога post_photos/ в мс)
+    каталоги обходятся потоково через os.scandir
+    """
+    root = photo_storage.path(PHOTO_DIR)
+    if not os.path.isdir(root):
+        return 0, 0, 0, 0.0
+
+    start = time.perf_counter()
+    with os.scandir(root) as entries:
+        top_entries = sum(1 for _ in entries)
+    listing_ms = (time.perf_counter() - start) * 1000
+
+    total_bytes = files = 0
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total_bytes += entry.stat().st_size
+                    files += 1
+
+    return total_bytes, files, top_entries, listing_ms
+
+
+class Command(BaseCommand):
+    help = 'Moves existing post photos to content-addressed paths and merges duplicate photos'
+
+    def handle(self, *args, **options):
+        before = media_stats()
+        stats = {'moved': 0, 'merged': 0, 'missing': 0}
+
+        # пачки по id вместо открытого курсора: таблица фото меняется во время обхода
+        pending = Photo.objects.filter(content_hash__isnull=True).order_by('id')
+        last_id = 0
+        while True:
+            photos = list(pending.filter(id__gt=last_id)[:REHASH_BATCH_SIZE])
+            if not photos:
+                break
+            last_id = photos[-1].id
+
+            for photo in photos:
+                try:
+                    self.rehash(photo, stats)
+                except FileNotFoundError:
+                    stats['missing'] += 1
+                    self.stderr.write(f'Photo {photo.id}: file {photo.image.name} is missing')
+
+        after = media_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Photos moved: {stats['moved']}, duplicates merged: {stats['merged']}, missing files: {stats['missing']}"
+        ))
+        for title, (total_bytes, files, top_entries, listing_ms) in (('before', before), ('after', after)):
+            self.stdout.write(
+                f'{title}: {total_bytes} bytes in {files} files, '
+                f'{top_entries} entries in {PHOTO_DIR}/ listed in {listing_ms:.2f} ms'
+            )
+
+    def rehash(self, photo, stats):
+        old_name = photo.image.name
+        with photo.image.open('rb') as file:
+            content_hash = hash_file(file)
+
+            keeper = Photo.objects.filter(content_hash=content_hash).first()
+            if keeper is None:
+                new_name = content_name(content_hash, old_name)
+                if new_name != old_name:
+                    new_name = photo_storage.save(new_name, file)
+
+        storage = photo.image.storage
+
+        if keeper is not None:
+            with transaction.atomic():
+                through = Post.photos.through.objects
+                shared_posts = through.filter(photo=keeper).values('post_id')
+                through.filter(photo=photo, post_id__in=shared_posts).delete()
+                through.filter(photo=photo).update(photo=keeper)
+                photo.delete()
+
+            for variant in photo.variants:
+                if variant['name'] != old_name:
+                    storage.delete(variant['name'])
+            storage.delete(old_name)
+            stats['merged'] += 1
+            return
+
+        # копия полного размера может ссылаться на сам оригинал
+        variants = [
+            {**variant, 'name': new_name} if variant['name'] == old_name else variant
+            for variant in photo.variants
+        ]
+        Photo.objects.filter(pk=photo.pk).update(image=new_name, content_hash=content_hash, variants=variants)
+        if new_name != old_name:
+            storage.delete(old_name)
+        stats['moved'] += 1
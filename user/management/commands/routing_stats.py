@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from travel.db_router import reset_routing_stats, routing_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows how many reads went to the primary database and to each read replica'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='reset the counters after printing')
+
+    def handle(self, *args, **options):
+        for route, count in routing_stats().items():
+            self.stdout.write(f'{route}: {count}')
+
+        if options['reset']:
+            reset_routing_stats()
+            self.stdout.write(self.style.SUCCESS('Routing stats reset'))
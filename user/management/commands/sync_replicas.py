@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database into the read replica files using the SQLite backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='seconds between copies')
+        parser.add_argument('--once', action='store_true', help='copy once and exit')
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('sync_replicas copies SQLite files only, use database replication for other backends')
+
+        replicas = [connections[alias].settings_dict['NAME'] for alias in settings.DATABASE_READ_ALIASES]
+        if not replicas:
+            raise CommandError('No replicas configured, set DATABASE_REPLICAS')
+
+        if options['once']:
+            self.sync(primary, replicas)
+            self.stdout.write(self.style.SUCCESS(f'Replicas synced: {len(replicas)}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Replica sync started'))
+        try:
+            while True:
+                self.sync(primary, replicas)
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Replica sync stopped')
+
+    def sync(self, primary, replicas):
+        """
+        снимок основной базы во временный файл рядом с репликами, затем из него в каждую реплику.
+        каждая копия - один шаг backup: постраничную копию любая запись в основную базу начинает
+        заново. основная база читается одной транзакцией чтения ( WAL не блокирует запись ),
+        читатели реплик ( WAL ) видят прежнюю копию до коммита и не ждут. файл реплики не
+        подменяется через os.replace: переиспользуемые соединения читали бы старый файл
+        """
+        snapshot_name = f'{replicas[0]}.snapshot'
+        primary.ensure_connection()
+
+        snapshot = sqlite3.connect(snapshot_name)
+        try:
+            primary.connection.backup(snapshot)
+            for name in replicas:
+                target = sqlite3.connect(name, timeout=settings.SQLITE_PRAGMAS['busy_timeout'] / 1000)
+                try:
+                    snapshot.backup(target)
+                finally:
+                    target.close()
+        finally:
+            snapshot.close()
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(snapshot_name + suffix)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postratingaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Время изменения'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:06
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_total_rating(apps, schema_editor):
+    Profile = apps.get_model('user', 'Profile')
+    Post = apps.get_model('user', 'Post')
+
+    totals = Post.objects.filter(author_id=OuterRef('user_id')).order_by().values('author_id').annotate(
+        total=Sum('rating')
+    ).values('total')
+    Profile.objects.update(total_rating=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_postratingaction_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='total_rating',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='Суммарный рейтинг постов'),
+        ),
+        migrations.RunPython(fill_total_rating, migrations.RunPython.noop),
+    ]
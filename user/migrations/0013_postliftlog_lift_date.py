@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0012_profile_total_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postliftlog',
+            name='lift_date',
+            field=models.DateField(blank=True, null=True, verbose_name='День автоподнятия'),
+        ),
+        migrations.AddIndex(
+            model_name='postliftlog',
+            index=models.Index(fields=['post', 'lift_date'], name='liftlog_post_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:11
+
+from django.db import migrations, models
+
+
+def fill_weekday_mask(apps, schema_editor):
+    AutoPostLift = apps.get_model('user', 'AutoPostLift')
+
+    for lift_id, days_of_week in AutoPostLift.objects.values_list('id', 'days_of_week').iterator():
+        mask = 0
+        for day in days_of_week or []:
+            if str(day).isdigit():
+                mask |= 1 << int(day)
+        AutoPostLift.objects.filter(id=lift_id).update(weekday_mask=mask or 127)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0013_postliftlog_lift_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autopostlift',
+            name='weekday_mask',
+            field=models.PositiveSmallIntegerField(default=127, editable=False, verbose_name='Битовая маска дней недели'),
+        ),
+        migrations.AddIndex(
+            model_name='autopostlift',
+            index=models.Index(fields=['start_date', 'end_date', 'weekday_mask'], name='autolift_dates_mask_idx'),
+        ),
+        migrations.RunPython(fill_weekday_mask, migrations.RunPython.noop),
+    ]
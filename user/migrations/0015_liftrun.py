@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_autopostlift_weekday_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiftRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('window', models.PositiveSmallIntegerField(verbose_name='Окно')),
+                ('lifted', models.IntegerField(default=0, verbose_name='Поднято')),
+                ('reset', models.IntegerField(default=0, verbose_name='Сброшено')),
+                ('skipped', models.IntegerField(default=0, verbose_name='Пропущено')),
+                ('finished_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время завершения')),
+            ],
+            options={
+                'verbose_name': 'Запуск автоподнятия',
+                'verbose_name_plural': 'Запуски автоподнятия',
+                'constraints': [models.UniqueConstraint(fields=('day', 'window'), name='unique_lift_run')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_liftrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Время обработки'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, verbose_name='Уменьшенные копии'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:28
+
+import user.models
+import user.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='Хеш содержимого'),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image',
+            field=models.ImageField(storage=user.storage.get_photo_storage, upload_to=user.storage.photo_upload_to, validators=[user.models.validate_image_size], verbose_name='Фото'),
+        ),
+    ]
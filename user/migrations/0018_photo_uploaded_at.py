@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0017_photo_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='uploaded_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Время загрузки'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('country', '0003_alter_country_alpha2_code_alter_country_alpha3_code'),
+        ('user', '0019_photo_placeholder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='postratingaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Время изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='autopostlift',
+            index=models.Index(fields=['end_date'], name='autolift_end_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-create_date', '-id'], name='post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-create_date', '-id'], name='post_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postratingaction',
+            index=models.Index(fields=['updated_at', 'post'], name='rating_updated_post_idx'),
+        ),
+    ]
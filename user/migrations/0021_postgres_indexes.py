@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+# индексы, которые есть только в PostgreSQL: GiST по диапазону дат автоподнятия
+# ( выборка активных на день автоподнятий в due_lifts ) и GIN по документу поиска постов
+# ( выражение совпадает с SEARCH_DOCUMENT в user/search.py )
+POSTGRES_INDEXES = {
+    'autolift_active_range_idx': (
+        "CREATE INDEX IF NOT EXISTS autolift_active_range_idx ON user_autopostlift "
+        "USING gist (daterange(start_date, end_date, '[]'))"
+    ),
+    'post_search_gin_idx': (
+        "CREATE INDEX IF NOT EXISTS post_search_gin_idx ON user_post "
+        "USING gin (to_tsvector('russian', coalesce(subject, '') || ' ' || coalesce(body, '')))"
+    ),
+}
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_INDEXES.values():
+        schema_editor.execute(sql)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0020_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='photo_pending_idx'),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-17 21:40
+
+from django.db import migrations
+
+
+# таблица полнотекстового поиска постов есть только в SQLite ( в PostgreSQL - GIN-индекс
+# post_search_gin_idx из 0021 ): колонки и веса BM25 совпадают с SEARCH_COLUMNS и SEARCH_RANK
+# в user/search.py, prefix - индексы префиксов из 2 и 3 символов для запросов "слово*".
+# существующие посты попадают в таблицу командой rebuild_search_index
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_post_search USING fts5("
+    "subject, body, tags, countries, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SEARCH_RANK = "INSERT INTO user_post_search(user_post_search, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0, 5.0)')"
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE)
+    schema_editor.execute(SEARCH_RANK)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS user_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0021_postgres_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
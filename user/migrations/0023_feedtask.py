@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-17 22:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0022_post_search_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Время постановки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_tasks', to='user.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Задача ленты',
+                'verbose_name_plural': 'Задачи ленты',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.2 on 2026-10-17 22:12
+
+from django.db import migrations
+from django.db.models import Q
+
+BATCH_SIZE = 1000
+
+
+def backfill_feed_entries(apps, schema_editor):
+    """
+    заполнение лент, пустых после 0010_feedentry ( то же, что команда backfill_feeds )
+    """
+    Profile = apps.get_model('user', 'Profile')
+    Post = apps.get_model('user', 'Post')
+    FeedEntry = apps.get_model('user', 'FeedEntry')
+
+    for profile in Profile.objects.order_by('id').iterator(chunk_size=500):
+        posts = Post.objects.filter(
+            Q(countries__in=profile.countries_interest.all()) |
+            Q(author__in=profile.followers.all())
+        ).values_list('id', 'last_lifted_at', 'create_date').distinct()
+
+        batch = []
+        for post_id, last_lifted_at, create_date in posts.iterator(chunk_size=BATCH_SIZE):
+            batch.append(FeedEntry(user_id=profile.user_id, post_id=post_id, lifted_at=last_lifted_at or create_date))
+            if len(batch) >= BATCH_SIZE:
+                FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+
+        if batch:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0024_feedtask_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feed_entries, migrations.RunPython.noop),
+    ]
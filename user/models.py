@@ -5,6 +5,7 @@ from django.db import models
 from country.models import Country
 from django.utils import timezone
 from multiselectfield import MultiSelectField
+from .storage import get_photo_storage, photo_upload_to
 
 
 def validate_image_size(image):
@@ -19,19 +20,46 @@ class Profile(models.Model):
     post_count = models.IntegerField(default=0, verbose_name='Количество постов')
     followers = models.ManyToManyField(User, related_name='following', blank=True, verbose_name='Подписчики')
     followers_count = models.IntegerField(default=0, verbose_name='Количество подписчиков')
+    total_rating = models.IntegerField(default=0, db_index=True, verbose_name='Суммарный рейтинг постов')
     is_create = models.BooleanField(default=True, verbose_name='Создавать посты')
     is_blocked = models.BooleanField(default=False, verbose_name='Заблокирован')
 
     def __str__(self):
         return f'{self.user}'
 
+    @classmethod
+    def followed_author_ids(cls, viewer, author_ids):
+        """
+        id авторов из author_ids, у которых viewer в подписчиках ( один запрос )
+        """
+        return set(
+            cls.followers.through.objects.filter(
+                user_id=viewer.id,
+                profile__user_id__in=author_ids
+            ).values_list('profile__user_id', flat=True)
+        )
+
     class Meta:
         verbose_name = 'Профиль'
         verbose_name_plural = 'Профили'
 
 
 class Photo(models.Model):
-    image = models.ImageField(upload_to='post_photos/', validators=[validate_image_size], verbose_name='Фото')
+    image = models.ImageField(
+        upload_to=photo_upload_to,
+        storage=get_photo_storage,
+        validators=[validate_image_size],
+        verbose_name='Фото'
+    )
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False,
+                                    verbose_name='Хеш содержимого')
+    variants = models.JSONField(default=list, blank=True, verbose_name='Уменьшенные копии')
+    uploaded_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Время загрузки')
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name='Ширина')
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name='Высота')
+    dominant_color = models.CharField(max_length=7, blank=True, verbose_name='Основной цвет')
+    placeholder = models.TextField(blank=True, verbose_name='Превью-заглушка ( data URI )')
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name='Время обработки')
 
     def __str__(self):
         return self.image.name
@@ -39,9 +67,33 @@ class Photo(models.Model):
     def get_absolute_url(self):
         return self.image.url
 
+    def variant_urls(self, formats=('jpeg',)):
+        """
+        (url, ширина) уменьшенных копий по возрастанию ширины,
+        для каждой ширины - самая легкая копия в одном из formats ( иначе jpeg )
+        """
+        by_width = {}
+        for variant in self.variants:
+            by_width.setdefault(variant['width'], []).append(variant)
+
+        storage = self.image.storage
+        urls = []
+        for width in sorted(by_width):
+            variants = by_width[width]
+            accepted = [variant for variant in variants if variant.get('format', 'jpeg') in formats]
+            fallback = [variant for variant in variants if variant.get('format', 'jpeg') == 'jpeg']
+            best = min(accepted or fallback or variants, key=lambda variant: variant.get('size', 0))
+            urls.append((storage.url(best['name']), width))
+
+        return urls
+
     class Meta:
         verbose_name = 'Фото'
         verbose_name_plural = 'Фотки'
+        indexes = [
+            # частичный индекс: в нем только еще не обработанные фото, которые ждет photo-worker
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='photo_pending_idx'),
+        ]
 
 
 class Tag(models.Model):
@@ -55,6 +107,14 @@ class Tag(models.Model):
         verbose_name_plural = 'Теги'
 
 
+class PostQuerySet(models.QuerySet):
+    def for_cards(self):
+        """
+        посты для карточек в списках: автор, страны, фото и теги загружаются заранее
+        """
+        return self.select_related('author__profile').prefetch_related('countries', 'photos', 'tags')
+
+
 class Post(models.Model):
     create_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE,  verbose_name='Автор', blank=False, null=True, related_name='posts')
@@ -66,6 +126,8 @@ class Post(models.Model):
     rating = models.IntegerField(default=0, verbose_name='Рейтинг')
     last_lifted_at = models.DateTimeField(null=True, blank=True, verbose_name='Последнее время поднятия')
 
+    objects = PostQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
@@ -82,6 +144,10 @@ class Post(models.Model):
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(fields=['-create_date', '-id'], name='post_created_idx'),
+            models.Index(fields=['author', '-create_date', '-id'], name='post_author_created_idx'),
+        ]
 
 
 class Comment(models.Model):
@@ -97,6 +163,9 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ]
 
 
 class PostRatingAction(models.Model):
@@ -109,6 +178,7 @@ class PostRatingAction(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, verbose_name='Пост')
     action = models.CharField(max_length=10, choices=[('up', 'Upvote'), ('down', 'Downvote')])
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Время изменения')
 
     def __str__(self):
         return f'{self.post} {self.user} {self.action}'
@@ -117,6 +187,10 @@ class PostRatingAction(models.Model):
         verbose_name = 'Оценка'
         verbose_name_plural = 'Оценки'
         unique_together = ('user', 'post', 'action')
+        indexes = [
+            # покрывающий индекс для поиска постов с новыми голосами в flush_rating_deltas
+            models.Index(fields=['updated_at', 'post'], name='rating_updated_post_idx'),
+        ]
 
 
 DAYS_OF_WEEK = (
@@ -129,6 +203,26 @@ DAYS_OF_WEEK = (
     ('6', 'Воскресенье'),
 )
 
+ALL_DAYS_MASK = 0b1111111
+
+
+def weekday_bit(day):
+    """
+    бит дня недели day в weekday_mask ( понедельник - младший бит )
+    """
+    return 1 << day.weekday()
+
+
+def days_to_mask(days_of_week):
+    """
+    битовая маска выбранных дней недели, пустой выбор - каждый день
+    """
+    mask = 0
+    for day in days_of_week:
+        if str(day).isdigit():
+            mask |= 1 << int(day)
+    return mask or ALL_DAYS_MASK
+
 
 class AutoPostLift(models.Model):
     """
@@ -144,6 +238,15 @@ class AutoPostLift(models.Model):
         max_length=13,
         blank=True
     )
+    weekday_mask = models.PositiveSmallIntegerField(
+        default=ALL_DAYS_MASK,
+        editable=False,
+        verbose_name='Битовая маска дней недели'
+    )
+
+    def save(self, *args, **kwargs):
+        self.weekday_mask = days_to_mask(self.days_of_week or [])
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'{self.post}'
@@ -151,6 +254,10 @@ class AutoPostLift(models.Model):
     class Meta:
         verbose_name = 'Автоподнятие поста'
         verbose_name_plural = 'Автоподнятие постов'
+        indexes = [
+            models.Index(fields=['start_date', 'end_date', 'weekday_mask'], name='autolift_dates_mask_idx'),
+            models.Index(fields=['end_date'], name='autolift_end_date_idx'),
+        ]
 
 
 class PostLiftLog(models.Model):
@@ -159,6 +266,7 @@ class PostLiftLog(models.Model):
     """
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='lift_logs', verbose_name='Пост')
     lifted_at = models.DateTimeField(default=timezone.now, verbose_name='Время поднятия')
+    lift_date = models.DateField(null=True, blank=True, verbose_name='День автоподнятия')
     message = models.CharField(max_length=255, verbose_name='Сообщение', blank=True, null=True)
 
     def __str__(self):
@@ -167,8 +275,76 @@ class PostLiftLog(models.Model):
     class Meta:
         verbose_name = 'Лог автоподнятия поста'
         verbose_name_plural = 'Логи автоподнятия постов'
+        indexes = [
+            models.Index(fields=['post', 'lift_date'], name='liftlog_post_date_idx'),
+        ]
 
 
+class LiftRun(models.Model):
+    """
+    выполненный запуск автоподнятия ( день и окно ). последний запуск - отметка,
+    с которой планировщик продолжает работу после простоя
+    """
 
+    day = models.DateField(verbose_name='День')
+    window = models.PositiveSmallIntegerField(verbose_name='Окно')
+    lifted = models.IntegerField(default=0, verbose_name='Поднято')
+    reset = models.IntegerField(default=0, verbose_name='Сброшено')
+    skipped = models.IntegerField(default=0, verbose_name='Пропущено')
+    finished_at = models.DateTimeField(default=timezone.now, verbose_name='Время завершения')
 
+    def __str__(self):
+        return f'{self.day} | окно {self.window}'
+
+    class Meta:
+        verbose_name = 'Запуск автоподнятия'
+        verbose_name_plural = 'Запуски автоподнятия'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'window'], name='unique_lift_run'),
+        ]
+
+
+class FeedEntry(models.Model):
+    """
+    материализованная лента пользователя ( одна запись = один пост в ленте )
+    заполняется при создании поста и при автоподнятии, чтение страницы ленты -
+    это выборка по индексу (user, lifted_at) без join-ов по всем постам
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries', verbose_name='Пользователь')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_entries', verbose_name='Пост')
+    lifted_at = models.DateTimeField(verbose_name='Время поднятия')
+
+    def __str__(self):
+        return f'{self.user} | {self.post}'
 
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='unique_feed_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-lifted_at', '-post'], name='feed_user_lifted_idx'),
+        ]
+
+
+class FeedTask(models.Model):
+    """
+    очередь обновления лент: запись ставится после коммита создания поста или смены
+    его стран ( post ), смены интересующих стран или подписок профиля ( user ),
+    ленты обновляет воркер ( команда process_feeds )
+    """
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='feed_tasks',
+                             verbose_name='Пост')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='feed_tasks',
+                             verbose_name='Пользователь')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Время постановки')
+
+    def __str__(self):
+        return f'{self.post_id or self.user_id} | {self.created_at}'
+
+    class Meta:
+        verbose_name = 'Задача ленты'
+        verbose_name_plural = 'Задачи ленты'
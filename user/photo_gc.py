@@ -0,0 +1,164 @@
+"""
+Сборка мусора фото постов.
+
+Удаляются записи Photo без постов ( пост удален или сам удалил себя при превышении
+лимита фото ) вместе с их файлами и файлы в post_photos/, на которые не ссылается
+ни одна запись. Таблица читается пачками по id, каталоги обходятся потоково через
+os.scandir, а свежие записи и файлы ( моложе grace ) не трогаются - их загрузка
+может быть еще не завершена.
+"""
+
+import os
+import re
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import Photo, Post
+from .storage import PHOTO_DIR, photo_storage
+
+
+GC_BATCH_SIZE = 500
+
+HASHED_FILE = re.compile(r'^([0-9a-f]{64})(_\d+)?\.\w+$')
+LEGACY_VARIANT_DIR = re.compile(rf'^{PHOTO_DIR}/variants/(\d+)/')
+
+
+def photo_files(photo):
+    """
+    файлы фото: оригинал и копии
+    """
+    names = {photo.image.name}
+    names.update(variant['name'] for variant in photo.variants)
+    return names
+
+
+def delete_file(name, dry_run):
+    try:
+        size = photo_storage.size(name)
+    except OSError:
+        return 0
+
+    if not dry_run:
+        photo_storage.delete(name)
+    return size
+
+
+def orphan_photos(before):
+    """
+    фото без постов, загруженные раньше before
+    """
+    has_posts = Post.photos.through.objects.filter(photo_id=OuterRef('pk'))
+    return Photo.objects.filter(uploaded_at__lt=before).exclude(Exists(has_posts))
+
+
+def collect_photos(before, dry_run=False, batch_size=GC_BATCH_SIZE):
+    """
+    удаляет фото без постов и их файлы, возвращает (записей, байт)
+    """
+    photos = bytes_freed = 0
+    last_id = 0
+
+    while True:
+        batch = list(orphan_photos(before).filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        if not dry_run:
+            # пост мог получить фото между выборкой и удалением
+            deleted_ids = set(orphan_photos(before).filter(id__in=[photo.id for photo in batch])
+                              .values_list('id', flat=True))
+            batch = [photo for photo in batch if photo.id in deleted_ids]
+            Photo.objects.filter(id__in=deleted_ids).delete()
+
+        for photo in batch:
+            for name in photo_files(photo):
+                bytes_freed += delete_file(name, dry_run)
+        photos += len(batch)
+
+    return photos, bytes_freed
+
+
+def iter_files(root):
+    """
+    (путь относительно хранилища, stat) всех файлов каталога root без загрузки списка в память
+    """
+    stack = [photo_storage.path(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, photo_storage.location).replace(os.sep, '/')
+                    yield name, entry.stat(follow_symlinks=False)
+
+
+def referenced_files(names):
+    """
+    какие из файлов пачки names принадлежат существующим фото
+    """
+    hashes, photo_ids, plain = {}, {}, []
+    for name in names:
+        hashed = HASHED_FILE.match(os.path.basename(name))
+        legacy_variant = LEGACY_VARIANT_DIR.match(name)
+        if hashed:
+            hashes.setdefault(hashed.group(1), []).append(name)
+        elif legacy_variant:
+            photo_ids.setdefault(int(legacy_variant.group(1)), []).append(name)
+        else:
+            plain.append(name)
+
+    referenced = set()
+    for content_hash in Photo.objects.filter(content_hash__in=hashes).values_list('content_hash', flat=True):
+        referenced.update(hashes[content_hash])
+    for photo_id in Photo.objects.filter(id__in=photo_ids).values_list('id', flat=True):
+        referenced.update(photo_ids[photo_id])
+    referenced.update(Photo.objects.filter(image__in=plain).values_list('image', flat=True))
+    return referenced
+
+
+def collect_files(before, dry_run=False, batch_size=GC_BATCH_SIZE):
+    """
+    удаляет файлы в post_photos/ без записей Photo, измененные раньше before,
+    возвращает (файлов, байт)
+    """
+    if not os.path.isdir(photo_storage.path(PHOTO_DIR)):
+        return 0, 0
+
+    cutoff = before.timestamp()
+    files = bytes_freed = 0
+    batch = {}
+
+    def flush():
+        nonlocal files, bytes_freed
+        referenced = referenced_files(list(batch))
+        for name, size in batch.items():
+            if name in referenced:
+                continue
+            if not dry_run:
+                photo_storage.delete(name)
+            files += 1
+            bytes_freed += size
+        batch.clear()
+
+    for name, stat in iter_files(PHOTO_DIR):
+        if stat.st_mtime >= cutoff:
+            continue
+        batch[name] = stat.st_size
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return files, bytes_freed
+
+
+def collect_garbage(grace, dry_run=False, batch_size=GC_BATCH_SIZE):
+    """
+    полная сборка мусора: сначала фото без постов, потом файлы без фото
+    """
+    before = timezone.now() - grace
+    photos, photo_bytes = collect_photos(before, dry_run, batch_size)
+    files, file_bytes = collect_files(before, dry_run, batch_size)
+    return {'photos': photos, 'files': files, 'bytes': photo_bytes + file_bytes}
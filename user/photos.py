@@ -0,0 +1,249 @@
+"""
+Фоновая обработка фотографий постов.
+
+create_post только сохраняет оригиналы, уменьшенные копии ( ширина PHOTO_VARIANT_WIDTHS,
+но не больше оригинала ) создает сервис photo-worker ( команда process_photos ).
+Каждая копия сохраняется в JPEG ( для любых браузеров ), WebP и AVIF ( если сборка Pillow
+умеет его писать ). Пути, размеры и форматы копий хранятся в Photo.variants, шаблоны строят
+из них srcset в лучшем формате из заголовка Accept, пока копий нет - отдается оригинал.
+
+Размеры, основной цвет и крошечная размытая заглушка ( LQIP, data URI ) считаются сразу
+при загрузке: это быстро, и шаблоны с первого показа резервируют место под фото.
+"""
+
+import base64
+import logging
+import os
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from .models import Photo
+from .storage import content_name, hash_file
+
+try:
+    # регистрирует AVIF в сборках Pillow без встроенной поддержки
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+
+logger = logging.getLogger(__name__)
+
+PHOTO_VARIANT_WIDTHS = (320, 640, 1280)
+PHOTO_BATCH_SIZE = 20
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+# EXIF-поворот, при котором ширина и высота меняются местами
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# формат: (расширение, mime-тип, параметры сохранения)
+PHOTO_FORMATS = {
+    'avif': ('avif', 'image/avif', {'quality': 55, 'speed': 6}),
+    'webp': ('webp', 'image/webp', {'quality': 78, 'method': 6}),
+    'jpeg': ('jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def available_formats():
+    """
+    форматы копий, которые умеет писать текущая сборка Pillow ( jpeg всегда последний )
+    """
+    Image.init()
+    return [name for name in PHOTO_FORMATS if name == 'jpeg' or name.upper() in Image.SAVE]
+
+
+def accepted_formats(accept):
+    """
+    форматы копий в порядке предпочтения для заголовка Accept
+    """
+    formats = [
+        name for name, (extension, mime_type, options) in PHOTO_FORMATS.items()
+        if name != 'jpeg' and mime_type in (accept or '')
+    ]
+    return formats + ['jpeg']
+
+
+def variant_name(photo, width, extension='jpg'):
+    """
+    путь копии: рядом с оригиналом по хешу ( post_photos/ab/cd/<hash>_640.webp )
+    """
+    if photo.content_hash:
+        return content_name(photo.content_hash, f'variant.{extension}', suffix=f'_{width}')
+
+    stem = os.path.splitext(os.path.basename(photo.image.name))[0]
+    return f'post_photos/variants/{photo.id}/{stem}_{width}.{extension}'
+
+
+def describe_photo(photo):
+    """
+    размеры, основной цвет и LQIP-заглушка фото ( JPEG декодируется в уменьшенном масштабе )
+    """
+    with photo.image.open('rb') as file:
+        image = Image.open(file)
+        width, height = image.size
+        if image.getexif().get(0x0112) in TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+
+        image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    red, green, blue = image.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=PLACEHOLDER_QUALITY)
+
+    photo.width = width
+    photo.height = height
+    photo.dominant_color = f'#{red:02x}{green:02x}{blue:02x}'
+    photo.placeholder = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+    photo.save(update_fields=['width', 'height', 'dominant_color', 'placeholder'])
+
+
+def describe_pending_photos(batch_size=PHOTO_BATCH_SIZE * 10):
+    """
+    заполняет размеры и заглушки у фото, загруженных раньше, возвращает (обработано, ошибок)
+    """
+    described = failed = 0
+    last_id = 0
+
+    while True:
+        photos = list(Photo.objects.filter(placeholder='', id__gt=last_id).order_by('id')[:batch_size])
+        if not photos:
+            break
+        last_id = photos[-1].id
+
+        for photo in photos:
+            try:
+                describe_photo(photo)
+                described += 1
+            except (OSError, UnidentifiedImageError, ValueError):
+                failed += 1
+
+    return described, failed
+
+
+def photo_for_upload(upload):
+    """
+    фото для загруженного файла: при повторной загрузке тех же байтов
+    возвращается уже существующая запись, файл второй раз не сохраняется
+    """
+    stored_name = getattr(upload, 'stored_name', None)
+    content_hash = getattr(upload, 'content_hash', None) or hash_file(upload)
+
+    photo = Photo.objects.filter(content_hash=content_hash).first()
+    if photo is not None:
+        return photo
+
+    try:
+        with transaction.atomic():
+            # файл, уже записанный PhotoUploadHandler, повторно не сохраняется, а переносится
+            # на итоговое место вместе с созданием записи
+            photo = Photo.objects.create(image=stored_name or upload, content_hash=content_hash)
+            if stored_name:
+                upload.store()
+    except IntegrityError:
+        return Photo.objects.get(content_hash=content_hash)
+
+    try:
+        describe_photo(photo)
+    except (OSError, UnidentifiedImageError, ValueError):
+        pass
+
+    return photo
+
+
+def encode(image, image_format):
+    extension, mime_type, options = PHOTO_FORMATS[image_format]
+    buffer = BytesIO()
+    image.save(buffer, image_format.upper(), **options)
+    return buffer.getvalue()
+
+
+def target_widths(original_width):
+    """
+    ширины копий: стандартные меньше оригинала и сам оригинал, если он не больше максимальной
+    """
+    widths = [width for width in PHOTO_VARIANT_WIDTHS if width < original_width]
+    if original_width <= PHOTO_VARIANT_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def open_image(photo):
+    """
+    изображение в RGB с учетом EXIF-поворота и формат оригинала ( 'jpeg', 'webp', ... )
+    """
+    with photo.image.open('rb') as file:
+        image = Image.open(file)
+        image.load()
+
+    source_format = (image.format or '').lower()
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image, source_format
+
+
+def resize(image, width):
+    height = max(1, round(image.height * width / image.width))
+    if width == image.width:
+        return image
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def generate_variants(photo):
+    """
+    создает уменьшенные копии фото и записывает их в photo.variants
+    """
+    image, source_format = open_image(photo)
+    storage = photo.image.storage
+
+    formats = available_formats()
+
+    variants = []
+    for width in target_widths(image.width):
+        resized = resize(image, width)
+
+        for image_format in formats:
+            content = encode(resized, image_format)
+
+            if image_format == source_format and width == image.width and len(content) >= photo.image.size:
+                # оригинал того же формата уже сжат лучше, копия полного размера - сам оригинал
+                variants.append({'width': image.width, 'height': image.height, 'format': image_format,
+                                 'name': photo.image.name, 'size': photo.image.size})
+                continue
+
+            name = variant_name(photo, width, PHOTO_FORMATS[image_format][0])
+            if storage.exists(name):
+                storage.delete(name)
+            name = storage.save(name, ContentFile(content))
+
+            variants.append({'width': resized.width, 'height': resized.height, 'format': image_format,
+                             'name': name, 'size': len(content)})
+
+    photo.variants = variants
+    photo.processed_at = timezone.now()
+    photo.save(update_fields=['variants', 'processed_at'])
+    return variants
+
+
+def process_pending_photos(limit=PHOTO_BATCH_SIZE):
+    """
+    обрабатывает очередную пачку необработанных фото, возвращает их количество.
+    битые файлы помечаются обработанными без копий ( отдается оригинал )
+    """
+    photos = list(Photo.objects.filter(processed_at__isnull=True).order_by('id')[:limit])
+
+    for photo in photos:
+        try:
+            generate_variants(photo)
+        except (OSError, UnidentifiedImageError, ValueError) as error:
+            logger.warning('Фото %s ( %s ) не обработано: %s', photo.id, photo.image.name, error)
+            Photo.objects.filter(pk=photo.pk).update(variants=[], processed_at=timezone.now())
+
+    return len(photos)
@@ -0,0 +1,131 @@
+"""
+Рейтинг постов с отложенной записью в базу.
+
+Голос фиксируется в PostRatingAction ( условным UPDATE, поэтому повторный голос
+при конкурентных запросах не засчитывается ), текущий рейтинг атомарно меняется
+счетчиком в кеше, а накопленные изменения периодически переносятся в Post.rating
+одним UPDATE с F() на пачку постов ( flush_rating_deltas ).
+
+Счетчик рейтинга - производное значение ( рейтинг в базе плюс изменения ), поэтому
+живет RATING_TIMEOUT и удаляется после каждого сброса: значение, посчитанное во время
+сброса по старому рейтингу в базе и уже уменьшенным изменениям, не остается навсегда.
+"""
+
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from travel.cache_versions import bump_generation
+from .leaderboard import apply_author_rating_deltas
+from .models import Post, PostRatingAction
+
+
+FLUSH_BATCH_SIZE = 500
+FLUSH_OVERLAP = timedelta(minutes=1)
+FLUSH_WATERMARK_KEY = 'rating_flush_watermark'
+RATING_TIMEOUT = 60 * 5
+
+
+def rating_key(post_id):
+    return f"post_rating_{post_id}"
+
+
+def delta_key(post_id):
+    return f"post_rating_delta_{post_id}"
+
+
+def get_rating(post):
+    """
+    актуальный рейтинг поста: значение в базе плюс еще не записанные изменения
+    """
+    rating = cache.get(rating_key(post.id))
+    if rating is None:
+        # рейтинг читается из базы заново: post мог быть загружен до сброса изменений
+        stored = Post.objects.values_list('rating', flat=True).get(pk=post.id)
+        cache.add(rating_key(post.id), stored + cache.get(delta_key(post.id), 0), timeout=RATING_TIMEOUT)
+        rating = cache.get(rating_key(post.id))
+    return rating
+
+
+def record_vote(rating_action, post, action):
+    """
+    засчитывает голос пользователя и возвращает новый рейтинг.
+    понижение, как и раньше, возможно только при положительном рейтинге
+    """
+    rating = get_rating(post)
+    if action == 'down' and rating <= 0:
+        return rating
+
+    changed = PostRatingAction.objects.filter(pk=rating_action.pk).exclude(action=action).update(
+        action=action,
+        updated_at=timezone.now()
+    )
+    if not changed:
+        return rating
+
+    delta = 1 if action == 'up' else -1
+
+    cache.add(delta_key(post.id), 0, timeout=None)
+    cache.incr(delta_key(post.id), delta)
+
+    try:
+        return cache.incr(rating_key(post.id), delta)
+    except ValueError:
+        return get_rating(post)
+
+
+def flush_rating_deltas():
+    """
+    переносит накопленные изменения рейтинга в базу, возвращает число обновленных постов.
+    посты ищутся по голосам, измененным после прошлого сброса ( с запасом FLUSH_OVERLAP )
+    """
+    started = timezone.now()
+    watermark = cache.get(FLUSH_WATERMARK_KEY)
+
+    votes = PostRatingAction.objects.all()
+    if watermark:
+        votes = votes.filter(updated_at__gte=watermark - FLUSH_OVERLAP)
+
+    post_ids = votes.order_by().values_list('post_id', flat=True).distinct()
+
+    flushed = 0
+    chunk = []
+    for post_id in post_ids.iterator(chunk_size=FLUSH_BATCH_SIZE):
+        chunk.append(post_id)
+        if len(chunk) >= FLUSH_BATCH_SIZE:
+            flushed += flush_chunk(chunk)
+            chunk = []
+
+    if chunk:
+        flushed += flush_chunk(chunk)
+
+    cache.set(FLUSH_WATERMARK_KEY, started, timeout=None)
+    return flushed
+
+
+def flush_chunk(post_ids):
+    keys = {delta_key(post_id): post_id for post_id in post_ids}
+    deltas = {
+        keys[key]: delta for key, delta in cache.get_many(list(keys)).items() if delta
+    }
+    if not deltas:
+        return 0
+
+    # изменения вычитаются из счетчика только после коммита: до него рейтинг в базе и
+    # счетчик изменений вместе дают актуальное значение
+    with transaction.atomic():
+        Post.objects.filter(pk__in=deltas).update(
+            rating=F('rating') + Case(
+                *[When(pk=post_id, then=Value(delta)) for post_id, delta in deltas.items()],
+                default=Value(0)
+            )
+        )
+        apply_author_rating_deltas(deltas)
+
+    for post_id, delta in deltas.items():
+        cache.decr(delta_key(post_id), delta)
+    cache.delete_many([rating_key(post_id) for post_id in deltas])
+
+    bump_generation('sidebar', *[f"post_{post_id}" for post_id in deltas])
+    return len(deltas)
@@ -1,65 +1,121 @@
-import schedule
-import time
+"""
+Планировщик автоподнятия постов.
+
+День делится на окна ( settings.POST_LIFT_WINDOWS ), в каждом окне поднимается своя часть
+автоподнятий ( по остатку от деления id ), поэтому нагрузка не собирается в одну минуту.
+Выполненные окна сохраняются в LiftRun: после простоя пропущенные окна выполняются
+по порядку, но не дальше POST_LIFT_MAX_CATCHUP_DAYS дней назад.
+Запускается командой posts_scheduler, при импорте модуля ничего не происходит.
+"""
+
+import logging
+import signal
+import threading
+from datetime import datetime, time, timedelta
+from django.conf import settings
 from django.utils import timezone
-from datetime import datetime
-from .models import AutoPostLift, PostLiftLog
-
-
-def is_today_in_selected_days(selected_days):
-    today = str(datetime.now().weekday())
-    return today in selected_days
-
-
-def get_posts_data():
-    today = datetime.now().date()
-
-    lifts = AutoPostLift.objects.filter(
-        start_date__lte=today,
-        end_date__gte=today
-    )
-
-    for lift in lifts:
-        if lift.end_date == today:
-            post = lift.post
-            post.last_lifted_at = post.create_date
-            post.save()
-            PostLiftLog.objects.create(
-                post=post,
-                message=f'Пост "{post.subject}" поднят автоматически, last_lifted_at установлен на create_date.'
-            )
-            print(f'Подняли пост: {post.subject}, last_lifted_at установлен на {post.create_date}')
-
-        if lift.days_of_week and is_today_in_selected_days(lift.days_of_week):
-            lift_post(lift)
-        elif not lift.days_of_week:
-            lift_post(lift)
-
-    AutoPostLift.objects.filter(end_date__lt=today).delete()
-
-
-def lift_post(lift):
-    post = lift.post
-
-    post.last_lifted_at = timezone.now()
-    post.save()
-
-    PostLiftLog.objects.create(
-        post=post,
-        message=f'Пост "{post.subject}" поднят автоматически'
-    )
-    print(f'Подняли пост: {post.subject}')
-
-
-def start_scheduler():
-    print("Планировщик задач запущен")
-    schedule.every().day.at("23:55").do(get_posts_data)
-
-    try:
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Остановка планировщика...")
-
-
-start_scheduler()
+from .lifts import run_lifts
+from .models import LiftRun
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_windows(windows):
+    """
+    время начала окон из строк вида "23:55" в порядке возрастания
+    """
+    return sorted(time.fromisoformat(window.strip()) for window in windows)
+
+
+class LiftScheduler:
+    def __init__(self, windows=None, max_catchup_days=None, poll_interval=30, log=None):
+        self.windows = parse_windows(windows or settings.POST_LIFT_WINDOWS)
+        if max_catchup_days is None:
+            max_catchup_days = settings.POST_LIFT_MAX_CATCHUP_DAYS
+        self.max_catchup_days = max_catchup_days
+        self.poll_interval = poll_interval
+        self.log = log or logger.info
+        self.stopped = threading.Event()
+
+    def window_start(self, day, window):
+        return timezone.make_aware(datetime.combine(day, self.windows[window]))
+
+    def pending_runs(self, now=None):
+        """
+        окна (day, window), время которых уже наступило, но которые еще не выполнены,
+        начиная с последнего выполненного запуска
+        """
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        first_day = today - timedelta(days=self.max_catchup_days)
+
+        last = LiftRun.objects.order_by('-day', '-window').first()
+        if last is None:
+            day, window = today, 0
+        elif last.day < first_day:
+            day, window = first_day, 0
+        else:
+            day, window = last.day, last.window + 1
+
+        runs = []
+        while day <= today:
+            for index in range(window, len(self.windows)):
+                if self.window_start(day, index) > now:
+                    return runs
+                runs.append((day, index))
+            day += timedelta(days=1)
+            window = 0
+
+        return runs
+
+    def run_window(self, day, window):
+        """
+        автоподнятие одного окна, время поднятия - начало окна ( повторный запуск ничего не меняет )
+        """
+        stats = run_lifts(day, self.window_start(day, window), window=window, windows=len(self.windows))
+        LiftRun.objects.update_or_create(
+            day=day,
+            window=window,
+            defaults={**stats, 'finished_at': timezone.now()}
+        )
+        self.log(
+            f"Автоподнятие {day} ( окно {self.windows[window]:%H:%M} ): поднято {stats['lifted']}, "
+            f"сброшено {stats['reset']}, пропущено ( уже поднятых ) {stats['skipped']}"
+        )
+        return stats
+
+    def run_pending(self, now=None):
+        """
+        выполняет все наступившие и пропущенные окна по порядку, возвращает их количество
+        """
+        runs = self.pending_runs(now)
+        for day, window in runs:
+            if self.stopped.is_set():
+                break
+            self.run_window(day, window)
+        return len(runs)
+
+    def run_day(self, day):
+        """
+        все окна дня day независимо от текущего времени ( для ручного догона )
+        """
+        for window in range(len(self.windows)):
+            self.run_window(day, window)
+
+    def stop(self, *args):
+        self.stopped.set()
+
+    def start(self):
+        """
+        основной цикл: окно, которое выполняется в момент остановки, завершается полностью
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        self.log(f"Планировщик задач запущен, окна: {', '.join(f'{window:%H:%M}' for window in self.windows)}")
+        while not self.stopped.is_set():
+            self.run_pending()
+            self.stopped.wait(self.poll_interval)
+        self.log("Остановка планировщика...")
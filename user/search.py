@@ -0,0 +1,382 @@
+"""
+Поиск постов.
+
+В SQLite - виртуальная таблица FTS5 user_post_search ( миграция 0022 ): документ поста
+из темы, текста, имен тегов и названий стран, rowid - id поста. Таблица обновляется
+сигналами ( user/signals.py ), полностью пересобирается командой rebuild_search_index.
+FTS5 не знает русской морфологии, поэтому слова документа и запроса приводятся к основе
+стеммером ( Snowball для русского языка ) до записи в таблицу. Выдача - по BM25
+( тема весит больше тегов и стран, те - больше текста ), листается по курсору (rank, rowid).
+BM25 считается для каждой найденной строки, для частых слов ( сотни тысяч постов ) это
+сотни миллисекунд, поэтому ранжируются только SEARCH_CANDIDATES самых новых совпадений,
+более старые идут после них от новых к старым ( обход по rowid без BM25 ).
+
+В PostgreSQL - полнотекстовый поиск по теме и тексту поста с русской морфологией,
+документ поиска совпадает с выражением GIN-индекса post_search_gin_idx ( миграция 0021 ),
+поэтому запрос идет по индексу.
+"""
+
+import re
+from functools import lru_cache
+from django.db import connection, connections, router, transaction
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from .listing import CURSOR_PARAM, CursorPage, build_cursor_page, decode_cursor, get_cursor_page
+from .models import Post
+
+
+SEARCH_DOCUMENT = (
+    """to_tsvector('russian', coalesce("user_post"."subject", '') || ' ' || coalesce("user_post"."body", ''))"""
+)
+SEARCH_QUERY = "websearch_to_tsquery('russian', %s)"
+
+SEARCH_TABLE = 'user_post_search'
+SEARCH_COLUMNS = ('subject', 'body', 'tags', 'countries')
+SEARCH_RANK = 'bm25(10.0, 1.0, 5.0, 5.0)'
+SEARCH_ORDERING = ('rank', 'id')
+SEARCH_CANDIDATES = 1000
+# rank строк за окном SEARCH_CANDIDATES: bm25() в FTS5 не больше нуля, поэтому они идут
+# после ранжированных, а вторым ключом курсора у них -rowid ( от новых к старым )
+TAIL_RANK = 1.0
+MAX_QUERY_TERMS = 10
+INDEX_BATCH_SIZE = 1000
+
+WORD_RE = re.compile(r'(\w+)(\*?)')
+
+
+VOWELS = 'аеиоуыэюя'
+
+
+def _endings(after_a=(), other=()):
+    """
+    окончания от длинных к коротким, для after_a перед окончанием должна стоять "а" или "я"
+    """
+    endings = [(ending, True) for ending in after_a] + [(ending, False) for ending in other]
+    return sorted(endings, key=lambda item: -len(item[0]))
+
+
+PERFECTIVE_GERUND = _endings(('в', 'вши', 'вшись'), ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+ADJECTIVE = _endings(other=(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'
+))
+PARTICIPLE = _endings(('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+REFLEXIVE = _endings(other=('ся', 'сь'))
+VERB = _endings(
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+     'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю')
+)
+NOUN = _endings(other=(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й',
+    'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'
+))
+SUPERLATIVE = _endings(other=('ейш', 'ейше'))
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _remove_ending(word, endings):
+    """
+    word без самого длинного подходящего окончания, None - окончание не найдено
+    """
+    for ending, after_a in endings:
+        if word.endswith(ending):
+            base = word[:len(word) - len(ending)]
+            if after_a and not base.endswith(('а', 'я')):
+                return None
+            return base
+
+    return None
+
+
+def _region_after_syllable(word, start):
+    """
+    начало области после первой согласной, которая идет за гласной ( R1 / R2 Snowball )
+    """
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+
+    return len(word)
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    """
+    основа русского слова по алгоритму Snowball, слова на других языках не меняются
+    """
+    word = word.lower().replace('ё', 'е')
+
+    rv_start = next((index + 1 for index, char in enumerate(word) if char in VOWELS), len(word))
+    r2_start = _region_after_syllable(word, _region_after_syllable(word, 0))
+    head, rv = word[:rv_start], word[rv_start:]
+
+    base = _remove_ending(rv, PERFECTIVE_GERUND)
+    if base is not None:
+        rv = base
+    else:
+        base = _remove_ending(rv, REFLEXIVE)
+        if base is not None:
+            rv = base
+
+        base = _remove_ending(rv, ADJECTIVE)
+        if base is not None:
+            participle = _remove_ending(base, PARTICIPLE)
+            rv = base if participle is None else participle
+        else:
+            for endings in (VERB, NOUN):
+                base = _remove_ending(rv, endings)
+                if base is not None:
+                    rv = base
+                    break
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and len(head) + len(rv) - len(ending) >= r2_start:
+            rv = rv[:-len(ending)]
+            break
+
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        base = _remove_ending(rv, SUPERLATIVE)
+        if base is not None:
+            rv = base[:-1] if base.endswith('нн') else base
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+
+    return head + rv
+
+
+def stem_text(text):
+    """
+    текст из основ слов для документа FTS5
+    """
+    return ' '.join(stem(word) for word in re.findall(r'\w+', text or ''))
+
+
+def match_query(query):
+    """
+    запрос FTS5 из пользовательского: основы слов через AND, "слово*" - поиск по префиксу.
+    синтаксис FTS5 из запроса не попадает - каждое слово в кавычках
+    """
+    terms = []
+    for word, prefix in WORD_RE.findall(query)[:MAX_QUERY_TERMS]:
+        terms.append(f'"{stem(word)}"' + prefix)
+
+    return ' AND '.join(terms)
+
+
+def search_index_enabled(alias='default'):
+    return connections[alias].vendor == 'sqlite'
+
+
+def post_documents(post_ids, using):
+    """
+    строки (rowid, subject, body, tags, countries) таблицы поиска для постов post_ids
+    """
+    tags, countries = {}, {}
+    for post_id, name in Post.tags.through.objects.using(using).filter(
+        post_id__in=post_ids
+    ).values_list('post_id', 'tag__name'):
+        tags.setdefault(post_id, []).append(name)
+    for post_id, name in Post.countries.through.objects.using(using).filter(
+        post_id__in=post_ids
+    ).values_list('post_id', 'country__name'):
+        countries.setdefault(post_id, []).append(name)
+
+    return [
+        (
+            post_id, stem_text(subject), stem_text(body),
+            stem_text(' '.join(tags.get(post_id, []))), stem_text(' '.join(countries.get(post_id, [])))
+        )
+        for post_id, subject, body in Post.objects.using(using).filter(
+            id__in=post_ids
+        ).values_list('id', 'subject', 'body')
+    ]
+
+
+def write_documents(cursor, documents):
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)', documents
+    )
+
+
+def index_posts(post_ids):
+    """
+    обновление документов постов post_ids в таблице поиска ( удаленные посты убираются )
+    """
+    using = router.db_for_write(Post)
+    post_ids = list(post_ids)
+    if not post_ids or not search_index_enabled(using):
+        return
+
+    for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+        chunk = post_ids[start:start + INDEX_BATCH_SIZE]
+        documents = post_documents(chunk, using)
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(post_id,) for post_id in chunk])
+            write_documents(cursor, documents)
+
+
+def remove_posts(post_ids):
+    """
+    удаление постов post_ids из таблицы поиска
+    """
+    using = router.db_for_write(Post)
+    if not search_index_enabled(using):
+        return
+
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(post_id,) for post_id in post_ids])
+
+
+def rebuild_search_index(batch_size=INDEX_BATCH_SIZE):
+    """
+    полная пересборка таблицы поиска пачками по id ( заодно применяются веса SEARCH_RANK ),
+    возвращает количество постов
+    """
+    using = router.db_for_write(Post)
+    if not search_index_enabled(using):
+        return 0
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [SEARCH_RANK])
+
+    ids = Post.objects.using(using).order_by('id').values_list('id', flat=True)
+    last_id = 0
+    count = 0
+    while True:
+        chunk = list(ids.filter(id__gt=last_id)[:batch_size])
+        if not chunk:
+            break
+
+        last_id = chunk[-1]
+        documents = post_documents(chunk, using)
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            write_documents(cursor, documents)
+        count += len(documents)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+    return count
+
+
+def _window_rows(cursor, match, oldest, values, reverse, limit):
+    """
+    строки (id, rank, id) из окна самых новых совпадений, ранжированные BM25
+    """
+    candidates = f'SELECT rowid AS post_id, rank AS post_rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+    params = [match]
+    if oldest:
+        candidates += ' AND rowid >= %s'
+        params.append(oldest)
+
+    # сортировка снаружи подзапроса: FTS5 не строит свою сортировку по rank
+    sql = f'SELECT post_id, post_rank, post_id FROM ({candidates})'
+    if values is not None:
+        sign = '<' if reverse else '>'
+        sql += f' WHERE post_rank {sign} %s OR (post_rank = %s AND post_id {sign} %s)'
+        params += [values[0], values[0], values[1]]
+    sql += ' ORDER BY post_rank DESC, post_id DESC' if reverse else ' ORDER BY post_rank, post_id'
+    sql += ' LIMIT %s'
+    params.append(limit)
+
+    cursor.execute(sql, params)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def _tail_rows(cursor, match, oldest, post_id, reverse, limit):
+    """
+    строки (id, TAIL_RANK, -id) совпадений старше окна, после поста post_id
+    """
+    sql = f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid < %s'
+    params = [match, oldest]
+    if post_id is not None:
+        sql += ' AND rowid > %s' if reverse else ' AND rowid < %s'
+        params.append(post_id)
+    sql += ' ORDER BY rowid' if reverse else ' ORDER BY rowid DESC'
+    sql += ' LIMIT %s'
+    params.append(limit)
+
+    cursor.execute(sql, params)
+    return [(row[0], TAIL_RANK, -row[0]) for row in cursor.fetchall()]
+
+
+def fetch_ranked_rows(match, direction, values, per_page):
+    """
+    строки (id, rank, id) страницы выдачи FTS5 и признак того, что дальше есть еще строки:
+    сначала окно SEARCH_CANDIDATES новых совпадений по BM25, за ним остальные по rowid
+    """
+    reverse = direction == 'prev'
+    limit = per_page + 1
+    in_tail = values is not None and values[0] >= TAIL_RANK
+
+    with connections[router.db_for_read(Post)].cursor() as cursor:
+        # самое старое из SEARCH_CANDIDATES новых совпадений ( обход по rowid без BM25 )
+        cursor.execute(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rowid DESC LIMIT 1 OFFSET %s',
+            [match, SEARCH_CANDIDATES - 1]
+        )
+        oldest = cursor.fetchone()
+        oldest = oldest[0] if oldest else None
+
+        if reverse:
+            rows = _tail_rows(cursor, match, oldest, -values[1], True, limit) if in_tail and oldest else []
+            if len(rows) < limit:
+                rows += _window_rows(cursor, match, oldest, None if in_tail else values, True, limit - len(rows))
+        else:
+            rows = [] if in_tail else _window_rows(cursor, match, oldest, values, False, limit)
+            if len(rows) < limit and oldest:
+                rows += _tail_rows(cursor, match, oldest, -values[1] if in_tail else None, False, limit - len(rows))
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+
+    return rows, has_more
+
+
+def search_posts(query):
+    """
+    посты по запросу query: в PostgreSQL - по релевантности, иначе - сначала новые
+    """
+    query = query.strip()
+    if not query:
+        return Post.objects.none()
+
+    if connection.vendor == 'postgresql':
+        return Post.objects.annotate(
+            matched=RawSQL(f'{SEARCH_DOCUMENT} @@ {SEARCH_QUERY}', [query], output_field=BooleanField()),
+            rank=RawSQL(f'ts_rank({SEARCH_DOCUMENT}, {SEARCH_QUERY})', [query], output_field=FloatField()),
+        ).filter(matched=True).order_by('-rank', '-id')
+
+    match = match_query(query)
+    if not match:
+        return Post.objects.none()
+
+    return Post.objects.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [match])
+    ).order_by('-create_date', '-id')
+
+
+def get_search_page(request, query, per_page):
+    """
+    страница выдачи поиска по релевантности, курсор из request.GET
+    """
+    if connection.vendor == 'postgresql':
+        return get_cursor_page(request, search_posts(query), ('-rank', '-id'), Post.objects.for_cards(), per_page)
+
+    match = match_query(query)
+    if not match:
+        return CursorPage([])
+
+    direction, values = decode_cursor(request.GET.get(CURSOR_PARAM), Post, SEARCH_ORDERING)
+    rows, has_more = fetch_ranked_rows(match, direction, values, per_page)
+
+    return build_cursor_page(rows, has_more, direction, values, Post.objects.for_cards())
@@ -1,58 +1,173 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.core.cache import cache
-from .models import Profile, Post, Comment
-
-
-@receiver(pre_save, sender=Post)
-def clear_cache_on_rating_change(sender, instance, **kwargs):
-    if instance.pk:
-        old_post = Post.objects.filter(pk=instance.pk).first()
-        if old_post and old_post.rating != instance.rating:
-            cache_key = f"user_feed_{old_post.author.id}"
-            cache.delete(cache_key)
+from django.db.models import F
+from country.models import Country
+from travel.cache_versions import bump_generation
+from .models import Profile, Post, Comment, Tag
+from .feed import schedule_feed_rebuild, schedule_post_fan_out
+from .cache_versions import post_namespaces
+from .search import SEARCH_COLUMNS, index_posts, remove_posts
+from .autocomplete import update_tag_index
 
 
 @receiver(post_save, sender=Post)
 def clear_cache_on_post_create(sender, instance, created, **kwargs):
     if created:
-        for profile in Profile.objects.all():
-            cache_key = f"user_feed_{profile.user.id}"
-            cache.delete(cache_key)
+        bump_generation('feed', 'sidebar', f"author_{instance.author_id}")
+
+        schedule_post_fan_out([instance.id])
+
+
+@receiver(pre_delete, sender=Post)
+def clear_cache_on_post_delete(sender, instance, **kwargs):
+    if instance.rating:
+        Profile.objects.filter(user_id=instance.author_id).update(total_rating=F('total_rating') - instance.rating)
+
+    bump_generation('sidebar', *post_namespaces(instance))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def clear_cache_on_tag_change(sender, instance, **kwargs):
+    bump_generation('sidebar')
+
+
+@receiver(post_save, sender=Tag)
+def update_autocomplete_on_tag_save(sender, instance, **kwargs):
+    update_tag_index(instance)
+
+
+@receiver(post_delete, sender=Tag)
+def update_autocomplete_on_tag_delete(sender, instance, **kwargs):
+    update_tag_index(instance, deleted=True)
+
+
+def bump_m2m_generations(prefix, instance, action, reverse, pk_set, related_ids):
+    """
+    инвалидация пространств имен стран/тегов при изменении m2m связи поста
+    """
+    if reverse:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            bump_generation('feed', f"{prefix}_{instance.id}")
+    elif action == "pre_clear":
+        bump_generation('feed', f"author_{instance.author_id}", *[f"{prefix}_{pk}" for pk in related_ids()])
+    elif action in ["post_add", "post_remove"]:
+        bump_generation('feed', f"author_{instance.author_id}", *[f"{prefix}_{pk}" for pk in pk_set])
+
+
+@receiver(m2m_changed, sender=Post.countries.through)
+def update_feeds_on_post_countries_change(sender, instance, action, reverse, pk_set, **kwargs):
+    bump_m2m_generations(
+        'country', instance, action, reverse, pk_set,
+        lambda: instance.countries.values_list('id', flat=True)
+    )
+
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    if reverse:
+        if pk_set:
+            schedule_post_fan_out(pk_set)
+    else:
+        schedule_post_fan_out([instance.id])
+
+
+def rebuild_profile_feeds(instance, reverse, pk_set):
+    """
+    пересборка лент профилей, затронутых изменением m2m связи профиля ( в воркере )
+    """
+    if not reverse:
+        bump_generation(f"author_{instance.user_id}")
+        schedule_feed_rebuild([instance.user_id])
+        return
 
-        cache.delete('public_feed')
-        cache.delete('countries_with_posts')
+    if pk_set:
+        user_ids = list(Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+        bump_generation(*[f"author_{user_id}" for user_id in user_ids])
+        schedule_feed_rebuild(user_ids)
 
 
 @receiver(m2m_changed, sender=Profile.countries_interest.through)
-def clear_cache_on_country_change(sender, instance, action, **kwargs):
+def clear_cache_on_country_change(sender, instance, action, reverse, pk_set, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        cache_key = f"user_feed_{instance.user.id}"
-        cache.delete(cache_key)
+        rebuild_profile_feeds(instance, reverse, pk_set)
 
 
 @receiver(m2m_changed, sender=Profile.followers.through)
-def clear_cache_on_followers_change(sender, instance, action, **kwargs):
+def clear_cache_on_followers_change(sender, instance, action, reverse, pk_set, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        cache_key = f"user_feed_{instance.user.id}"
-        cache.delete(cache_key)
+        rebuild_profile_feeds(instance, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def clear_cache_on_post_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    bump_m2m_generations(
+        'tag', instance, action, reverse, pk_set,
+        lambda: instance.tags.values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_search_index_on_post_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(SEARCH_COLUMNS):
+        return
+
+    index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def update_search_index_on_post_delete(sender, instance, **kwargs):
+    remove_posts([instance.pk])
+
+
+def reindex_m2m_posts(instance, action, reverse, pk_set):
+    """
+    обновление документов поиска постов, у которых изменились теги/страны
+    """
+    if not reverse:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            index_posts([instance.pk])
+    elif action == "pre_clear":
+        instance._search_post_ids = list(instance.post_set.values_list('id', flat=True))
+    elif action == "post_clear":
+        index_posts(getattr(instance, '_search_post_ids', []))
+    elif action in ["post_add", "post_remove"]:
+        index_posts(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=Post.countries.through)
+def update_search_index_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    reindex_m2m_posts(instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Country)
+def update_search_index_on_name_change(sender, instance, created, **kwargs):
+    if not created:
+        index_posts(instance.post_set.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Country)
+def collect_search_posts_on_delete(sender, instance, **kwargs):
+    instance._search_post_ids = list(instance.post_set.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Country)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    index_posts(getattr(instance, '_search_post_ids', []))
 
 
 @receiver(post_save, sender=Comment)
 def clear_cache_on_comment_create(sender, instance, created, **kwargs):
     if created:
-        post = instance.post
-        for profile in Profile.objects.all():
-            cache_key = f"user_feed_{profile.user.id}"
-            cache.delete(cache_key)
-        cache.delete('public_feed')
+        bump_generation(f"post_{instance.post_id}")
 
 
 @receiver(post_save, sender=User)
 def clear_cache_on_user_registration(sender, instance, created, **kwargs):
     if created:
-        for profile in Profile.objects.all():
-            cache_key = f"user_feed_{profile.user.id}"
-            cache.delete(cache_key)
-
+        bump_generation('profiles')
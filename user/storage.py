@@ -0,0 +1,76 @@
+"""
+Хранилище фото постов с адресацией по содержимому.
+
+Файл называется sha256 своего содержимого и лежит в подкаталогах по первым символам
+хеша ( post_photos/ab/cd/abcd...jpg ), поэтому одинаковые загрузки хранятся один раз,
+а в одном каталоге не накапливаются миллионы файлов.
+"""
+
+import hashlib
+import os
+from django.core.files.storage import FileSystemStorage
+
+
+PHOTO_DIR = 'post_photos'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def hash_file(file):
+    """
+    sha256 содержимого файла ( читается частями, позиция в файле восстанавливается )
+    """
+    digest = hashlib.sha256()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+    if hasattr(file, 'chunks'):
+        chunks = file.chunks(HASH_CHUNK_SIZE)
+    else:
+        chunks = iter(lambda: file.read(HASH_CHUNK_SIZE), b'')
+
+    for chunk in chunks:
+        digest.update(chunk)
+
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(content_hash, filename, suffix=''):
+    """
+    путь файла по хешу: post_photos/ab/cd/<hash><suffix><расширение filename>
+    """
+    extension = os.path.splitext(filename)[1].lower() or '.jpg'
+    return f'{PHOTO_DIR}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{suffix}{extension}'
+
+
+def photo_upload_to(instance, filename):
+    if not instance.content_hash:
+        instance.content_hash = hash_file(instance.image.file)
+    return content_name(instance.content_hash, filename)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    файл с тем же именем уже содержит те же байты, поэтому повторно не записывается
+    ( при одновременной записи перезапись безопасна - содержимое одинаковое )
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+photo_storage = ContentAddressedStorage()
+
+
+def get_photo_storage():
+    return photo_storage
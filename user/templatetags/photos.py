@@ -0,0 +1,55 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from ..photos import accepted_formats
+
+
+register = template.Library()
+
+CARD_SIZES = '(max-width: 768px) 100vw, 640px'
+
+
+def placeholder_attrs(photo, first):
+    """
+    размеры, ленивая загрузка и заглушка ( основной цвет и LQIP под фото, пока оно грузится ).
+    для первого слайда LQIP, для остальных только основной цвет
+    """
+    attrs = format_html(' loading="lazy" decoding="async"') if not first else mark_safe('')
+    if photo.width and photo.height:
+        attrs += format_html(' width="{}" height="{}"', photo.width, photo.height)
+    if first and photo.placeholder:
+        attrs += format_html(
+            ' style="background: {} url({}) center / cover no-repeat"',
+            photo.dominant_color or 'transparent', photo.placeholder
+        )
+    elif photo.dominant_color:
+        # скрытые слайды карусели: только цвет, чтобы не раздувать страницу заглушками
+        attrs += format_html(' style="background: {}"', photo.dominant_color)
+    return attrs
+
+
+@register.simple_tag(takes_context=True)
+def photo_img(context, photo, sizes=CARD_SIZES, css_class='d-block w-100', first=True):
+    """
+    <img> фото поста: src - копия шириной до 640px, srcset - все копии
+    в лучшем формате из заголовка Accept. пока копии не созданы, отдается оригинал.
+    не первые слайды карусели ( first=False ) загружаются лениво
+    """
+    request = context.get('request')
+    formats = accepted_formats(request.META.get('HTTP_ACCEPT', '') if request else '')
+    attrs = placeholder_attrs(photo, first)
+
+    variants = photo.variant_urls(formats)
+    if not variants:
+        return format_html('<img src="{}" class="{}"{} alt="photo">', photo.image.url, css_class, attrs)
+
+    src = variants[0][0]
+    for url, width in variants:
+        if width <= 640:
+            src = url
+
+    srcset = ', '.join(f'{url} {width}w' for url, width in variants)
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" class="{}"{} alt="photo">',
+        src, srcset, sizes, css_class, attrs
+    )
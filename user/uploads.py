@@ -0,0 +1,191 @@
+"""
+Потоковая загрузка фото постов.
+
+PhotoUploadHandler получает файлы поля photos частями и сразу пишет их на диск
+рядом с итоговым местом, считая sha256 по ходу записи. Проверки выполняются до конца
+загрузки: по первым байтам ( сигнатура изображения ), по количеству файлов и
+по размеру файла и всего запроса. Отклоненный файл дальше не записывается.
+Принятый файл остается в post_photos/incoming/, пока форма не прошла проверку: в
+post_photos/ab/cd/<hash> его переименованием, без копирования, переносит photo_for_upload
+вместе с созданием Photo. Непринятые и прерванные загрузки удаляет cleanup() в конце запроса.
+В памяти одновременно находится только одна часть файла.
+"""
+
+import hashlib
+import os
+import uuid
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from .storage import PHOTO_DIR, content_name, photo_storage
+
+
+PHOTO_FIELD = 'photos'
+PHOTO_MAX_FILES = 10
+PHOTO_MAX_FILE_SIZE = 5 * 1024 * 1024
+PHOTO_MAX_REQUEST_SIZE = PHOTO_MAX_FILES * PHOTO_MAX_FILE_SIZE
+PHOTO_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+IMAGE_SIGNATURES = (
+    (0, b'\xff\xd8\xff'),
+    (0, b'\x89PNG\r\n\x1a\n'),
+    (0, b'GIF87a'),
+    (0, b'GIF89a'),
+    (8, b'WEBP'),
+    (4, b'ftypavif'),
+)
+SIGNATURE_LENGTH = 12
+
+
+def is_image_header(header):
+    return any(header[offset:offset + len(signature)] == signature for offset, signature in IMAGE_SIGNATURES)
+
+
+def discard_file(file, path):
+    file.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class StoredPhotoUpload(UploadedFile):
+    """
+    загруженное фото во временном файле хранилища, store() переносит его под имя stored_name
+    """
+
+    def __init__(self, file, name, content_type, size, charset, content_hash, stored_name):
+        super().__init__(file, name, content_type, size, charset)
+        self.content_hash = content_hash
+        self.stored_name = stored_name
+        self.path = file.name
+        self.stored = False
+
+    def temporary_file_path(self):
+        return self.path
+
+    def store(self):
+        stored_path = photo_storage.path(self.stored_name)
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        os.replace(self.path, stored_path)
+        self.path = stored_path
+        self.stored = True
+        return self.stored_name
+
+    def discard(self):
+        """
+        удаление временного файла ( перенесенный файл уже принадлежит Photo )
+        """
+        if self.stored:
+            self.close()
+        else:
+            discard_file(self.file, self.path)
+
+
+class PhotoUploadHandler(FileUploadHandler):
+    chunk_size = PHOTO_UPLOAD_CHUNK_SIZE
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = []
+        self.files = 0
+        self.total_size = 0
+        self.request_too_large = False
+        self.active = False
+        self.uploads = []
+
+    def add_error(self, message):
+        if message not in self.errors:
+            self.errors.append(message)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # заведомо слишком большой запрос: фото не записываются, но остальные поля разбираются
+        self.request_too_large = content_length > PHOTO_MAX_REQUEST_SIZE + 1024 * 1024
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+        self.active = field_name == PHOTO_FIELD
+        if not self.active:
+            return
+
+        self.files += 1
+        if self.request_too_large:
+            self.active = False
+            self.add_error(f'Суммарный размер фотографий не может превышать {PHOTO_MAX_REQUEST_SIZE // 1024 // 1024} МБ.')
+            raise SkipFile
+        if self.files > PHOTO_MAX_FILES:
+            self.active = False
+            self.add_error(f'Можно прикрепить не более {PHOTO_MAX_FILES} фотографий.')
+            raise SkipFile
+
+        self.digest = hashlib.sha256()
+        self.header = b''
+        self.size = 0
+        self.temp_name = f'{PHOTO_DIR}/incoming/{uuid.uuid4().hex}.part'
+        os.makedirs(os.path.dirname(photo_storage.path(self.temp_name)), exist_ok=True)
+        self.file = open(photo_storage.path(self.temp_name), 'wb')
+        raise StopFutureHandlers
+
+    def reject(self, message):
+        self.active = False
+        discard_file(self.file, photo_storage.path(self.temp_name))
+        self.add_error(message)
+        raise SkipFile
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        if len(self.header) < SIGNATURE_LENGTH:
+            self.header += raw_data[:SIGNATURE_LENGTH - len(self.header)]
+            if len(self.header) >= SIGNATURE_LENGTH and not is_image_header(self.header):
+                self.reject(f'Файл {self.file_name} не является изображением.')
+
+        self.size += len(raw_data)
+        self.total_size += len(raw_data)
+        if self.size > PHOTO_MAX_FILE_SIZE:
+            self.reject(f'Размер изображения не может превышать {PHOTO_MAX_FILE_SIZE // 1024 // 1024} МБ.')
+        if self.total_size > PHOTO_MAX_REQUEST_SIZE:
+            self.reject(f'Суммарный размер фотографий не может превышать {PHOTO_MAX_REQUEST_SIZE // 1024 // 1024} МБ.')
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+
+        self.active = False
+        self.file.close()
+        temp_path = photo_storage.path(self.temp_name)
+
+        if not is_image_header(self.header):
+            os.remove(temp_path)
+            self.add_error(f'Файл {self.file_name} не является изображением.')
+            return None
+
+        content_hash = self.digest.hexdigest()
+        upload = StoredPhotoUpload(
+            open(temp_path, 'rb'), self.file_name, self.content_type, self.size, self.charset,
+            content_hash, content_name(content_hash, self.file_name)
+        )
+        self.uploads.append(upload)
+        return upload
+
+    def upload_interrupted(self):
+        """
+        запрос оборвался посреди файла: недописанный файл удаляется
+        """
+        if self.active:
+            self.active = False
+            discard_file(self.file, photo_storage.path(self.temp_name))
+
+    def cleanup(self):
+        """
+        конец запроса: удаляются файлы, которые не стали фото ( форма не прошла проверку,
+        повторная загрузка тех же байтов ), и файл прерванной загрузки
+        """
+        self.upload_interrupted()
+        for upload in self.uploads:
+            upload.discard()
+        self.uploads = []
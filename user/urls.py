@@ -18,6 +18,8 @@ urlpatterns = [
     path('post/<int:post_id>/comments/', views.post_comments_view, name='post_comments'),
     path('tag/<int:id>/', views.tag_view, name='tag_view'),
     path('posts/tag/<int:tag_id>/', views.posts_by_tag_view, name='posts_by_tag'),
+    path('search/', views.search_view, name='search'),
+    path('autocomplete/', views.autocomplete_view, name='autocomplete'),
     path('', views.index, name='index')
 
 
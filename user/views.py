@@ -4,16 +4,33 @@ from django.contrib.auth.views import LoginView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import logout
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from .forms import RegistrationForm, PostForm, CommentForm
-from .models import Profile, Photo, Post, Tag, PostRatingAction
+from .models import Profile, Post, Tag, PostRatingAction, Comment
 from .forms import UserLoginForm
-from django.db.models import Q
-from django.http import JsonResponse
-from user.models import Country
-from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
+from country.registry import get_registry
+from travel.db_router import read_primary, read_replica
 from .permissions import check_user_blocked, check_user_can_create
+from .feed import get_feed_entries
+from travel.cache_versions import versioned_key
+from .ratings import get_rating, record_vote
+from .listing import get_cached_ids, get_cached_page, get_cursor_page, hydrate
+from .search import get_search_page
+from .autocomplete import AUTOCOMPLETE_KINDS, autocomplete
+from .photos import photo_for_upload
+from .uploads import PhotoUploadHandler
+
+
+def mark_following(viewer, posts):
+    """
+    проставляет постам страницы признак подписки на автора ( один запрос на страницу )
+    """
+    followed_ids = Profile.followed_author_ids(viewer, {post.author_id for post in posts})
+    for post in posts:
+        post.is_following = post.author_id in followed_ids
 
 
 class RegistrationView(SuccessMessageMixin, CreateView):
@@ -44,10 +61,12 @@ def logout_view(request):
     return redirect('index')
 
 
+@read_replica()
 def index(request):
     """
     Представление для ленты. Если пользователь аутентифицирован, показываются посты
-    по интересующим его странам и посты пользователей, на которых он подписан.
+    по интересующим его странам и посты пользователей, на которых он подписан
+    ( читаются из материализованной ленты FeedEntry ).
     Если нет, то будут показаны первые 10 постов.
     """
 
@@ -60,23 +79,15 @@ def index(request):
         except Profile.DoesNotExist:
             return redirect('login')
 
-        cache_key = f"user_feed_{request.user.id}"
-        posts = cache.get(cache_key)
-
-        if not posts:
-            posts = Post.objects.filter(
-                Q(countries__in=profile.countries_interest.all()) |
-                Q(author__in=profile.followers.all())
-            ).order_by('-last_lifted_at')
-
-            cache.set(cache_key, posts, timeout=60*5)
-
-        for post in posts:
-            post.is_following = post.author.profile.followers.filter(id=request.user.id).exists()
-
-        paginator = Paginator(posts, 10)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        page_obj = get_cursor_page(
+            request,
+            get_feed_entries(request.user),
+            ('-lifted_at', '-post_id'),
+            Post.objects.for_cards(),
+            per_page=10,
+            id_field='post_id'
+        )
+        mark_following(request.user, page_obj)
 
         context = {
             'posts': page_obj,
@@ -87,13 +98,9 @@ def index(request):
         return render(request, "user/index.html", context)
     else:
 
-        cache_key = 'public_feed'
-        posts = cache.get(cache_key)
-
-        if not posts:
-            posts = Post.objects.all().order_by('-create_date')[:10]
-
-            cache.set(cache_key, posts, timeout=60*5)
+        cache_key = versioned_key('public_feed', 'feed')
+        post_ids = get_cached_ids(cache_key, Post.objects.order_by('-create_date')[:10])
+        posts = hydrate(post_ids, Post.objects.for_cards())
 
         context = {
             'posts': posts,
@@ -103,6 +110,7 @@ def index(request):
         return render(request, "user/index.html", context)
 
 
+@csrf_exempt
 @login_required
 def create_post(request):
     """
@@ -110,6 +118,8 @@ def create_post(request):
     посты могут создать только те пользователи у которых is_create = True
     по дефолту значение сохраняется как True
     возможность загрузить сразу до 10 фотографий в пределах 5мб
+    ( фото принимает PhotoUploadHandler, он подключается до чтения request.POST,
+    поэтому CSRF проверяется уже в create_post_form )
     """
 
     profile = Profile.objects.get(user=request.user)
@@ -122,8 +132,18 @@ def create_post(request):
     if create_permission_response:
         return create_permission_response
 
+    upload_handler = PhotoUploadHandler(request)
+    request.upload_handlers.insert(0, upload_handler)
+    try:
+        return create_post_form(request, upload_handler)
+    finally:
+        upload_handler.cleanup()
+
+
+@csrf_protect
+def create_post_form(request, upload_handler):
     if request.method == 'POST':
-        form = PostForm(request.POST, request.FILES)
+        form = PostForm(request.POST, request.FILES, upload_errors=upload_handler.errors)
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
@@ -140,9 +160,7 @@ def create_post(request):
             uploaded_images = form.cleaned_data.get('photos')
 
             for image in uploaded_images:
-                photo = Photo(image=image)
-                photo.save()
-                post.photos.add(photo)
+                post.photos.add(photo_for_upload(image))
 
             profile = Profile.objects.get(user=request.user)
             profile.post_count += 1
@@ -159,6 +177,7 @@ def create_post(request):
 def increase_rating(request, post_id):
     """
     Предназначенно для увеличения рейтинга поста.
+    Рейтинг меняется счетчиком в кеше и записывается в базу командой flush_ratings.
     """
     profile = Profile.objects.get(user=request.user)
     post = get_object_or_404(Post, id=post_id)
@@ -170,39 +189,12 @@ def increase_rating(request, post_id):
     rating_action, created = PostRatingAction.objects.get_or_create(user=request.user, post=post)
 
     if rating_action.action == 'up':
-        return JsonResponse({'status': 'ok', 'new_rating': post.rating})
+        return JsonResponse({'status': 'ok', 'new_rating': get_rating(post)})
 
     if request.method == 'POST':
-        if rating_action.action == 'down':
-
-            post.rating += 1
-        else:
-            post.rating += 1
-
-        post.save()
-
-        rating_action.action = 'up'
-        rating_action.save()
-
-        cache_keys = [
-            f"user_feed_{request.user.id}",
-            f"profile_{request.user.id}",
-            f"profile_{post.author.id}"
-            f"post_{post_id}",
-            f"user_posts_{request.user.id}"
-        ]
+        new_rating = record_vote(rating_action, post, 'up')
 
-        for country in post.countries.all():
-            cache_keys.append(f"posts_by_country_{country.id}")
-
-        for tag in post.tags.all():
-            cache_keys.append(f"tag_posts_{tag.id}")
-
-        for cache_key in cache_keys:
-            cache.delete(cache_key)
-            print(f"Cache cleared for key: {cache_key}")
-
-        return JsonResponse({'status': 'ok', 'new_rating': post.rating})
+        return JsonResponse({'status': 'ok', 'new_rating': new_rating})
 
     return JsonResponse({'status': 'error', 'message': 'Invalid request method.'}, status=400)
 
@@ -222,40 +214,12 @@ def downgrade_rating(request, post_id):
     rating_action, created = PostRatingAction.objects.get_or_create(user=request.user, post=post)
 
     if rating_action.action == 'down':
-        return JsonResponse({'status': 'ok', 'new_rating': post.rating})
+        return JsonResponse({'status': 'ok', 'new_rating': get_rating(post)})
 
     if request.method == 'POST':
-        if post.rating > 0:
-            if rating_action.action == 'up':
-
-                post.rating -= 1
-            else:
-                post.rating -= 1
-
-            post.save()
-
-            rating_action.action = 'down'
-            rating_action.save()
-
-            cache_keys = [
-                f"user_feed_{request.user.id}",
-                f"profile_{request.user.id}",
-                f"profile_{post.author.id}",
-                f"user_posts_{request.user.id}"
-                f"post_{post_id}",
-            ]
-
-            for country in post.countries.all():
-                cache_keys.append(f"posts_by_country_{country.id}")
-
-            for tag in post.tags.all():
-                cache_keys.append(f"tag_posts_{tag.id}")
-
-            for cache_key in cache_keys:
-                cache.delete(cache_key)
-                print(f"Cache cleared for key: {cache_key}")
+        new_rating = record_vote(rating_action, post, 'down')
 
-        return JsonResponse({'status': 'ok', 'new_rating': post.rating})
+        return JsonResponse({'status': 'ok', 'new_rating': new_rating})
 
     return JsonResponse({'status': 'error', 'message': 'Invalid request method.'}, status=400)
 
@@ -305,7 +269,7 @@ def post_detail_view(request, pk):
 
     form = CommentForm()
 
-    cache_key_post = f"post_{pk}"
+    cache_key_post = versioned_key(f"post_{pk}", f"post_{pk}")
     post = cache.get(cache_key_post)
     if not post:
         post = get_object_or_404(Post, id=pk)
@@ -319,7 +283,7 @@ def post_detail_view(request, pk):
             author_profile = get_object_or_404(Profile, user=post.author)
             cache.set(cache_key_author_profile, author_profile, timeout=60*5)
 
-        is_following = author_profile.followers.filter(id=request.user.id).exists()
+        is_following = post.author_id in Profile.followed_author_ids(request.user, [author_profile.user_id])
 
     context = {
         'form': form,
@@ -332,6 +296,7 @@ def post_detail_view(request, pk):
 
 
 @login_required
+@read_replica()
 def profiles_list_view(request):
     """
     Список пользователей
@@ -340,8 +305,9 @@ def profiles_list_view(request):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -349,18 +315,18 @@ def profiles_list_view(request):
 
     active_link = 'profiles'
 
-    cache_key_profiles = "profiles_list"
-    profiles = cache.get(cache_key_profiles)
-    if not profiles:
-        profiles = Profile.objects.exclude(user__is_superuser=True).select_related('user')
-        cache.set(cache_key_profiles, profiles, timeout=60*5)
+    page_obj = get_cached_page(
+        request,
+        versioned_key("profiles_list", "profiles"),
+        Profile.objects.exclude(user__is_superuser=True).order_by('id'),
+        Profile.objects.select_related('user'),
+        per_page=20
+    )
 
-    for profile in profiles:
+    followed_ids = Profile.followed_author_ids(request.user, {profile.user_id for profile in page_obj})
+    for profile in page_obj:
         profile.unique_country_count = profile.user.posts.values('countries').distinct().count()
-
-    paginator = Paginator(profiles, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        profile.is_following = profile.user_id in followed_ids
 
     context = {
         'profiles': page_obj,
@@ -371,6 +337,7 @@ def profiles_list_view(request):
 
 
 @login_required
+@read_replica()
 def profile_detail_view(request, user_id):
     """
     Подробная информация о пользователе
@@ -379,8 +346,9 @@ def profile_detail_view(request, user_id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -388,41 +356,48 @@ def profile_detail_view(request, user_id):
 
     active_link = 'profile_detail_view'
 
-    cache_key_user_profile = f"profile_detail_{user_id}"
+    cache_key_user_profile = versioned_key(f"profile_detail_{user_id}", f"author_{user_id}")
     profile = cache.get(cache_key_user_profile)
     if not profile:
-        profile = get_object_or_404(Profile, user__id=user_id)
-        cache.set(cache_key_user_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = get_object_or_404(Profile, user__id=user_id)
+            cache.set(cache_key_user_profile, profile, timeout=60*5)
 
     user = profile.user
 
-    cache_key_posts = f"user_posts_{user_id}"
-    posts = cache.get(cache_key_posts)
-    if not posts:
-        posts = profile.user.posts.all().order_by('-create_date')
-        cache.set(cache_key_posts, posts, timeout=60*10)
-
-    cache_key_unique_country_count = f"unique_country_count_{user_id}"
+    page_obj = get_cursor_page(
+        request,
+        profile.user.posts.all(),
+        ('-create_date', '-id'),
+        Post.objects.for_cards(),
+        per_page=10,
+        cache_key=versioned_key(f"user_posts_{user_id}", f"author_{user_id}"),
+        timeout=60*10
+    )
+    mark_following(request.user, page_obj)
+
+    cache_key_unique_country_count = versioned_key(f"unique_country_count_{user_id}", f"author_{user_id}")
     unique_country_count = cache.get(cache_key_unique_country_count)
     if unique_country_count is None:
-        unique_country_count = profile.user.posts.values('countries').distinct().count()
-        cache.set(cache_key_unique_country_count, unique_country_count, timeout=60*5)
+        with read_primary():
+            unique_country_count = profile.user.posts.values('countries').distinct().count()
+            cache.set(cache_key_unique_country_count, unique_country_count, timeout=60*5)
 
-    cache_key_interested_countries = f"interested_countries_{user_id}"
+    cache_key_interested_countries = versioned_key(f"interested_countries_{user_id}", f"author_{user_id}")
     interested_countries = cache.get(cache_key_interested_countries)
     if not interested_countries:
-        interested_countries = profile.countries_interest.all()
-        cache.set(cache_key_interested_countries, interested_countries, timeout=60*5)
+        with read_primary():
+            interested_countries = profile.countries_interest.all()
+            cache.set(cache_key_interested_countries, interested_countries, timeout=60*5)
 
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    is_following = user.id in Profile.followed_author_ids(request.user, [user.id])
 
     context = {
         'profile': profile,
         'user': user,
         'posts': page_obj,
         'active_link': active_link,
+        'is_following': is_following,
         'unique_country_count': unique_country_count,
         'interested_countries': interested_countries
     }
@@ -431,6 +406,7 @@ def profile_detail_view(request, user_id):
 
 
 @login_required
+@read_replica()
 def profile_posts(request, user_id):
     """
     Посты определенного пользователя
@@ -439,8 +415,9 @@ def profile_posts(request, user_id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -448,23 +425,24 @@ def profile_posts(request, user_id):
 
     active_link = 'profile_posts'
 
-    cache_key_user_profile = f"profile_detail_{user_id}"
+    cache_key_user_profile = versioned_key(f"profile_detail_{user_id}", f"author_{user_id}")
     profile = cache.get(cache_key_user_profile)
     if not profile:
-        profile = get_object_or_404(Profile, user__id=user_id)
-        cache.set(cache_key_user_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = get_object_or_404(Profile, user__id=user_id)
+            cache.set(cache_key_user_profile, profile, timeout=60*5)
 
     user = profile.user
 
-    cache_key_posts = f"user_posts_{user_id}"
-    posts = cache.get(cache_key_posts)
-    if not posts:
-        posts = profile.user.posts.all().order_by('-create_date')
-        cache.set(cache_key_posts, posts, timeout=60*5)
-
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_cursor_page(
+        request,
+        profile.user.posts.all(),
+        ('-create_date', '-id'),
+        Post.objects.for_cards(),
+        per_page=10,
+        cache_key=versioned_key(f"user_posts_{user_id}", f"author_{user_id}")
+    )
+    mark_following(request.user, page_obj)
 
     context = {
         'profile': profile,
@@ -477,6 +455,7 @@ def profile_posts(request, user_id):
 
 
 @login_required
+@read_replica()
 def posts_by_country_view(request, country_id):
     """
     Посты, связанные со страной
@@ -485,8 +464,9 @@ def posts_by_country_view(request, country_id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -494,21 +474,19 @@ def posts_by_country_view(request, country_id):
 
     active_link = 'posts_by_country_view'
 
-    cache_key_country = f"country_{country_id}"
-    country = cache.get(cache_key_country)
-    if not country:
-        country = get_object_or_404(Country, id=country_id)
-        cache.set(cache_key_country, country, timeout=60*5)
-
-    cache_key_posts = f"posts_by_country_{country_id}"
-    posts = cache.get(cache_key_posts)
-    if not posts:
-        posts = Post.objects.filter(countries=country).order_by('-create_date')
-        cache.set(cache_key_posts, posts, timeout=60*5)
+    country = get_registry().get(country_id)
+    if country is None:
+        raise Http404
 
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_cursor_page(
+        request,
+        Post.objects.filter(countries=country),
+        ('-create_date', '-id'),
+        Post.objects.for_cards(),
+        per_page=10,
+        cache_key=versioned_key(f"posts_by_country_{country_id}", f"country_{country_id}")
+    )
+    mark_following(request.user, page_obj)
 
     context = {
         'active_link': active_link,
@@ -550,6 +528,7 @@ def add_comment(request, post_id):
 
 
 @login_required
+@read_replica()
 def post_comments_view(request, post_id):
     """
     Список комментариев определенного поста
@@ -558,8 +537,9 @@ def post_comments_view(request, post_id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -567,21 +547,21 @@ def post_comments_view(request, post_id):
 
     active_link = 'post_comments_view'
 
-    cache_key_post = f"post_{post_id}"
+    cache_key_post = versioned_key(f"post_{post_id}", f"post_{post_id}")
     post = cache.get(cache_key_post)
     if not post:
-        post = get_object_or_404(Post, id=post_id)
-        cache.set(cache_key_post, post, timeout=60*5)
-
-    cache_key_comments = f"post_comments_{post_id}"
-    comments = cache.get(cache_key_comments)
-    if not comments:
-        comments = post.comments.all().order_by('created_at')
-        cache.set(cache_key_comments, comments, timeout=60*5)
-
-    paginator = Paginator(comments, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        with read_primary():
+            post = get_object_or_404(Post, id=post_id)
+            cache.set(cache_key_post, post, timeout=60*5)
+
+    page_obj = get_cursor_page(
+        request,
+        post.comments.all(),
+        ('created_at', 'id'),
+        Comment.objects.select_related('author'),
+        per_page=20,
+        cache_key=versioned_key(f"post_comments_{post_id}", f"post_{post_id}")
+    )
 
     context = {
         'post': post,
@@ -593,6 +573,7 @@ def post_comments_view(request, post_id):
 
 
 @login_required
+@read_replica()
 def tag_view(request, id):
     """
     Получение тегов по id
@@ -601,8 +582,9 @@ def tag_view(request, id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*10)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*10)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -611,18 +593,19 @@ def tag_view(request, id):
     cache_key_tag = f"tag_{id}"
     tag = cache.get(cache_key_tag)
     if not tag:
-        tag = get_object_or_404(Tag, id=id)
-        cache.set(cache_key_tag, tag, timeout=60*5)
-
-    cache_key_posts = f"tag_posts_{id}"
-    posts = cache.get(cache_key_posts)
-    if not posts:
-        posts = Post.objects.filter(tags=tag).order_by('-create_date')
-        cache.set(cache_key_posts, posts, timeout=60*5)
-
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        with read_primary():
+            tag = get_object_or_404(Tag, id=id)
+            cache.set(cache_key_tag, tag, timeout=60*5)
+
+    page_obj = get_cursor_page(
+        request,
+        Post.objects.filter(tags=tag),
+        ('-create_date', '-id'),
+        Post.objects.for_cards(),
+        per_page=10,
+        cache_key=versioned_key(f"tag_posts_{id}", f"tag_{id}")
+    )
+    mark_following(request.user, page_obj)
 
     context = {
         'posts': page_obj,
@@ -632,6 +615,7 @@ def tag_view(request, id):
 
 
 @login_required
+@read_replica()
 def posts_by_tag_view(request, tag_id):
     """
     Список постов по тегу
@@ -640,8 +624,9 @@ def posts_by_tag_view(request, tag_id):
     cache_key_profile = f"profile_{request.user.id}"
     profile = cache.get(cache_key_profile)
     if not profile:
-        profile = Profile.objects.get(user=request.user)
-        cache.set(cache_key_profile, profile, timeout=60*5)
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
 
     blocked_response = check_user_blocked(profile)
     if blocked_response:
@@ -650,20 +635,64 @@ def posts_by_tag_view(request, tag_id):
     cache_key_tag = f"tag_{tag_id}"
     tag = cache.get(cache_key_tag)
     if not tag:
-        tag = get_object_or_404(Tag, id=tag_id)
-        cache.set(cache_key_tag, tag, timeout=60*5)
-
-    cache_key_posts = f"tag_posts_{tag_id}"
-    posts = cache.get(cache_key_posts)
-    if not posts:
-        posts = Post.objects.filter(tags=tag).order_by('-create_date')
-        cache.set(cache_key_posts, posts, timeout=60*5)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        with read_primary():
+            tag = get_object_or_404(Tag, id=tag_id)
+            cache.set(cache_key_tag, tag, timeout=60*5)
+
+    page_obj = get_cursor_page(
+        request,
+        Post.objects.filter(tags=tag),
+        ('-create_date', '-id'),
+        Post.objects.for_cards(),
+        per_page=10,
+        cache_key=versioned_key(f"tag_posts_{tag_id}", f"tag_{tag_id}")
+    )
+    mark_following(request.user, page_obj)
 
     context = {
         'tag': tag,
         'posts': page_obj,
     }
-    return render(request, 'user/posts_by_tag.html', context)
\ No newline at end of file
+    return render(request, 'user/posts_by_tag.html', context)
+
+
+@login_required
+@read_replica()
+def search_view(request):
+    """
+    Поиск постов по теме, тексту, тегам и странам
+    """
+
+    cache_key_profile = f"profile_{request.user.id}"
+    profile = cache.get(cache_key_profile)
+    if not profile:
+        with read_primary():
+            profile = Profile.objects.get(user=request.user)
+            cache.set(cache_key_profile, profile, timeout=60*5)
+
+    blocked_response = check_user_blocked(profile)
+    if blocked_response:
+        return blocked_response
+
+    query = request.GET.get('q', '').strip()
+    page_obj = get_search_page(request, query, per_page=10)
+    mark_following(request.user, page_obj)
+
+    context = {
+        'query': query,
+        'posts': page_obj,
+    }
+    return render(request, 'user/search.html', context)
+
+
+def autocomplete_view(request):
+    """
+    Подсказки стран и тегов для полей форм ( форма регистрации - без входа )
+    """
+
+    kind = request.GET.get('kind')
+    if kind not in AUTOCOMPLETE_KINDS:
+        raise Http404("Неизвестный тип подсказок")
+
+    results = autocomplete(kind, request.GET.get('q', ''))
+    return JsonResponse({'results': [{'id': obj_id, 'label': label} for obj_id, label in results]})